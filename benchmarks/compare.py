@@ -0,0 +1,96 @@
+"""
+Compare two result files written by ``benchmarks/suite.py``.
+
+The fastest time of each benchmark and size in both files is compared and
+any that got slower than ``--threshold`` are reported as regressions.
+
+Usage::
+
+    python benchmarks/compare.py before.json after.json
+    python benchmarks/compare.py before.json after.json --threshold 1.2 --fail
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List, Tuple
+
+Key = Tuple[str, int]
+
+
+def load(path: str) -> Dict[Key, dict]:
+    with open(path) as f:
+        results = json.load(f)['results']
+
+    return {(r['benchmark'], r['size']): r for r in results}
+
+
+def compare(old: Dict[Key, dict], new: Dict[Key, dict],
+            threshold: float = 1.1) -> List[dict]:
+    """
+    Compare the results that are in both ``old`` and ``new``.
+
+    :param old: The baseline results keyed by benchmark and size.
+    :param new: The results to check.
+    :param threshold: The ratio of the new time to the old time above which
+        a result is a regression, below ``1 / threshold`` it is an
+        improvement.
+    :return: A row for every result in both, in the order of ``new``.
+    """
+    rows = []
+
+    for key, result in new.items():
+        if key not in old:
+            continue
+
+        before = old[key]['min']
+        after = result['min']
+        ratio = after / before if before else float('inf')
+
+        if ratio > threshold:
+            status = 'slower'
+        elif ratio < 1 / threshold:
+            status = 'faster'
+        else:
+            status = 'same'
+
+        rows.append({'benchmark': key[0], 'size': key[1], 'old': before,
+                     'new': after, 'ratio': ratio, 'status': status})
+
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('old', help='the baseline results.')
+    parser.add_argument('new', help='the results to check.')
+    parser.add_argument('--threshold', type=float, default=1.1,
+                        help='the slowdown ratio that is a regression.')
+    parser.add_argument('--fail', action='store_true',
+                        help='exit with 1 if there are any regressions.')
+    parser.add_argument('--json', action='store_true',
+                        help='print the comparison as json.')
+    args = parser.parse_args(argv)
+
+    old, new = load(args.old), load(args.new)
+    rows = compare(old, new, args.threshold)
+    missing = sorted(set(old) ^ set(new))
+
+    if args.json:
+        print(json.dumps({'rows': rows, 'unmatched': missing}, indent=2))
+    else:
+        print(f'{"benchmark":<32}{"size":>10}{"old (s)":>12}{"new (s)":>12}'
+              f'{"ratio":>8}  status')
+
+        for r in rows:
+            print(f'{r["benchmark"]:<32}{r["size"]:>10}{r["old"]:>12.4f}'
+                  f'{r["new"]:>12.4f}{r["ratio"]:>8.2f}  {r["status"]}')
+
+        for name, size in missing:
+            print(f'{name} ({size}) is only in one of the files.')
+
+    if args.fail and any(r['status'] == 'slower' for r in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
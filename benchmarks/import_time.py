@@ -0,0 +1,108 @@
+"""
+Measure how long it takes to import pytech modules in a fresh interpreter.
+
+Every module is imported in a new process ``--repeat`` times so nothing is
+cached between runs. Along with the timings this reports which heavy
+optional dependencies were imported and whether a Mongo connection was
+made, none of which should happen just by importing a module.
+
+Usage::
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py pytech.backtest.backtest --repeat 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = [
+    'pytech',
+    'pytech.utils',
+    'pytech.mongo',
+    'pytech.store',
+    'pytech.data.handler',
+    'pytech.backtest.backtest',
+    'pytech.backtest.vectorized',
+    'pytech.fin.portfolio',
+    'pytech.fin.analysis.portfolio',
+    'pytech.fin.analysis.random',
+]
+
+HEAVY_MODULES = ['pymc3', 'matplotlib', 'scrapy', 'twisted', 'pymongo']
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+mongo = sys.modules.get('pytech.mongo')
+print(json.dumps({{
+    'seconds': elapsed,
+    'heavy': [m for m in {heavy!r} if m in sys.modules],
+    'connected': bool(mongo is not None and mongo._arctic_store is not None),
+}}))
+"""
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_import(module: str, repeat: int) -> dict:
+    """Import ``module`` in ``repeat`` fresh interpreters."""
+    code = PROBE.format(module=module, heavy=HEAVY_MODULES)
+    runs = []
+
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', code],
+                             cwd=ROOT_DIR,
+                             stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE,
+                             universal_newlines=True)
+
+        if out.returncode != 0:
+            return {'module': module,
+                    'error': out.stderr.strip().splitlines()[-1]}
+
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    seconds = [r['seconds'] for r in runs]
+    return {
+        'module': module,
+        'min': min(seconds),
+        'median': statistics.median(seconds),
+        'heavy': runs[-1]['heavy'],
+        'connected': runs[-1]['connected'],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true',
+                        help='print the results as json.')
+    args = parser.parse_args(argv)
+
+    results = [time_import(m, args.repeat) for m in args.modules]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f'{"module":<35}{"min (s)":>10}{"median (s)":>12}  '
+          f'{"mongo":<7}heavy imports')
+
+    for r in results:
+        if 'error' in r:
+            print(f'{r["module"]:<35}  failed: {r["error"]}')
+            continue
+
+        print(f'{r["module"]:<35}{r["min"]:>10.3f}{r["median"]:>12.3f}  '
+              f'{"yes" if r["connected"] else "no":<7}'
+              f'{", ".join(r["heavy"]) or "-"}')
+
+
+if __name__ == '__main__':
+    main()
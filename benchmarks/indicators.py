@@ -0,0 +1,113 @@
+"""
+Compare the loop bound indicators with the row by row loops they replaced.
+
+Synthetic OHLCV frames of each ``--sizes`` are generated and every indicator
+is timed on them. The old loops are slow enough that they are only run on
+frames up to ``--loop-max`` rows.
+
+Usage::
+
+    python benchmarks/indicators.py
+    python benchmarks/indicators.py --sizes 10000 100000 1000000 --repeat 3
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import pytech.fin.analysis._kernels as kernels  # noqa: E402
+import pytech.fin.analysis.technical as ta  # noqa: E402
+import pytech.utils.pandas_utils as pd_utils  # noqa: E402
+from benchmarks.synthetic import make_ohlcv  # noqa: E402
+from tests.fin.test_analysis.test_kernels import (  # noqa: E402
+    loop_dm,
+    loop_kama,
+    loop_rsi,
+    loop_true_range,
+    loop_wma
+)
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+
+
+def _dm(df):
+    return kernels.directional_movement(df[pd_utils.HIGH_COL].diff().values,
+                                        df[pd_utils.LOW_COL].diff().values)
+
+
+# name -> (new, old)
+CASES = {
+    'kama': (ta.kama, loop_kama),
+    'wma': (lambda df: ta.wma(df, 30), lambda df: loop_wma(df, 30)),
+    'rsi': (ta.rsi, loop_rsi),
+    'dmi_dm': (_dm, loop_dm),
+    'true_range': (lambda df: ta.true_range(df, len(df)),
+                   lambda df: loop_true_range(df, len(df))),
+}
+
+
+def best_of(func, df, repeat: int) -> float:
+    times = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', nargs='*', type=int, default=DEFAULT_SIZES)
+    parser.add_argument('--cases', nargs='*', default=list(CASES.keys()))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--loop-max', type=int, default=100000,
+                        help='the largest frame to time the old loops on.')
+    parser.add_argument('--json', action='store_true',
+                        help='print the results as json.')
+    args = parser.parse_args(argv)
+
+    results = []
+
+    for n in args.sizes:
+        df = make_ohlcv(n)
+
+        for name in args.cases:
+            new, old = CASES[name]
+            # the first call compiles the numba kernels.
+            new(df.head(100))
+            result = {'case': name, 'rows': n,
+                      'new': best_of(new, df, args.repeat), 'old': None}
+
+            if n <= args.loop_max:
+                result['old'] = best_of(old, df, 1)
+
+            results.append(result)
+
+    if args.json:
+        print(json.dumps({'numba': kernels.numba is not None,
+                          'results': results}, indent=2))
+        return
+
+    print(f'numba: {"yes" if kernels.numba is not None else "no"}')
+    print(f'{"case":<12}{"rows":>10}{"new (s)":>12}{"old (s)":>12}'
+          f'{"speedup":>10}')
+
+    for r in results:
+        if r['old'] is None:
+            old, speedup = '-', '-'
+        else:
+            old = f'{r["old"]:.4f}'
+            speedup = f'{r["old"] / r["new"]:.0f}x'
+
+        print(f'{r["case"]:<12}{r["rows"]:>10}{r["new"]:>12.4f}{old:>12}'
+              f'{speedup:>10}')
+
+
+if __name__ == '__main__':
+    main()
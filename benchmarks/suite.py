@@ -0,0 +1,366 @@
+"""
+Time the hot paths of pytech on synthetic data and save the results as json.
+
+Every benchmark runs offline against a :class:`MemoryStore` filled with
+random walks from :mod:`benchmarks.synthetic`. The setup of each repeat is
+not timed. Compare two result files with ``benchmarks/compare.py``.
+
+Usage::
+
+    python benchmarks/suite.py --output before.json
+    python benchmarks/suite.py --filter backtest blotter --quick
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import OrderedDict, namedtuple
+from typing import Callable, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import pytech.fin.analysis.technical as ta  # noqa: E402
+import pytech.trading.order as ord  # noqa: E402
+import pytech.utils.pandas_utils as pd_utils  # noqa: E402
+from benchmarks.synthetic import (  # noqa: E402
+    date_range,
+    make_ohlcv,
+    make_store,
+    make_tickers,
+    make_universe
+)
+from pytech.algo.strategy import BuyAndHold, CrossOverStrategy  # noqa: E402
+from pytech.backtest.backtest import Backtest  # noqa: E402
+from pytech.backtest.event import EventBus, MarketEvent  # noqa: E402
+from pytech.data.handler import ArrayBars, Bars, stack_bars  # noqa: E402
+from pytech.data.streaming import StreamingBars  # noqa: E402
+from pytech.fin.analysis.portfolio import EfficientFrontier  # noqa: E402
+from pytech.fin.analysis.random import monte_carlo  # noqa: E402
+from pytech.fin.asset.owned_asset import OwnedAsset  # noqa: E402
+from pytech.fin.portfolio import BasicPortfolio  # noqa: E402
+from pytech.store import MemoryStore  # noqa: E402
+from pytech.trading.blotter import Blotter  # noqa: E402
+from pytech.utils.enums import Position, TradeAction  # noqa: E402
+
+# what a benchmark's setup returns, ``run`` is timed and ``items`` is the
+# number of things it processed, used for the throughput.
+Case = namedtuple('Case', ['run', 'items'])
+Benchmark = namedtuple('Benchmark', ['name', 'setup', 'sizes', 'quick',
+                                     'unit'])
+
+BENCHMARKS = OrderedDict()
+
+# the number of tickers in the benchmarks that vary something else.
+TICKERS = 10
+
+
+def benchmark(name: str, sizes: Sequence[int], quick: Sequence[int] = None,
+              unit: str = 'rows'):
+    """
+    Register a benchmark.
+
+    The decorated function takes the size and returns a :class:`Case`, it is
+    called again before every repeat so ``run`` can consume its state.
+
+    :param name: The name of the benchmark in the results.
+    :param sizes: The sizes to run.
+    :param quick: The sizes to run with ``--quick``, defaults to the smallest
+        size.
+    :param unit: What the size counts.
+    """
+
+    def wrapper(func: Callable[[int], Case]):
+        BENCHMARKS[name] = Benchmark(name, func, list(sizes),
+                                     list(quick or sizes[:1]), unit)
+        return func
+
+    return wrapper
+
+
+def _indicator(name: str, func: Callable[[pd.DataFrame], object]):
+    @benchmark(f'technical.{name}', [10000, 100000, 1000000],
+               quick=[10000])
+    def setup(n):
+        df = make_ohlcv(n)
+        # the first call compiles any numba kernels.
+        func(df.head(100))
+        return Case(lambda: func(df), n)
+
+
+for _name, _func in [('sma', ta.sma),
+                     ('ewma', ta.ewma),
+                     ('kama', ta.kama),
+                     ('rsi', ta.rsi),
+                     ('macd_signal', ta.macd_signal),
+                     ('bollinger_bands', ta.bollinger_bands),
+                     ('avg_true_range', ta.avg_true_range),
+                     ('dmi', ta.dmi)]:
+    _indicator(_name, _func)
+
+
+def _daily_universe(bars: int, tickers: int = TICKERS):
+    universe = make_universe(make_tickers(tickers), bars)
+    start, end = date_range(universe)
+    return universe, start, end
+
+
+def _array_bars(bars: int, tickers: int = TICKERS) -> ArrayBars:
+    universe, _, _ = _daily_universe(bars, tickers)
+    names = list(universe.keys())
+    index, data = stack_bars(universe, names)
+    return ArrayBars.from_array(EventBus(), names, index, data,
+                                store=MemoryStore())
+
+
+@benchmark('data.load_bars', [252, 2520, 25200], unit='bars')
+def bench_load_bars(n):
+    universe, start, end = _daily_universe(n)
+    store = make_store(universe)
+
+    def run():
+        ArrayBars(EventBus(), list(universe), start, end,
+                  store=store).ticker_data
+
+    return Case(run, n * len(universe))
+
+
+def _update_all(bars):
+    events = bars.events
+
+    while bars.continue_backtest:
+        bars.update_bars()
+        events.clear()
+
+
+@benchmark('data.bars_update', [252, 2520], unit='bars')
+def bench_bars_update(n):
+    universe, start, end = _daily_universe(n)
+    bars = Bars(EventBus(), list(universe), start, end,
+                store=make_store(universe))
+    # load outside of the timing.
+    _ = bars.ticker_data
+    return Case(lambda: _update_all(bars), n * len(universe))
+
+
+@benchmark('data.array_bars_update', [2520, 25200], unit='bars')
+def bench_array_bars_update(n):
+    bars = _array_bars(n)
+    _ = bars.ticker_data
+    return Case(lambda: _update_all(bars), n * len(bars.tickers))
+
+
+@benchmark('data.streaming_bars_update', [2520, 25200], unit='bars')
+def bench_streaming_bars_update(n):
+    universe, start, end = _daily_universe(n)
+    bars = StreamingBars(EventBus(), list(universe), start, end,
+                         store=make_store(universe))
+    # reading is part of the timing, it overlaps with emitting the bars.
+    return Case(lambda: _update_all(bars), n * len(universe))
+
+
+@benchmark('blotter.check_order_triggers', [100, 1000, 10000],
+           unit='resting orders')
+def bench_check_order_triggers(n):
+    days = 252
+    bars = _array_bars(days)
+    events = bars.events
+    blotter = Blotter(events)
+    blotter.bars = bars
+    rng = np.random.RandomState(0)
+    first = bars.ticker_data[0, :, bars.field_idx[pd_utils.CLOSE_COL]]
+
+    for i in range(n):
+        pos = i % len(bars.tickers)
+        ticker = bars.tickers[pos]
+        # most orders rest far from the price, a few trigger during the run.
+        away = .5 if rng.rand() < .99 else .02
+        if i % 2:
+            order = ord.LimitOrder(ticker, TradeAction.BUY, 10,
+                                   limit_price=first[pos] * (1 - away),
+                                   order_id=str(i))
+        else:
+            order = ord.LimitOrder(ticker, TradeAction.SELL, 10,
+                                   limit_price=first[pos] * (1 + away),
+                                   order_id=str(i))
+        blotter[ticker] = order
+
+    def run():
+        while bars.continue_backtest:
+            bars.update_bars()
+            blotter.check_order_triggers()
+            events.clear()
+
+    return Case(run, days)
+
+
+@benchmark('portfolio.update_timeindex', [10, 100, 500], unit='tickers')
+def bench_update_timeindex(n):
+    days = 252
+    bars = _array_bars(days, n)
+    events = bars.events
+    blotter = Blotter(events)
+    blotter.bars = bars
+    start = bars.index[0]
+    portfolio = BasicPortfolio(bars, events, start, blotter,
+                               store=bars.store)
+
+    # own every other ticker so both branches are taken.
+    for ticker in bars.tickers[::2]:
+        portfolio.owned_assets[ticker] = OwnedAsset(ticker, 100,
+                                                    Position.LONG, 10.,
+                                                    start)
+
+    def run():
+        event = MarketEvent()
+
+        while bars.continue_backtest:
+            bars.update_bars()
+            portfolio.update_timeindex(event)
+            events.clear()
+
+    return Case(run, days)
+
+
+@benchmark('fin.efficient_frontier', [10, 50, 200], unit='assets')
+def bench_efficient_frontier(n):
+    rng = np.random.RandomState(7)
+    drift = rng.uniform(0, .001, size=(n, 1))
+    returns = drift + rng.normal(scale=.01, size=(n, 1000))
+    frontier = EfficientFrontier(make_tickers(n),
+                                 prices=100 * np.cumprod(1 + returns, axis=1))
+    return Case(frontier, n)
+
+
+@benchmark('fin.monte_carlo', [1000, 10000, 100000], unit='paths')
+def bench_monte_carlo(n):
+    return Case(lambda: monte_carlo(.1, .2, 252, 100., paths=n, seed=0), n)
+
+
+def _backtest(strategy, n, data_handler=ArrayBars, **params):
+    universe, start, end = _daily_universe(n)
+    store = make_store(universe)
+    backtest = Backtest(list(universe), 100000, start, strategy,
+                        end_date=end, data_handler=data_handler, store=store,
+                        strategy_params=params)
+    return Case(backtest._run, n)
+
+
+@benchmark('backtest.buy_and_hold', [252, 2520], unit='bars')
+def bench_buy_and_hold(n):
+    return _backtest(BuyAndHold, n)
+
+
+@benchmark('backtest.crossover', [252, 2520], unit='bars')
+def bench_crossover(n):
+    return _backtest(CrossOverStrategy, n, short_window=20, long_window=50)
+
+
+@benchmark('backtest.crossover_streaming', [252, 2520], unit='bars')
+def bench_crossover_streaming(n):
+    return _backtest(CrossOverStrategy, n, data_handler=StreamingBars,
+                     short_window=20, long_window=50)
+
+
+def run_benchmark(bench: Benchmark, size: int, repeat: int) -> dict:
+    times = []
+    items = 0
+
+    for _ in range(repeat):
+        case = bench.setup(size)
+        start = time.perf_counter()
+        case.run()
+        times.append(time.perf_counter() - start)
+        items = case.items
+
+    best = min(times)
+    return {
+        'benchmark': bench.name,
+        'size': size,
+        'unit': bench.unit,
+        'repeat': repeat,
+        'min': best,
+        'median': statistics.median(times),
+        'mean': statistics.mean(times),
+        'items': items,
+        'items_per_sec': items / best if best else None,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+                ['git', 'rev-parse', 'HEAD'], cwd=ROOT_DIR,
+                stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    return {
+        'date': dt.datetime.utcnow().isoformat(),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+def select(patterns: List[str]) -> List[Benchmark]:
+    if not patterns:
+        return list(BENCHMARKS.values())
+
+    return [b for b in BENCHMARKS.values()
+            if any(p in b.name for p in patterns)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--filter', nargs='*', default=[],
+                        help='only run benchmarks with any of these in '
+                             'their name.')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--quick', action='store_true',
+                        help='only run the smallest sizes.')
+    parser.add_argument('--output', help='write the results to this file.')
+    parser.add_argument('--list', action='store_true',
+                        help='list the benchmarks and exit.')
+    args = parser.parse_args(argv)
+
+    benchmarks = select(args.filter)
+
+    if args.list:
+        for b in benchmarks:
+            print(f'{b.name:<32} {b.unit}: {b.sizes}')
+        return
+
+    results = []
+    print(f'{"benchmark":<32}{"size":>10}{"min (s)":>12}{"median (s)":>12}'
+          f'{"items/s":>14}')
+
+    for bench in benchmarks:
+        for size in (bench.quick if args.quick else bench.sizes):
+            result = run_benchmark(bench, size, args.repeat)
+            results.append(result)
+            print(f'{bench.name:<32}{size:>10}{result["min"]:>12.4f}'
+                  f'{result["median"]:>12.4f}'
+                  f'{result["items_per_sec"] or 0:>14,.0f}')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'environment': environment(), 'results': results},
+                      f, indent=2)
+        print(f'Wrote {len(results)} results to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Synthetic OHLCV data for the benchmarks so they never need the network or a
+Mongo connection.
+
+Every generator is seeded so the same arguments always produce the same
+bars.
+"""
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+import pytech.utils.pandas_utils as pd_utils
+from pytech.store import MemoryStore
+
+DEFAULT_START = '2000-01-03'
+
+
+def make_ohlcv(n: int, seed: int = 0, start: str = '1970-01-01',
+               freq: str = 'min') -> pd.DataFrame:
+    """
+    Make ``n`` bars of a random walk.
+
+    :param n: The number of bars.
+    :param seed: The seed of the random walk.
+    :param start: The date of the first bar.
+    :param freq: The frequency of the bars.
+    :return: An OHLCV frame with an adjusted close, indexed by date.
+    """
+    rng = np.random.RandomState(seed)
+    close = 100 + np.cumsum(rng.normal(size=n))
+    # keep the walk positive so prices and returns make sense.
+    close = close - min(close.min(), 0) + 1
+    index = pd.date_range(start, periods=n, freq=freq,
+                          name=pd_utils.DATE_COL)
+    return pd.DataFrame({
+        pd_utils.OPEN_COL: close + rng.normal(size=n),
+        pd_utils.HIGH_COL: close + rng.uniform(0, 2, size=n),
+        pd_utils.LOW_COL: close - rng.uniform(0, 2, size=n),
+        pd_utils.CLOSE_COL: close,
+        pd_utils.ADJ_CLOSE_COL: close,
+        pd_utils.VOL_COL: rng.randint(1000, 5000, size=n),
+    }, index=index)
+
+
+def make_tickers(n: int) -> list:
+    return [f'T{i:04d}' for i in range(n)]
+
+
+def make_universe(tickers: Sequence[str], n: int,
+                  start: str = DEFAULT_START,
+                  freq: str = 'B') -> Dict[str, pd.DataFrame]:
+    """
+    Make ``n`` daily bars for each ticker, every ticker has its own seed.
+
+    :return: The frames keyed by ticker.
+    """
+    return {t: make_ohlcv(n, seed=i, start=start, freq=freq)
+            for i, t in enumerate(tickers)}
+
+
+def make_store(universe: Dict[str, pd.DataFrame],
+               lib_name: str = 'pytech.bars') -> MemoryStore:
+    """
+    Write a universe to a new :class:`MemoryStore`.
+
+    :param universe: The frames keyed by ticker.
+    :param lib_name: The bar library to write them to.
+    """
+    store = MemoryStore()
+    store.initialize_library(lib_name)
+    lib = store[lib_name]
+
+    for ticker, df in universe.items():
+        lib.write(ticker, df)
+
+    return store
+
+
+def date_range(universe: Dict[str, pd.DataFrame]):
+    """The first and last date of every ticker in ``universe``."""
+    index = next(iter(universe.values())).index
+    return index[0], index[-1]
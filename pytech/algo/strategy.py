@@ -2,11 +2,13 @@ import logging
 from abc import ABCMeta, abstractmethod
 from queue import Queue
 
+import numpy as np
 import pandas as pd
 
 import pytech.utils.pandas_utils as pd_utils
 from pytech.backtest.event import MarketEvent, SignalEvent
 from pytech.data.handler import DataHandler
+from pytech.fin.analysis.online import SMA
 from pytech.trading.order import get_order_types
 from pytech.utils.enums import EventType, Position, SignalType, TradeAction
 from pytech.utils.exceptions import InvalidEventTypeError
@@ -33,6 +35,22 @@ class Strategy(metaclass=ABCMeta):
 
         raise NotImplementedError('Must implement generate_signals()')
 
+    def generate_target_weights(self, prices: pd.DataFrame) -> pd.DataFrame:
+        """
+        Compute the target portfolio weight for every ticker on every bar at
+        once. This is what a :class:`VectorizedBacktest` uses instead of
+        :func:`generate_signals`.
+
+        A positive weight is a long position and a negative weight is a short
+        position, as a fraction of the initial capital.
+
+        :param prices: The close prices with a row per bar and a column per
+            ticker.
+        :return: A frame of weights the same shape as ``prices``.
+        """
+        raise NotImplementedError('Must implement generate_target_weights() '
+                                  'to run a vectorized backtest.')
+
 
 class BuyAndHold(Strategy):
     def __init__(self, data_handler, events):
@@ -74,6 +92,13 @@ class BuyAndHold(Strategy):
                         self.events.put(signal)
                         self.bought[ticker] = True
 
+    def generate_target_weights(self, prices: pd.DataFrame) -> pd.DataFrame:
+        """
+        Split the capital equally between every ticker as soon as it has a
+        price and then hold.
+        """
+        return prices.notnull().astype(float) / len(prices.columns)
+
 
 class CrossOverStrategy(Strategy):
     def __init__(self, data_handler: DataHandler,
@@ -83,6 +108,14 @@ class CrossOverStrategy(Strategy):
         super().__init__(data_handler, events)
         self.short_window = short_window
         self.long_window = long_window
+        self.short_mavgs = {}
+        self.long_mavgs = {}
+
+        for ticker in self.ticker_list:
+            self.short_mavgs[ticker] = self.bars.subscribe(
+                    ticker, SMA(short_window, pd_utils.CLOSE_COL))
+            self.long_mavgs[ticker] = self.bars.subscribe(
+                    ticker, SMA(long_window, pd_utils.CLOSE_COL))
 
     def generate_signals(self, event: MarketEvent):
         """
@@ -97,23 +130,10 @@ class CrossOverStrategy(Strategy):
                                         event_type=event.event_type)
 
         for ticker in self.ticker_list:
-            bar = self.bars.get_latest_bars(ticker, n=self.long_window)
-            signals = pd.DataFrame(bar)
-
-            signals['short_mavg'] = (
-                signals[pd_utils.CLOSE_COL].rolling(
-                        center=False,
-                        window=self.short_window,
-                        min_periods=self.short_window - 1).mean())
-            signals['long_mavg'] = (
-                signals[pd_utils.CLOSE_COL].rolling(
-                        center=False,
-                        window=self.long_window,
-                        min_periods=self.long_window - 1).mean())
-            short = signals['short_mavg'].tail(1)
-            long = signals['long_mavg'].tail(1)
-            short = short.iat[0]
-            long = long.iat[0]
+            # the moving averages are updated by the data handler as each
+            # bar arrives so there is no window to recompute here.
+            short = self.short_mavgs[ticker].value
+            long = self.long_mavgs[ticker].value
             self.logger.debug(
                     f'Ticker: {ticker}, long: {long}, short: {short}')
 
@@ -139,3 +159,18 @@ class CrossOverStrategy(Strategy):
                                 position=Position.SHORT))
             else:
                 continue
+
+    def generate_target_weights(self, prices: pd.DataFrame) -> pd.DataFrame:
+        """
+        Go long when the short moving average is above the long moving average
+        and short when it is below, splitting the capital equally between
+        every ticker.
+        """
+        short = prices.rolling(center=False,
+                               window=self.short_window,
+                               min_periods=self.short_window - 1).mean()
+        long = prices.rolling(center=False,
+                              window=self.long_window,
+                              min_periods=self.long_window - 1).mean()
+        direction = np.sign(short - long).fillna(0.0)
+        return direction / len(prices.columns)
@@ -1,14 +1,17 @@
 import datetime as dt
 import logging
-import queue
+from typing import Any, Dict
 
 import pytech.utils.common_utils as com_utils
 import pytech.utils.dt_utils as dt_utils
-from pytech.data.handler import Bars
+from pytech.backtest.event import EventBus
+from pytech.backtest.profiling import Instrumentation
+from pytech.data.handler import Bars, DataHandler
 from pytech.fin.portfolio import BasicPortfolio
+from pytech.store import AbstractStore
 from pytech.trading.blotter import Blotter
 from pytech.trading.execution import SimpleExecutionHandler
-from pytech.utils.enums import EventType
+from pytech.utils.enums import EventType, OrderType
 
 
 class Backtest(object):
@@ -27,7 +30,10 @@ class Backtest(object):
                  data_handler=None,
                  execution_handler=None,
                  portfolio=None,
-                 balancer=None):
+                 balancer=None,
+                 strategy_params: Dict[str, Any] = None,
+                 store: AbstractStore = None,
+                 instrumentation: Instrumentation = None):
         """
         Initialize the backtest.
 
@@ -35,9 +41,16 @@ class Backtest(object):
         :param initial_capital: Amount of starting capital.
         :param start_date: The date to start the backtest as of.
         :param strategy: The strategy to backtest.
-        :param data_handler:
+        :param data_handler: Either a :class:`DataHandler` class or an
+            instance of one that already has data loaded.
         :param execution_handler:
         :param portfolio:
+        :param strategy_params: keyword arguments passed to the strategy's
+            constructor.
+        :param store: The store used to read bars and write the portfolio.
+            Defaults to :func:`pytech.store.get_store`.
+        :param instrumentation: Time each component of the backtest with
+            this and report it once the backtest is complete.
         """
         self.logger = logging.getLogger(__name__)
         self.ticker_list = com_utils.iterable_to_set(ticker_list)
@@ -49,9 +62,16 @@ class Backtest(object):
         else:
             self.end_date = dt_utils.parse_date(end_date)
         self.strategy_cls = strategy
+        self.strategy_params = strategy_params or {}
+        self.store = store
+        self.instrumentation = instrumentation
+        self.data_handler = None
 
         if data_handler is None:
             self.data_handler_cls = Bars
+        elif isinstance(data_handler, DataHandler):
+            self.data_handler_cls = type(data_handler)
+            self.data_handler = data_handler
         else:
             self.data_handler_cls = data_handler
 
@@ -65,11 +85,13 @@ class Backtest(object):
         else:
             self.portfolio_cls = portfolio
 
-        self.events = queue.Queue()
+        self.events = EventBus()
 
         self.blotter = Blotter(self.events)
 
         self.signals = 0
+        # tickers a market order signal has already been warned about.
+        self._warned_market_tickers = set()
         self.orders = 0
         self.fills = 0
         self.num_strats = 1
@@ -77,60 +99,117 @@ class Backtest(object):
         self._init_trading_instances()
 
     def _init_trading_instances(self):
-        self.data_handler = self.data_handler_cls(self.events,
-                                                  self.ticker_list,
-                                                  self.start_date,
-                                                  self.end_date)
+        if self.data_handler is None:
+            self.data_handler = self.data_handler_cls(self.events,
+                                                      self.ticker_list,
+                                                      self.start_date,
+                                                      self.end_date,
+                                                      store=self.store)
+        else:
+            # the handler must put events on this backtest's queue.
+            self.data_handler.events = self.events
+
         self.blotter.bars = self.data_handler
-        self.strategy = self.strategy_cls(self.data_handler, self.events)
+        self.strategy = self.strategy_cls(self.data_handler, self.events,
+                                          **self.strategy_params)
         self.portfolio = self.portfolio_cls(self.data_handler,
                                             self.events,
                                             self.start_date,
                                             self.blotter,
-                                            self.initial_capital)
+                                            self.initial_capital,
+                                            store=self.store)
         self.execution_handler = self.execution_handler_cls(self.events)
 
+        if self.instrumentation is not None:
+            self._instrument()
+
+        self._subscribe_handlers()
+
+    def _instrument(self):
+        """
+        Time the hot path of each component. This has to happen before the
+        handlers are subscribed so the bus calls the timed methods.
+        """
+        instrument = self.instrumentation.instrument
+        instrument(self.data_handler, 'update_bars', 'data')
+        instrument(self.strategy, 'generate_signals', 'strategy')
+        instrument(self.portfolio, 'update_timeindex', 'portfolio')
+        instrument(self.portfolio, 'update_signal', 'signals')
+        instrument(self.portfolio, 'update_fill', 'fills')
+        instrument(self.blotter, 'check_order_triggers', 'blotter')
+        instrument(self.execution_handler, 'execute_order', 'execution')
+        instrument(self.portfolio, 'finalize', 'finalize')
+
+        holdings_buffer = getattr(self.portfolio, 'holdings_buffer', None)
+        if holdings_buffer is not None:
+            instrument(holdings_buffer, 'flush', 'persistence')
+
+    def _subscribe_handlers(self):
+        """Route each type of event to the instances that handle it."""
+        self.events.subscribe(EventType.MARKET, self.strategy.generate_signals)
+        self.events.subscribe(EventType.MARKET,
+                              self.portfolio.update_timeindex)
+        self.events.subscribe(EventType.SIGNAL, self._on_signal)
+        self.events.subscribe(EventType.TRADE, self._on_trade)
+        self.events.subscribe(EventType.FILL, self._on_fill)
+
+    def _on_signal(self, event):
+        self.signals += 1
+
+        # Typically a Market order is not desirable so we warn on it, once per
+        # ticker so a long backtest doesn't flood the log.
+        if (event.order_type is OrderType.MARKET
+                and event.ticker not in self._warned_market_tickers):
+            self._warned_market_tickers.add(event.ticker)
+            self.logger.warning('Received a SignalEvent with a Market order '
+                                f'type for ticker: {event.ticker}.')
+
+        self.portfolio.update_signal(event)
+
+    def _on_trade(self, event):
+        self.orders += 1
+        self.execution_handler.execute_order(event)
+
+    def _on_fill(self, event):
+        self.fills += 1
+        self.portfolio.update_fill(event)
+
     def _run(self):
         iterations = 0
+        instrumentation = self.instrumentation
 
-        while True:
-            iterations += 1
-            self.logger.info(f'Iteration #{iterations}')
-
-            if self.data_handler.continue_backtest:
-                self.logger.debug('Updating bars.')
-                self.data_handler.update_bars()
-            else:
-                self.logger.info('Backtest completed.')
-                break
+        if instrumentation is not None:
+            instrumentation.start()
 
-            # handle events
+        try:
             while True:
-                try:
-                    event = self.events.get(False)
-                except queue.Empty:
-                    self.logger.info('Event queue is empty. '
-                                     'Continuing to next day.')
-                    break
+                iterations += 1
+                self.logger.debug(f'Iteration #{iterations}')
+
+                if self.data_handler.continue_backtest:
+                    self.data_handler.update_bars()
                 else:
-                    if event is not None:
-                        self._process_event(event)
+                    self.logger.info('Backtest completed.')
+                    self.portfolio.finalize()
+                    break
+
+                # handle events
+                processed = self.events.drain()
+
+                if instrumentation is not None:
+                    instrumentation.incr('bars')
+                    instrumentation.incr('events', processed)
+        finally:
+            # e.g. stop a StreamingBars' read ahead thread if anything raised.
+            self.data_handler.close()
+
+            if instrumentation is not None:
+                # also disables the profiler and writes the report when the
+                # run failed.
+                instrumentation.stop()
+                self.logger.info(f'Backtest instrumentation:\n'
+                                 f'{instrumentation.summary()}')
 
     def _process_event(self, event):
-        self.logger.debug(
-                f'Processing {event.event_type}')
-
-        if event.event_type is EventType.MARKET:
-            self.strategy.generate_signals(event)
-            self.portfolio.update_timeindex(event)
-        elif event.event_type is EventType.SIGNAL:
-            self.signals += 1
-            self.portfolio.update_signal(event)
-        elif event.event_type is EventType.TRADE:
-            self.orders += 1
-            self.execution_handler.execute_order(event)
-        elif event.event_type is EventType.FILL:
-            self.fills += 1
-            self.portfolio.update_fill(event)
-        else:
-            return
+        self.logger.debug(f'Processing {event.event_type}')
+        self.events.dispatch(event)
@@ -1,7 +1,8 @@
 import datetime
-import logging
+import queue
 from abc import ABCMeta, abstractmethod
-from typing import Any, Dict, Union
+from collections import deque
+from typing import Any, Callable, Dict, List, Tuple, Type, Union
 
 import pytech.utils.dt_utils as dt_utils
 from pytech.utils.enums import (EventType, OrderType, Position, SignalType,
@@ -13,10 +14,12 @@ class Event(metaclass=ABCMeta):
     Base Class that all Events must inherit from.
 
     Provides an interface for which all events are handled.
+
+    Events are created for every bar, signal, trade and fill so they define
+    ``__slots__`` and subclasses set :attr:`event_type` as a class attribute.
     """
 
-    def __init__(self):
-        self.logger = logging.getLogger(__name__)
+    __slots__ = ()
 
     @property
     @abstractmethod
@@ -36,12 +39,9 @@ class Event(metaclass=ABCMeta):
 class MarketEvent(Event):
     """Handles the event of receiving new market data."""
 
-    def __init__(self):
-        super().__init__()
+    __slots__ = ()
 
-    @property
-    def event_type(self) -> EventType:
-        return EventType.MARKET
+    event_type = EventType.MARKET
 
 
 class SignalEvent(Event):
@@ -50,6 +50,12 @@ class SignalEvent(Event):
     Which is received by a :class:`Portfolio` and acted upon.
     """
 
+    __slots__ = ('ticker', 'signal_type', 'limit_price', 'stop_price',
+                 'target_price', 'strength', 'upper_price', 'lower_price',
+                 'action', 'position', 'order_type')
+
+    event_type = EventType.SIGNAL
+
     def __init__(self,
                  ticker: str,
                  signal_type: Union[SignalType, str],
@@ -95,8 +101,6 @@ class SignalEvent(Event):
         :param signal_type: The type of signal being created.
         """
 
-        super().__init__()
-
         self.ticker = ticker
         self.signal_type = SignalType.check_if_valid(signal_type)
         self.limit_price = limit_price
@@ -126,21 +130,17 @@ class SignalEvent(Event):
             elif stop_price is not None and limit_price is not None:
                 order_type = OrderType.STOP_LIMIT
             else:
+                # a Backtest warns about these once per ticker.
                 order_type = OrderType.MARKET
-                # Typically a Market order is not desirable so we warn on it.
-                self.logger.warning(
-                        'Creating a SignalEvent with a Market order type.')
 
         self.order_type = OrderType.check_if_valid(order_type)
 
-    @property
-    def event_type(self) -> EventType:
-        return EventType.SIGNAL
-
 
 class TradeSignalEvent(SignalEvent):
     """A SignalEvent that is specifically for ``LONG`` or ``SHORT`` trades."""
 
+    __slots__ = ()
+
     def __init__(self,
                  ticker: str,
                  signal_type: SignalType or str,
@@ -177,20 +177,28 @@ class TradeEvent(Event):
     is triggered.
     """
 
+    __slots__ = ('order_id', 'price', 'qty', 'ts')
+
+    event_type = EventType.TRADE
+
     def __init__(self,
                  order_id: str,
                  price: float,
                  qty: int,
-                 dt: datetime or str):
-        super().__init__()
+                 dt: datetime or str or int):
+        """
+        :param dt: The datetime of the trade, this is kept as nanoseconds
+            since the epoch in :attr:`ts` and only converted when ``dt``
+            is accessed.
+        """
         self.order_id = order_id
         self.price = price
         self.qty = qty
-        self.dt = dt_utils.parse_date(dt)
+        self.ts = dt_utils.to_ns(dt)
 
     @property
-    def event_type(self):
-        return EventType.TRADE
+    def dt(self):
+        return dt_utils.from_ns(self.ts)
 
 
 class FillEvent(Event):
@@ -199,17 +207,127 @@ class FillEvent(Event):
     either cash or the asset.
     """
 
+    __slots__ = ('order_id', 'price', 'available_volume', 'ts')
+
+    event_type = EventType.FILL
+
     def __init__(self,
                  order_id: str,
                  price: float,
                  available_volume: int,
-                 dt: datetime or str):
-        super().__init__()
+                 dt: datetime or str or int):
+        """
+        :param dt: The datetime of the fill, this is kept as nanoseconds
+            since the epoch in :attr:`ts` and only converted when ``dt``
+            is accessed.
+        """
         self.order_id = order_id
         self.price = price
         self.available_volume = available_volume
-        self.dt = dt_utils.parse_date(dt)
+        self.ts = dt_utils.to_ns(dt)
 
     @property
-    def event_type(self) -> EventType:
-        return EventType.FILL
+    def dt(self):
+        return dt_utils.from_ns(self.ts)
+
+
+Handler = Callable[[Event], Any]
+
+
+class EventBus(object):
+    """
+    The queue that every event in a backtest goes through.
+
+    The backtest loop is single threaded so the events are kept in a
+    :class:`collections.deque` instead of a :class:`queue.Queue` and its
+    locks. ``put``, ``get`` and ``empty`` behave like the ``Queue`` methods
+    so anything that puts events on the queue works with either one.
+
+    Handlers are subscribed to an :class:`EventType` and :meth:`dispatch`
+    looks up the handlers for an event's class in a table that is only
+    rebuilt when a handler is subscribed.
+    """
+
+    def __init__(self):
+        self._events = deque()
+        # key=event type, value=handlers in the order they were subscribed.
+        self._handlers: Dict[EventType, List[Handler]] = {}
+        # key=event class, value=the handlers for its event type.
+        self._table: Dict[Type[Event], Tuple[Handler, ...]] = {}
+
+    def __len__(self):
+        return len(self._events)
+
+    def put(self, event: Event, block: bool = True, timeout=None) -> None:
+        self._events.append(event)
+
+    put_nowait = put
+
+    def get(self, block: bool = True, timeout=None) -> Event:
+        """
+        Remove and return the oldest event.
+
+        :raises queue.Empty: If there are no events, the bus never blocks.
+        """
+        try:
+            return self._events.popleft()
+        except IndexError:
+            raise queue.Empty from None
+
+    get_nowait = get
+
+    def empty(self) -> bool:
+        return not self._events
+
+    def qsize(self) -> int:
+        return len(self._events)
+
+    def clear(self) -> None:
+        self._events.clear()
+
+    def subscribe(self, event_type: Union[EventType, str],
+                  handler: Handler) -> None:
+        """
+        Call ``handler`` with every event of ``event_type`` that is
+        dispatched, after any handlers that were already subscribed to it.
+
+        :param event_type: The type of event to handle.
+        :param handler: A callable that takes the event.
+        """
+        event_type = EventType.check_if_valid(event_type)
+        self._handlers.setdefault(event_type, []).append(handler)
+        self._table.clear()
+
+    def dispatch(self, event: Event) -> None:
+        """Call every handler subscribed to the event's type."""
+        cls = event.__class__
+
+        try:
+            handlers = self._table[cls]
+        except KeyError:
+            handlers = tuple(self._handlers.get(event.event_type, ()))
+            self._table[cls] = handlers
+
+        for handler in handlers:
+            handler(event)
+
+    def drain(self) -> int:
+        """
+        Dispatch events until there are none left, including any events the
+        handlers put on the bus.
+
+        :return: The number of events that were dispatched.
+        """
+        events = self._events
+        popleft = events.popleft
+        dispatch = self.dispatch
+        count = 0
+
+        while events:
+            event = popleft()
+
+            if event is not None:
+                dispatch(event)
+                count += 1
+
+        return count
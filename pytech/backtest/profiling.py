@@ -0,0 +1,251 @@
+"""
+Timers and counters for finding where the time goes in a backtest.
+"""
+import cProfile
+import functools
+import json
+import logging
+import pstats
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class Timer(object):
+    """The number of calls to a component and the time spent in them."""
+
+    __slots__ = ('name', 'calls', 'total', 'max')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed: float) -> None:
+        self.calls += 1
+        self.total += elapsed
+
+        if elapsed > self.max:
+            self.max = elapsed
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'total': self.total,
+            'mean': self.mean,
+            'max': self.max,
+        }
+
+
+class Instrumentation(object):
+    """
+    Time the components of a backtest and count what goes through it.
+
+    Nothing is timed unless it is wrapped with :meth:`wrap` or
+    :meth:`instrument`, so a backtest without an :class:`Instrumentation`
+    pays nothing for it. The timers are inclusive, the time of a component
+    includes the time of any instrumented component it calls, e.g. the
+    ``portfolio`` includes the ``blotter``.
+
+    :ivar timers: key=component name, value=its :class:`Timer`.
+    :ivar counters: key=counter name, value=its count.
+    """
+
+    def __init__(self,
+                 profile: bool = False,
+                 profile_sort: str = 'cumulative',
+                 profile_limit: int = 25,
+                 report_path: str = None):
+        """
+        :param profile: Run :mod:`cProfile` between :meth:`start` and
+            :meth:`stop` and include the slowest functions in the report.
+        :param profile_sort: The :mod:`pstats` key to sort the profile by.
+        :param profile_limit: The number of functions from the profile to
+            include in the report.
+        :param report_path: Write the JSON report to this path when
+            :meth:`stop` is called.
+        """
+        self.timers: Dict[str, Timer] = OrderedDict()
+        self.counters: Dict[str, int] = OrderedDict()
+        self.profile_sort = profile_sort
+        self.profile_limit = profile_limit
+        self.report_path = report_path
+        self.profiler = cProfile.Profile() if profile else None
+        self._start = None
+        self._stop = None
+
+    def timer(self, name: str) -> Timer:
+        """Get the timer for a component, creating it if needed."""
+        try:
+            return self.timers[name]
+        except KeyError:
+            timer = self.timers[name] = Timer(name)
+            return timer
+
+    def incr(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """
+        Return ``func`` wrapped so each call is added to the ``name`` timer.
+
+        :param name: The name of the component.
+        :param func: The function to time.
+        """
+        timer = self.timer(name)
+        clock = time.perf_counter
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timer.add(clock() - start)
+
+        return timed
+
+    def instrument(self, obj: Any, method: str, name: str = None) -> None:
+        """
+        Time every call to ``obj.method`` by replacing it on the instance.
+
+        Only calls made through the instance are timed, so this must be done
+        before the bound method is handed to anything else.
+
+        :param obj: The instance to instrument.
+        :param method: The name of the method.
+        :param name: The name of the component, defaults to ``method``.
+        """
+        func = getattr(obj, method)
+        setattr(obj, method, self.wrap(name or method, func))
+
+    @contextmanager
+    def timed(self, name: str):
+        """Add the time spent in the ``with`` block to the ``name`` timer."""
+        timer = self.timer(name)
+        start = time.perf_counter()
+        try:
+            yield timer
+        finally:
+            timer.add(time.perf_counter() - start)
+
+    def start(self) -> None:
+        self._start = time.perf_counter()
+        self._stop = None
+
+        if self.profiler is not None:
+            self.profiler.enable()
+
+    def stop(self) -> None:
+        if self.profiler is not None:
+            self.profiler.disable()
+
+        self._stop = time.perf_counter()
+
+        if self.report_path is not None:
+            self.to_json(self.report_path)
+
+    @property
+    def elapsed(self) -> float:
+        """The seconds between :meth:`start` and :meth:`stop` or now."""
+        if self._start is None:
+            return 0.0
+
+        stop = self._stop if self._stop is not None else time.perf_counter()
+        return stop - self._start
+
+    def rate(self, counter: str) -> float:
+        """The number of ``counter`` per second."""
+        elapsed = self.elapsed
+        return self.counters.get(counter, 0) / elapsed if elapsed else 0.0
+
+    def profile_stats(self) -> List[Dict[str, Any]]:
+        """The slowest functions from the profile, empty if not profiling."""
+        if self.profiler is None:
+            return []
+
+        try:
+            stats = pstats.Stats(self.profiler)
+        except TypeError:
+            # nothing was profiled.
+            return []
+
+        stats.sort_stats(self.profile_sort)
+        out = []
+
+        for func in stats.fcn_list[:self.profile_limit]:
+            calls, prim_calls, tottime, cumtime, _ = stats.stats[func]
+            filename, line, func_name = func
+            out.append({
+                'function': f'{filename}:{line}({func_name})',
+                'calls': calls,
+                'primitive_calls': prim_calls,
+                'tottime': tottime,
+                'cumtime': cumtime,
+            })
+
+        return out
+
+    def report(self) -> Dict[str, Any]:
+        """Everything that was measured as a dict that can be dumped as JSON."""
+        elapsed = self.elapsed
+        return {
+            'elapsed': elapsed,
+            'counters': dict(self.counters),
+            'rates': {f'{name}_per_sec': self.rate(name)
+                      for name in self.counters},
+            'timers': {name: dict(timer.to_dict(),
+                                  share=timer.total / elapsed if elapsed
+                                  else 0.0)
+                       for name, timer in self.timers.items()},
+            'profile': self.profile_stats(),
+        }
+
+    def to_json(self, path: str = None, **kwargs) -> str:
+        """
+        Dump the :meth:`report` as JSON.
+
+        :param path: Write the JSON to this path as well as returning it.
+        :param kwargs: Passed to :func:`json.dumps`.
+        """
+        kwargs.setdefault('indent', 2)
+        out = json.dumps(self.report(), **kwargs)
+
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(out)
+            logger.info(f'Wrote instrumentation report to: {path}')
+
+        return out
+
+    def summary(self) -> str:
+        """A human readable table of the :meth:`report`."""
+        elapsed = self.elapsed
+        lines = [f'Elapsed: {elapsed:.3f}s']
+
+        for name, count in self.counters.items():
+            lines.append(f'{name}: {count} ({self.rate(name):,.1f}/s)')
+
+        if self.timers:
+            lines.append(f'{"component":<20}{"calls":>10}{"total":>12}'
+                         f'{"mean":>12}{"max":>12}{"share":>8}')
+
+        for name, timer in self.timers.items():
+            share = timer.total / elapsed if elapsed else 0.0
+            lines.append(f'{name:<20}{timer.calls:>10}{timer.total:>12.4f}'
+                         f'{timer.mean:>12.6f}{timer.max:>12.6f}'
+                         f'{share:>8.1%}')
+
+        for row in self.profile_stats():
+            lines.append(f'{row["cumtime"]:>10.4f} {row["tottime"]:>10.4f} '
+                         f'{row["calls"]:>8} {row["function"]}')
+
+        return '\n'.join(lines)
@@ -0,0 +1,184 @@
+"""
+Run a backtest for every combination of strategy parameters in parallel.
+"""
+import itertools
+import logging
+import os
+import queue
+import shutil
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Union
+
+import numpy as np
+import pandas as pd
+
+from pytech.backtest.backtest import Backtest
+from pytech.backtest.vectorized import VectorizedBacktest, summary_stats
+from pytech.data.handler import ArrayBars
+from pytech.store import MemoryStore
+
+logger = logging.getLogger(__name__)
+
+param_grid_input = Union[Dict[str, Iterable[Any]], Iterable[Dict[str, Any]]]
+
+# everything a worker needs to rebuild the bars without reading the db.
+SharedBars = namedtuple('SharedBars', ['path', 'index', 'tickers', 'fields'])
+
+# the bars each worker process has already mapped, keyed by path.
+_worker_bars = {}
+
+
+def expand_grid(param_grid: param_grid_input) -> List[Dict[str, Any]]:
+    """
+    Expand a parameter grid into a list of keyword argument dicts.
+
+    :param param_grid: Either a dict mapping each parameter name to the values
+        to try, in which case every combination is returned, or an iterable
+        of dicts that are returned as is.
+    :return: A list of keyword argument dicts.
+
+    >>> len(expand_grid({'short_window': [10, 20], 'long_window': [50, 100]}))
+    4
+    """
+    if isinstance(param_grid, dict):
+        names = list(param_grid.keys())
+        return [dict(zip(names, values)) for values in
+                itertools.product(*(param_grid[n] for n in names))]
+
+    return [dict(params) for params in param_grid]
+
+
+def sweep(strategy,
+          param_grid: param_grid_input,
+          ticker_list,
+          initial_capital,
+          start_date,
+          end_date=None,
+          data_handler: ArrayBars = None,
+          max_workers: int = None,
+          vectorized: bool = True,
+          **kwargs) -> pd.DataFrame:
+    """
+    Backtest ``strategy`` once for every set of parameters in
+    ``param_grid`` across a :class:`ProcessPoolExecutor`.
+
+    The bars are loaded **once**, written to a temporary ``.npy`` file and
+    memory mapped read only by every worker, so no run reads from the db.
+
+    :param strategy: The strategy class to backtest.
+    :param param_grid: The strategy parameters to try, see
+        :func:`expand_grid`.
+    :param ticker_list: A list of tickers.
+    :param initial_capital: Amount of starting capital.
+    :param start_date: The date to start the backtest as of.
+    :param end_date: The date to end the backtest.
+    :param data_handler: An :class:`ArrayBars` that has the data to use.
+        If ``None`` one is created for the tickers and dates.
+    :param max_workers: The number of processes to use.
+        (default: the number of cores). If 1 then every run is done in this
+        process.
+    :param vectorized: Use a :class:`VectorizedBacktest` if ``True``,
+        otherwise use the event driven :class:`Backtest`.
+    :param kwargs: Passed to the backtest's constructor.
+    :return: A frame with a row per run and a column for each parameter and
+        each summary statistic.
+    """
+    runs = expand_grid(param_grid)
+
+    if data_handler is None:
+        data_handler = ArrayBars(queue.Queue(), ticker_list, start_date,
+                                 end_date)
+
+    tmp_dir = tempfile.mkdtemp(prefix='pytech_sweep_')
+
+    try:
+        shared = share_bars(data_handler, tmp_dir)
+        args = [(shared, strategy, params, ticker_list, initial_capital,
+                 start_date, end_date, vectorized, kwargs)
+                for params in runs]
+
+        if max_workers == 1:
+            results = [_run_one(a) for a in args]
+        else:
+            max_workers = max_workers or os.cpu_count()
+            chunksize = max(len(args) // (max_workers * 4), 1)
+            logger.info(f'Running {len(args)} backtests on '
+                        f'{max_workers} processes.')
+
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_run_one, args,
+                                            chunksize=chunksize))
+    finally:
+        _worker_bars.pop(os.path.join(tmp_dir, 'ticker_data.npy'), None)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return pd.DataFrame([dict(params, **stats)
+                         for params, stats in zip(runs, results)])
+
+
+def share_bars(bars: ArrayBars, directory: str) -> SharedBars:
+    """
+    Write the bars to a ``.npy`` file in ``directory`` so that they can be
+    memory mapped by other processes.
+
+    :param bars: The bars to share.
+    :param directory: Where to write the file.
+    :return: What :func:`load_shared_bars` needs to map the bars.
+    """
+    path = os.path.join(directory, 'ticker_data.npy')
+    np.save(path, bars.ticker_data)
+    return SharedBars(path, bars.index, list(bars.tickers), bars.fields)
+
+
+def load_shared_bars(shared: SharedBars) -> ArrayBars:
+    """
+    Create a new :class:`ArrayBars` backed by a read only memory map of bars
+    written by :func:`share_bars`.
+
+    The map is opened once per process and reused by every run.
+    """
+    try:
+        data = _worker_bars[shared.path]
+    except KeyError:
+        data = np.load(shared.path, mmap_mode='r')
+        _worker_bars[shared.path] = data
+
+    return ArrayBars.from_array(queue.Queue(), shared.tickers, shared.index,
+                                data, shared.fields)
+
+
+def _run_one(args) -> Dict[str, Any]:
+    """Run one backtest in a worker and return its summary stats."""
+    (shared, strategy, params, ticker_list, initial_capital,
+     start_date, end_date, vectorized, kwargs) = args
+    bars = load_shared_bars(shared)
+
+    if vectorized:
+        backtest = VectorizedBacktest(ticker_list, initial_capital,
+                                      start_date, strategy,
+                                      end_date=end_date,
+                                      data_handler=bars,
+                                      strategy_params=params,
+                                      **kwargs)
+        return backtest.summary()
+
+    kwargs = dict(kwargs)
+
+    if kwargs.get('store') is None:
+        # the bars are already in the handler so the store only holds this
+        # run's portfolio.
+        kwargs['store'] = MemoryStore()
+
+    bars.store = kwargs['store']
+    backtest = Backtest(ticker_list, initial_capital, start_date, strategy,
+                        end_date=end_date,
+                        data_handler=bars,
+                        strategy_params=params,
+                        **kwargs)
+    backtest._run()
+    backtest.portfolio.create_equity_curve_df()
+    stats = summary_stats(backtest.portfolio.equity_curve)
+    stats['trades'] = backtest.fills
+    return stats
@@ -0,0 +1,248 @@
+"""
+A backtest that processes every bar at once instead of one event at a time.
+"""
+import datetime as dt
+import logging
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+import pytech.utils.common_utils as com_utils
+import pytech.utils.dt_utils as dt_utils
+import pytech.utils.pandas_utils as pd_utils
+from pytech.backtest.event import EventBus
+from pytech.data.handler import ArrayBars, DataHandler
+from pytech.store import AbstractStore
+from pytech.trading.commission import (
+    AbstractCommissionModel,
+    PerOrderCommissionModel
+)
+
+TRADING_DAYS = 252
+
+
+class VectorizedBacktest(object):
+    """
+    Run a backtest with array operations over a whole target weight matrix.
+
+    The strategy emits a target weight for every ticker on every bar via
+    :func:`Strategy.generate_target_weights`. Whenever the weight for a ticker
+    changes the position is rebalanced to ``weight * initial_capital`` worth
+    of shares at the bar's close, otherwise it is held.
+
+    The holdings are recorded the same way
+    :func:`AbstractPortfolio.update_timeindex` records them, meaning each row
+    reflects the positions held coming into that bar, valued at that bar's
+    adjusted close.
+
+    It is meant for quickly screening strategies and is **not** a drop in
+    replacement for :class:`Backtest` with a :class:`BasicPortfolio`:
+
+    * Every trade fills in full at the close of the bar its weight changed
+      on. There are no orders, so no limit or stop prices, partial fills or
+      fills on a later bar.
+    * Trades are only charged the ``commission_model``, there is no
+      slippage model.
+    * Cash is never checked, so a target that costs more than the cash on
+      hand is bought anyway and cash goes negative.
+    * Only ``generate_target_weights`` is used, the strategy's signals are
+      never generated.
+    """
+
+    def __init__(self,
+                 ticker_list,
+                 initial_capital,
+                 start_date,
+                 strategy,
+                 end_date=None,
+                 data_handler=None,
+                 commission_model=None,
+                 strategy_params: Dict[str, Any] = None,
+                 store: AbstractStore = None):
+        """
+        Initialize the backtest.
+
+        :param iterable ticker_list: A list of tickers.
+        :param initial_capital: Amount of starting capital.
+        :param start_date: The date to start the backtest as of.
+        :param strategy: The strategy class to backtest. It must implement
+            ``generate_target_weights``.
+        :param end_date: The date to end the backtest.
+        :param data_handler: Either an :class:`ArrayBars` class or an instance
+            of one that already has data loaded.
+            (default: :class:`ArrayBars`)
+        :param commission_model: The commission model to charge trades with.
+            (default: :class:`PerOrderCommissionModel`)
+        :param strategy_params: keyword arguments passed to the strategy's
+            constructor.
+        :param store: The store to read bars from. Defaults to
+            :func:`pytech.store.get_store`.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.ticker_list = com_utils.iterable_to_set(ticker_list)
+        self.initial_capital = initial_capital
+        self.start_date = dt_utils.parse_date(start_date)
+
+        if end_date is None:
+            self.end_date = dt.datetime.utcnow()
+        else:
+            self.end_date = dt_utils.parse_date(end_date)
+
+        self.strategy_cls = strategy
+        self.strategy_params = strategy_params or {}
+        self.events = EventBus()
+
+        if data_handler is None:
+            data_handler = ArrayBars
+
+        if isinstance(data_handler, DataHandler):
+            self.data_handler = data_handler
+        else:
+            self.data_handler = data_handler(self.events,
+                                             self.ticker_list,
+                                             self.start_date,
+                                             self.end_date,
+                                             store=store)
+
+        if not isinstance(self.data_handler, ArrayBars):
+            raise TypeError('data_handler must be an ArrayBars. '
+                            f'{type(self.data_handler)} was provided')
+
+        if commission_model is None:
+            self.commission_model = PerOrderCommissionModel()
+        elif isinstance(commission_model, AbstractCommissionModel):
+            self.commission_model = commission_model
+        else:
+            raise TypeError('commission_model must be a subclass of '
+                            'AbstractCommissionModel. '
+                            f'{type(commission_model)} was provided')
+
+        self.strategy = self.strategy_cls(self.data_handler, self.events,
+                                          **self.strategy_params)
+        self.holdings = None
+        self.positions = None
+        self.trades = None
+        self.equity_curve = None
+
+    def run(self) -> pd.DataFrame:
+        """
+        Run the backtest.
+
+        :return: The holdings with a column for the market value of each
+            ticker as well as ``cash``, ``commission`` and ``total``.
+        """
+        close = self.data_handler.get_panel(pd_utils.CLOSE_COL).ffill()
+        adj_close = self.data_handler.get_panel(pd_utils.ADJ_CLOSE_COL).ffill()
+
+        weights = (self.strategy.generate_target_weights(close)
+                   .reindex(index=close.index, columns=close.columns)
+                   .fillna(0.0))
+
+        price = close.values
+        w = weights.values
+
+        # only trade when the target changes.
+        changed = np.ones(w.shape, dtype=bool)
+        changed[1:] = w[1:] != w[:-1]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            target = np.trunc(w * self.initial_capital / price)
+
+        target[~changed] = np.nan
+        # tickers without a price can't be traded until the target changes.
+        shares = pd.DataFrame(target).ffill().fillna(0.0).values
+
+        trades = np.empty(shares.shape)
+        trades[0] = shares[0]
+        trades[1:] = shares[1:] - shares[:-1]
+        traded = trades != 0
+
+        trade_value = np.where(traded, trades * price, 0.0)
+        commission = np.where(traded,
+                              self.commission_model.calculate_many(
+                                      trades, np.where(traded, price, 0.0)),
+                              0.0)
+
+        cash_after = (self.initial_capital
+                      - np.cumsum(trade_value.sum(axis=1)
+                                  + commission.sum(axis=1)))
+        commission_after = np.cumsum(commission.sum(axis=1))
+
+        # shift everything by one bar so each row is the state coming into it.
+        held = np.zeros(shares.shape)
+        held[1:] = shares[:-1]
+        cash = np.empty(len(cash_after))
+        cash[0] = self.initial_capital
+        cash[1:] = cash_after[:-1]
+        total_commission = np.zeros(len(commission_after))
+        total_commission[1:] = commission_after[:-1]
+
+        market_value = np.where(held != 0, held * adj_close.values, 0.0)
+
+        holdings = pd.DataFrame(market_value,
+                                index=close.index,
+                                columns=close.columns)
+        holdings['cash'] = cash
+        holdings['commission'] = total_commission
+        holdings['total'] = cash + market_value.sum(axis=1)
+        holdings.index.name = 'datetime'
+
+        self.holdings = holdings
+        self.positions = pd.DataFrame(shares, index=close.index,
+                                      columns=close.columns)
+        self.trades = pd.DataFrame(trades, index=close.index,
+                                   columns=close.columns)
+        self.create_equity_curve_df()
+        return holdings
+
+    def create_equity_curve_df(self):
+        """Create a df from the holdings."""
+        curve = self.holdings.copy()
+        curve['returns'] = curve['total'].pct_change()
+        curve['equity_curve'] = (1.0 + curve['returns']).cumprod()
+        self.equity_curve = curve
+
+    def summary(self) -> Dict[str, float]:
+        """Summary statistics of the run, see :func:`summary_stats`."""
+        if self.equity_curve is None:
+            self.run()
+
+        stats = summary_stats(self.equity_curve)
+        stats['trades'] = int(np.count_nonzero(self.trades.values))
+        return stats
+
+
+def summary_stats(equity_curve: pd.DataFrame) -> Dict[str, float]:
+    """
+    Calculate summary statistics for an equity curve.
+
+    :param equity_curve: A frame with at least a ``total`` and a
+        ``commission`` column, such as the one created by
+        ``create_equity_curve_df``.
+    :return: A dict with the total return, annualized return, annualized
+        volatility, sharpe ratio (assuming a 0 risk free rate), max drawdown
+        and the total commission paid.
+    """
+    total = equity_curve['total']
+    returns = total.pct_change().dropna()
+    total_return = total.iat[-1] / total.iat[0] - 1
+    periods = max(len(returns), 1)
+    annual_return = (1 + total_return) ** (TRADING_DAYS / periods) - 1
+    annual_vol = returns.std() * np.sqrt(TRADING_DAYS)
+
+    if annual_vol:
+        sharpe = returns.mean() / returns.std() * np.sqrt(TRADING_DAYS)
+    else:
+        sharpe = np.nan
+
+    drawdown = total / total.cummax() - 1
+
+    return {
+        'total_return': total_return,
+        'annual_return': annual_return,
+        'annual_volatility': annual_vol,
+        'sharpe': sharpe,
+        'max_drawdown': drawdown.min(),
+        'commission': equity_curve['commission'].iat[-1]
+    }
@@ -2,7 +2,7 @@ import datetime as dt
 import logging
 import queue
 from abc import ABCMeta, abstractmethod
-from typing import Dict, Iterable, Union
+from typing import Dict, Iterable, Sequence, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -11,6 +11,9 @@ import pytech.utils as utils
 from pytech.decorators.decorators import memoize, lazy_property
 from pytech.backtest.event import MarketEvent
 from pytech.data.reader import BarReader
+from pytech.data.resample import Resampler, Timeframe, aggregate, bin_bounds
+from pytech.fin.analysis.online import OnlineIndicator
+from pytech.store import AbstractStore
 
 
 class DataHandler(metaclass=ABCMeta):
@@ -23,7 +26,8 @@ class DataHandler(metaclass=ABCMeta):
                  start_date: dt.datetime,
                  end_date: dt.datetime,
                  asset_lib_name: str = 'pytech.bars',
-                 market_lib_name: str = 'pytech.market'):
+                 market_lib_name: str = 'pytech.market',
+                 store: AbstractStore = None):
         """
         All child classes MUST call this constructor.
 
@@ -36,6 +40,8 @@ class DataHandler(metaclass=ABCMeta):
             bars are stored. Defaults to *pytech.bars*
         :param market_lib_name: The name of the mongo library where market
             bars are stored. Defaults to *pytech.market*
+        :param store: The store to read bars from. Defaults to
+            :func:`pytech.store.get_store`.
         """
         self.logger = logging.getLogger(__name__)
         self.events = events
@@ -48,14 +54,56 @@ class DataHandler(metaclass=ABCMeta):
         self.end_date = utils.parse_date(end_date)
         self.asset_lib_name = asset_lib_name
         self.market_lib_name = market_lib_name
-        self.asset_reader = BarReader(asset_lib_name)
-        self.market_reader = BarReader(market_lib_name)
+        self.store = store
+        # ticker -> {indicator key: indicator}
+        self.indicators = {}
         # self._populate_ticker_data()
 
+    @lazy_property
+    def asset_reader(self) -> BarReader:
+        # created lazily so handlers built from data already in memory never
+        # connect to the db.
+        return BarReader(self.asset_lib_name, self.store)
+
+    @lazy_property
+    def market_reader(self) -> BarReader:
+        return BarReader(self.market_lib_name, self.store)
+
     @lazy_property
     def ticker_data(self):
         return self._populate_ticker_data()
 
+    def subscribe(self, ticker: str,
+                  indicator: OnlineIndicator) -> OnlineIndicator:
+        """
+        Update an online indicator with every new bar of a ticker.
+
+        If an indicator with the same key is already subscribed to for the
+        ticker then that one is returned instead, so strategies that use the
+        same indicator share it and it is only updated once per bar.
+
+        :param ticker: The ticker to feed the indicator.
+        :param indicator: The indicator to subscribe.
+        :return: The subscribed indicator.
+        """
+        if ticker not in self.tickers:
+            raise KeyError(f'{ticker} is not available in the given data '
+                           'set.')
+
+        subscribed = self.indicators.setdefault(ticker, {})
+        return subscribed.setdefault(indicator.key, indicator)
+
+    def _update_indicators(self, ticker: str, bar) -> None:
+        """Update every indicator subscribed to ``ticker`` with ``bar``."""
+        for indicator in self.indicators.get(ticker, {}).values():
+            indicator.update(bar)
+
+    def close(self) -> None:
+        """
+        Release anything held while the backtest runs, it is called once the
+        backtest stops. Does nothing by default.
+        """
+
     @abstractmethod
     def get_latest_bar(self, ticker: str):
         """
@@ -88,6 +136,30 @@ class DataHandler(metaclass=ABCMeta):
         """
         raise NotImplementedError('Must implement get_latest_bar_dt()')
 
+    def get_latest_bar_ts(self, ticker: str) -> int:
+        """
+        Return the datetime of the last bar for the given ticker as
+        nanoseconds since the epoch in UTC.
+
+        This is what should be used in anything that runs on every bar,
+        convert it with :func:`dt_utils.from_ns` only when a datetime is
+        actually needed.
+
+        :param str ticker: The ticker of the asset.
+        """
+        return utils.to_ns(self.get_latest_bar_dt(ticker))
+
+    def get_current_ts(self) -> int:
+        """
+        Return the datetime of the latest update as nanoseconds since the
+        epoch in UTC.
+
+        The tickers are aligned by default so this is the date of the first
+        ticker's latest bar, handlers that do not align the tickers must
+        override it.
+        """
+        return self.get_latest_bar_ts(self.tickers[0])
+
     @abstractmethod
     def get_latest_bar_value(self, ticker: str, val_type, n=1):
         """
@@ -128,10 +200,22 @@ class Bars(DataHandler):
                  end_date: dt.datetime,
                  source: str = 'google',
                  asset_lib_name: str = 'pytech.bars',
-                 market_lib_name: str = 'pytech.market'):
+                 market_lib_name: str = 'pytech.market',
+                 store: AbstractStore = None,
+                 timeframe: str = None):
+        """
+        :param timeframe: A pandas frequency such as ``W`` or ``H`` to
+            resample the stored bars to, the resampled bars are cached in
+            the asset library. Defaults to the stored bars.
+        """
         self.source = source
+        self.timeframe = timeframe
         super().__init__(events, tickers, start_date, end_date,
-                         asset_lib_name, market_lib_name)
+                         asset_lib_name, market_lib_name, store)
+
+    @lazy_property
+    def resampler(self) -> Resampler:
+        return Resampler(self.asset_lib_name, self.store)
 
     def _populate_ticker_data(self) -> Dict[str, Iterable[pd.Series]]:
         """
@@ -172,19 +256,19 @@ class Bars(DataHandler):
         market. If None is passed then no market_ticker will be used.
         :return: The aggregate data frame.
         """
-        agg_df = pd.DataFrame()
         df_dict = self._get_data()
+        cols = {}
 
         if market_ticker is not None and market_ticker not in self.tickers:
             # get the market data if it has not already been fetched
             market_df = self.market_reader.get_data(market_ticker, columns=col)
-            agg_df[market_ticker] = market_df[col]
+            cols[market_ticker] = market_df[col]
 
         for t in self.tickers:
-            temp_df = df_dict[t]
-            agg_df[t] = temp_df[col]
+            cols[t] = df_dict[t][col]
 
-        return agg_df
+        # build the frame at once instead of inserting a column per ticker.
+        return pd.concat(list(cols.values()), axis=1, keys=list(cols.keys()))
 
     @memoize
     def _get_data(self,
@@ -193,6 +277,9 @@ class Bars(DataHandler):
         """
         Get the data.
 
+        Every ticker that is already in the DB is read with a single
+        :func:`read_many` query by the :class:`BarReader`.
+
         :param tickers: any extra tickers to get data for.
         :return:
         """
@@ -202,6 +289,11 @@ class Bars(DataHandler):
         else:
             tickers = self.tickers
 
+        if self.timeframe is not None:
+            return self.resampler.read_many(tickers, self.timeframe,
+                                            start=self.start_date,
+                                            end=self.end_date)
+
         return self.asset_reader.get_data(tickers,
                                           source=self.source,
                                           start=self.start_date,
@@ -259,6 +351,16 @@ class Bars(DataHandler):
         else:
             return utils.dt_utils.parse_date(bars_list[-1].name)
 
+    def get_latest_bar_ts(self, ticker) -> int:
+        try:
+            bars_list = self.latest_ticker_data[ticker]
+        except KeyError:
+            self.logger.exception(
+                    f'Could not find {ticker} in latest_ticker_data')
+            raise
+        else:
+            return utils.to_ns(bars_list[-1].name)
+
     def get_latest_bar_value(self, ticker, val_type, n=1):
         """
         Get the last ``n`` bars but return a series containing only the
@@ -290,5 +392,294 @@ class Bars(DataHandler):
             else:
                 if bar is not None:
                     self.latest_ticker_data[ticker].append(bar)
+                    self._update_indicators(ticker, bar)
 
         self.events.put(MarketEvent())
+
+
+class ArrayBars(Bars):
+    """
+    A :class:`Bars` implementation that keeps every ticker's bars in a single
+    aligned :class:`np.ndarray` shaped ``(time, ticker, field)``.
+
+    Rather than appending a :class:`pd.Series` for every bar,
+    :func:`update_bars` only advances a cursor into the array, and all of the
+    ``get_latest_*`` methods return views into it so no bar is ever copied.
+    """
+
+    def __init__(self,
+                 events: queue.Queue,
+                 tickers: Iterable,
+                 start_date: dt.datetime,
+                 end_date: dt.datetime,
+                 source: str = 'google',
+                 asset_lib_name: str = 'pytech.bars',
+                 market_lib_name: str = 'pytech.market',
+                 fields: Sequence[str] = utils.OHLCV_COLS,
+                 store: AbstractStore = None,
+                 timeframe: str = None):
+        """
+        :param fields: The columns to load for each ticker. The order of
+            ``fields`` is the order of the last axis of the array.
+        """
+        super().__init__(events, tickers, start_date, end_date, source,
+                         asset_lib_name, market_lib_name, store, timeframe)
+        self.fields = tuple(fields)
+        self.field_idx = {f: i for i, f in enumerate(self.fields)}
+        self.ticker_idx = {t: i for i, t in enumerate(self.tickers)}
+        # the position of the latest bar, -1 means no bars have been emitted.
+        self._cursor = -1
+        # key=freq, value=the Timeframe built from ticker_data.
+        self._timeframes: Dict[str, Timeframe] = {}
+
+    @classmethod
+    def from_array(cls,
+                   events: queue.Queue,
+                   tickers: Sequence[str],
+                   index: pd.DatetimeIndex,
+                   data: np.ndarray,
+                   fields: Sequence[str] = utils.OHLCV_COLS,
+                   **kwargs) -> 'ArrayBars':
+        """
+        Create an instance from bars that have already been loaded, such as
+        the ``ticker_data`` of another instance, without reading the db.
+
+        ``data`` is used as is, so it can be a read only
+        :class:`np.memmap` shared between processes.
+
+        :param events: The universal queue.
+        :param tickers: The tickers in the order of the ticker axis.
+        :param index: The dates of the time axis.
+        :param data: An array shaped ``(time, ticker, field)``.
+        :param fields: The columns in the order of the field axis.
+        :param kwargs: Passed to the constructor.
+        :return: The new instance.
+        """
+        index = pd.DatetimeIndex(index)
+        tickers = list(tickers)
+        shape = (len(index), len(tickers), len(fields))
+
+        if data.shape != shape or not len(index):
+            raise ValueError(f'data must be a non empty array shaped {shape}. '
+                             f'{data.shape} was provided.')
+
+        start_date = kwargs.pop('start_date', index[0])
+        end_date = kwargs.pop('end_date', index[-1])
+        bars = cls(events, tickers, start_date, end_date, fields=fields,
+                   **kwargs)
+        bars._index = index
+        bars.ticker_data = data
+        return bars
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        """The dates of every bar in ``ticker_data``."""
+        # make sure the data has been loaded.
+        _ = self.ticker_data
+        return self._index
+
+    @lazy_property
+    def index_ns(self) -> np.ndarray:
+        """``index`` as int64 nanoseconds since the epoch in UTC."""
+        return utils.to_ns(self.index)
+
+    @lazy_property
+    def records(self) -> np.ndarray:
+        """
+        A structured view of ``ticker_data`` shaped ``(time, ticker)`` where
+        each element is a bar that can be indexed by field name.
+        """
+        dtype = np.dtype([(f, self.ticker_data.dtype) for f in self.fields])
+        return self.ticker_data.view(dtype)[..., 0]
+
+    def get_panel(self, val_type: str) -> pd.DataFrame:
+        """
+        Return every loaded bar of one column with a row per date and a
+        column per ticker.
+
+        Unlike the ``get_latest_*`` methods this is **not** limited to the bars
+        that have been emitted, so it should only be used by code that
+        processes the whole backtest at once.
+
+        :param val_type: The column to return.
+        """
+        return pd.DataFrame(self.ticker_data[:, :, self.field_idx[val_type]],
+                            index=self.index,
+                            columns=self.tickers)
+
+    def _populate_ticker_data(self) -> np.ndarray:
+        """Load all of the tickers into one aligned array."""
+        self._index, data = stack_bars(self._get_data(), self.tickers,
+                                       self.fields)
+        return data
+
+    def _get_ticker_pos(self, ticker: str) -> int:
+        try:
+            return self.ticker_idx[ticker]
+        except KeyError:
+            self.logger.exception(
+                    f'{ticker} is not available in the given data set.')
+            raise
+
+    def _window(self, n: int) -> slice:
+        """Return the slice of the time axis for the last ``n`` bars."""
+        return slice(max(self._cursor - n + 1, 0), self._cursor + 1)
+
+    def get_latest_bar(self, ticker: str) -> np.void:
+        """
+        Return the latest bar as a record that is a view into the array.
+
+        :raises IndexError: If no bars have been emitted yet.
+        """
+        pos = self._get_ticker_pos(ticker)
+
+        if self._cursor < 0:
+            raise IndexError('No bars have been emitted yet.')
+
+        return self.records[self._cursor, pos]
+
+    def get_latest_bars(self, ticker: str, n: int = 1) -> np.ndarray:
+        """
+        Returns a view of the last ``n`` bars for the ticker.
+        If there is less than ``n`` bars available then n-k is returned.
+
+        :param str ticker: The ticker of the asset for which the bars are
+        needed.
+        :param int n: The number of bars to return.
+        (default: 1)
+        :return: A structured array of bars.
+        """
+        pos = self._get_ticker_pos(ticker)
+        return self.records[self._window(n), pos]
+
+    def get_latest_bar_dt(self, ticker: str) -> dt.datetime:
+        return utils.from_ns(self.get_latest_bar_ts(ticker))
+
+    def get_latest_bar_ts(self, ticker: str) -> int:
+        self._get_ticker_pos(ticker)
+
+        if self._cursor < 0:
+            raise IndexError('No bars have been emitted yet.')
+
+        return int(self.index_ns[self._cursor])
+
+    def get_latest_bar_value(self, ticker: str, val_type: str, n: int = 1):
+        """
+        Get a view of the ``val_type`` column of the last ``n`` bars.
+
+        :param str ticker: The ticker of the asset for which the bars are
+        needed.
+        :param val_type: The column to return.
+        :param n: The number of bars.
+        :return: A 1-D array that is a view into ``ticker_data``.
+        """
+        pos = self._get_ticker_pos(ticker)
+        return self.ticker_data[self._window(n), pos, self.field_idx[val_type]]
+
+    def _timeframe(self, freq: str) -> Timeframe:
+        """Resample ``ticker_data`` to ``freq`` the first time it is used."""
+        try:
+            return self._timeframes[freq]
+        except KeyError:
+            labels, starts, ends = bin_bounds(self.index, freq)
+            data = aggregate(self.ticker_data, starts, ends, self.fields)
+            tf = self._timeframes[freq] = Timeframe(labels, data, ends)
+            return tf
+
+    def _timeframe_window(self, tf: Timeframe, n: int) -> slice:
+        """
+        Return the slice of the last ``n`` bars of ``tf`` whose last base bar
+        has been emitted, so a period is never seen before it is over.
+        """
+        done = int(np.searchsorted(tf.ends, self._cursor, side='right'))
+        return slice(max(done - n, 0), done)
+
+    def get_latest_timeframe_bars(self, ticker: str, freq: str,
+                                  n: int = 1) -> pd.DataFrame:
+        """
+        Return the last ``n`` completed bars of the ticker resampled to a
+        higher timeframe, built from the same bars and cursor as every other
+        ``get_latest_*`` method.
+
+        :param ticker: The ticker of the asset for which the bars are needed.
+        :param freq: A pandas frequency, such as ``W`` for daily bars.
+        :param n: The number of bars to return.
+        :return: A frame indexed by the period labels.
+        """
+        pos = self._get_ticker_pos(ticker)
+        tf = self._timeframe(freq)
+        window = self._timeframe_window(tf, n)
+        return pd.DataFrame(tf.data[window, pos], index=tf.index[window],
+                            columns=self.fields)
+
+    def get_latest_timeframe_value(self, ticker: str, freq: str,
+                                   val_type: str, n: int = 1) -> np.ndarray:
+        """
+        Get a view of the ``val_type`` column of the last ``n`` completed
+        bars of a higher timeframe.
+
+        :param ticker: The ticker of the asset for which the bars are needed.
+        :param freq: A pandas frequency.
+        :param val_type: The column to return.
+        :param n: The number of bars.
+        """
+        pos = self._get_ticker_pos(ticker)
+        tf = self._timeframe(freq)
+        return tf.data[self._timeframe_window(tf, n), pos,
+                       self.field_idx[val_type]]
+
+    def update_bars(self):
+        if self._cursor + 1 >= len(self.index):
+            self.continue_backtest = False
+            return
+
+        self._cursor += 1
+
+        if self._cursor + 1 >= len(self.index):
+            # that was the last bar.
+            self.continue_backtest = False
+
+        for ticker in self.indicators:
+            pos = self.ticker_idx[ticker]
+
+            if np.isnan(self.ticker_data[self._cursor, pos]).all():
+                # the ticker has no bar at this date, it was only aligned.
+                continue
+
+            self._update_indicators(ticker, self.records[self._cursor, pos])
+
+        self.events.put(MarketEvent())
+
+
+def stack_bars(df_dict: Dict[str, pd.DataFrame],
+               tickers: Sequence[str],
+               fields: Sequence[str] = utils.OHLCV_COLS
+               ) -> Tuple[pd.DatetimeIndex, np.ndarray]:
+    """
+    Align a dict of OHLCV frames on the union of their indexes and stack them
+    into one ``(time, ticker, field)`` array.
+
+    :param df_dict: The frames keyed by ticker.
+    :param tickers: The tickers to stack, in the order of the ticker axis.
+    :param fields: The columns to stack, in the order of the field axis.
+    :return: The aligned index and the array. Dates or columns that are
+        missing for a ticker are filled with ``NaN``.
+    """
+    index = None
+
+    for t in tickers:
+        idx = df_dict[t].index
+        index = idx if index is None else index.union(idx)
+
+    if index is None:
+        index = pd.DatetimeIndex([])
+    elif not index.is_monotonic_increasing:
+        index = index.sort_values()
+
+    data = np.full((len(index), len(tickers), len(fields)), np.nan)
+
+    for i, t in enumerate(tickers):
+        df = df_dict[t].reindex(index=index, columns=fields)
+        data[:, i, :] = df.values
+
+    return index, data
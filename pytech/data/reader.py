@@ -4,11 +4,15 @@ database to be accessed later.
 """
 import datetime as dt
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Iterable, Union, Tuple
 
 import numpy as np
 import pandas as pd
 import pandas_datareader as pdr
+import requests
 from arctic.date import DateRange
 from arctic.exceptions import NoDataFoundException
 from pandas.tseries.offsets import BDay
@@ -17,10 +21,10 @@ from pandas_datareader._utils import RemoteDataError
 import pytech.utils.dt_utils as dt_utils
 import pytech.utils.pandas_utils as pd_utils
 from pytech.decorators.decorators import write_chunks
-from pytech.mongo import ARCTIC_STORE
-from pytech.mongo.barstore import BarStore
+from pytech.store import BAR_STORE, AbstractStore, get_store
 from pytech.utils.exceptions import DataAccessError
 from pytech.data._holders import DfLibName
+from pytech.data.resample import is_timeframe_symbol
 
 logger = logging.getLogger(__name__)
 
@@ -33,19 +37,102 @@ GOOGLE = 'google'
 FRED = 'fred'
 FAMA_FRENCH = 'famafrench'
 
+# the default number of tickers fetched at the same time.
+DEFAULT_MAX_WORKERS = 8
+
+
+class RateLimiter(object):
+    """
+    A thread safe token bucket that allows ``rate`` calls per ``per``
+    seconds with bursts of up to ``burst`` calls.
+    """
+
+    def __init__(self, rate: float, per: float = 1.0, burst: int = 1):
+        if rate <= 0 or per <= 0:
+            raise ValueError('rate and per must be greater than 0.')
+
+        self.rate = rate
+        self.per = per
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a call is allowed."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst,
+                                   self._tokens + (now - self._last)
+                                   * self.rate / self.per)
+                self._last = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) * self.per / self.rate
+
+            time.sleep(wait)
+
+
+# source -> RateLimiter, shared by every reader since the limit is the
+# source's and not the reader's.
+_rate_limiters = {}
+_thread_local = threading.local()
+
+
+def set_rate_limit(source: str, rate: Union[float, None],
+                   per: float = 1.0, burst: int = 1) -> None:
+    """
+    Limit the number of calls made to a web source.
+
+    :param source: The data source, such as ``google`` or ``yahoo``.
+    :param rate: The number of calls allowed every ``per`` seconds. ``None``
+        removes the limit.
+    :param per: The length of the period in seconds.
+    :param burst: The number of calls that can be made at once.
+    """
+    if rate is None:
+        _rate_limiters.pop(source, None)
+    else:
+        _rate_limiters[source] = RateLimiter(rate, per, burst)
+
+
+def get_session() -> requests.Session:
+    """
+    Return a :class:`requests.Session` for the current thread so that
+    connections are reused between calls.
+    """
+    try:
+        return _thread_local.session
+    except AttributeError:
+        _thread_local.session = requests.Session()
+        return _thread_local.session
+
 
 class BarReader(object):
     """Read and write data from the DB and the web."""
 
-    def __init__(self, lib_name: str):
+    def __init__(self, lib_name: str, store: AbstractStore = None,
+                 max_workers: int = DEFAULT_MAX_WORKERS):
+        """
+        :param lib_name: The name of the library to read and write bars to.
+        :param store: The store the library is in. Defaults to
+            :func:`get_store`.
+        :param max_workers: The number of tickers to fetch at the same time
+            when data for multiple tickers is requested.
+        """
         self.lib_name = lib_name
+        self.max_workers = max_workers
+        self.store = store if store is not None else get_store()
 
-        if lib_name not in ARCTIC_STORE.list_libraries():
+        if lib_name not in self.store.list_libraries():
             # create the lib if it does not already exist
-            ARCTIC_STORE.initialize_library(lib_name,
-                                            BarStore.LIBRARY_TYPE)
+            self.store.initialize_library(lib_name, BAR_STORE)
 
-        self.lib = ARCTIC_STORE[self.lib_name]
+        self.lib = self.store[self.lib_name]
 
     def get_data(self,
                  tickers: ticker_input,
@@ -54,6 +141,7 @@ class BarReader(object):
                  end: dt.datetime = None,
                  check_db: bool = True,
                  filter_data: bool = True,
+                 max_workers: int = None,
                  **kwargs) -> Union[pd.DataFrame, Dict[str, pd.DataFrame]]:
         """
         Get data and create a :class:`pd.DataFrame` from it.
@@ -75,6 +163,8 @@ class BarReader(object):
         :param check_db: Check the database first before making network call.
         :param filter_data: Filter data from the DB. Only used if `check_db` is
             `True`.
+        :param max_workers: The number of tickers to fetch at the same time,
+            defaults to the reader's ``max_workers``.
         :param kwargs: kwargs are passed blindly to `pandas_datareader`
         :return: A `dict[ticker, DataFrame]`.
         """
@@ -95,7 +185,7 @@ class BarReader(object):
             try:
                 return self._mult_tickers_get_data(tickers, source, start, end,
                                                    check_db, filter_data,
-                                                   **kwargs)
+                                                   max_workers, **kwargs)
             except DataAccessError as e:
                 raise e
 
@@ -106,21 +196,60 @@ class BarReader(object):
                                end: dt.datetime,
                                check_db: bool,
                                filter_data: bool,
+                               max_workers: int = None,
                                **kwargs) -> Dict[str, pd.DataFrame]:
-        """Download data for multiple tickers."""
+        """
+        Download data for multiple tickers, up to ``max_workers`` of them at
+        the same time.
+        """
         stocks = {}
         failed = []
         passed = []
+        tickers = list(tickers)
 
-        for t in tickers:
-            try:
-                df_lib_name = self._single_get_data(t, source, start, end,
-                                                  check_db, filter_data,
-                                                  **kwargs)
+        if max_workers is None:
+            max_workers = self.max_workers
+
+        if check_db:
+            # read everything that is in the db in one go so that only the
+            # missing data needs to be fetched per ticker.
+            db_dfs = self._from_db_many(tickers, start, end, filter_data,
+                                        **kwargs)
+        else:
+            db_dfs = {}
+
+        def get_one(t):
+            if t in db_dfs:
+                return self._fill_gaps(t, db_dfs[t], source, start, end)
+
+            return self._single_get_data(t, source, start, end, False,
+                                         filter_data, **kwargs)
+
+        if max_workers > 1 and len(tickers) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [(t, executor.submit(get_one, t)) for t in tickers]
+                results = []
+
+                for t, future in futures:
+                    try:
+                        results.append((t, future.result()))
+                    except DataAccessError as e:
+                        results.append((t, e))
+        else:
+            results = []
+
+            for t in tickers:
+                try:
+                    results.append((t, get_one(t)))
+                except DataAccessError as e:
+                    results.append((t, e))
+
+        for t, df_lib_name in results:
+            if isinstance(df_lib_name, DataAccessError):
+                failed.append(t)
+            else:
                 stocks[t] = df_lib_name.df
                 passed.append(t)
-            except DataAccessError:
-                failed.append(t)
 
         if len(passed) == 0:
             raise DataAccessError('No data could be retrieved.')
@@ -168,8 +297,14 @@ class BarReader(object):
                   **kwargs) -> DfLibName:
         """Retrieve data from a web source"""
         _ = kwargs.pop('columns', None)
+        kwargs.setdefault('session', get_session())
 
         try:
+            limiter = _rate_limiters.get(source)
+
+            if limiter is not None:
+                limiter.acquire()
+
             logger.info(f'Making call to {source}. Start date: {start},'
                         f'End date: {end}')
             df = pdr.DataReader(ticker, data_source=source, start=start,
@@ -227,7 +362,42 @@ class BarReader(object):
                     f'Error reading DB for ticker: {ticker}') from e
 
         logger.debug(f'Found ticker: {ticker} in DB.')
+        return self._fill_gaps(ticker, df, source, start, end)
+
+    def _from_db_many(self,
+                      tickers: Iterable[str],
+                      start: dt.datetime,
+                      end: dt.datetime,
+                      filter_data: bool = True,
+                      **kwargs) -> Dict[str, pd.DataFrame]:
+        """
+        Read every ticker that is in the DB with one query.
 
+        :return: The data frames keyed by ticker, tickers that are not in
+            the DB are left out.
+        """
+        chunk_range = DateRange(start=start, end=end)
+        columns = kwargs.pop('columns', None)
+
+        try:
+            logger.info(f'Checking DB for {len(tickers)} tickers.')
+            return self.lib.read_many(tickers, chunk_range=chunk_range,
+                                      columns=columns,
+                                      filter_data=filter_data, **kwargs)
+        except (NoDataFoundException, KeyError):
+            logger.info('None of the tickers were found in the DB.')
+            return {}
+
+    def _fill_gaps(self,
+                   ticker: str,
+                   df: pd.DataFrame,
+                   source: str,
+                   start: dt.datetime,
+                   end: dt.datetime) -> DfLibName:
+        """
+        Fetch any data that is missing from the start or end of the data
+        read from the DB.
+        """
         db_start = dt_utils.parse_date(df.index.min(axis=1))
         db_end = dt_utils.parse_date(df.index.max(axis=1))
 
@@ -252,8 +422,13 @@ class BarReader(object):
         return DfLibName(new_df, self.lib_name)
 
     def get_symbols(self):
+        """
+        Yield the tickers in the library, bars cached by a
+        :class:`Resampler` are skipped.
+        """
         for s in self.lib.list_symbols():
-            yield s
+            if not is_timeframe_symbol(s):
+                yield s
 
 
 def _concat_dfs(lower_df: pd.DataFrame,
@@ -0,0 +1,390 @@
+"""
+Build higher timeframe OHLCV bars, such as weekly bars from daily bars or
+hourly bars from minute bars, from the bars in a store.
+
+Derived bars are cached in the same library as the base bars under
+``ticker@freq`` so they are only built once, and the base bars are read and
+aggregated one window at a time so they never have to fit in memory.
+"""
+import logging
+from collections import namedtuple
+from typing import Dict, Iterable, Iterator, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from arctic.date import DateRange
+from arctic.exceptions import NoDataFoundException
+from pandas.tseries.frequencies import to_offset
+
+import pytech.utils.dt_utils as dt_utils
+import pytech.utils.pandas_utils as pd_utils
+from pytech.store import AbstractStore, get_store
+from pytech.utils.exceptions import DataAccessError
+
+logger = logging.getLogger(__name__)
+
+# how each column is aggregated, columns that are not here use the last value.
+AGGREGATIONS = {
+    pd_utils.OPEN_COL: 'first',
+    pd_utils.HIGH_COL: 'max',
+    pd_utils.LOW_COL: 'min',
+    pd_utils.CLOSE_COL: 'last',
+    pd_utils.ADJ_CLOSE_COL: 'last',
+    pd_utils.VOL_COL: 'sum',
+}
+
+TIMEFRAME_SEP = '@'
+
+# the bars of a higher timeframe, ``ends`` is the position of the last base
+# bar in each of them.
+Timeframe = namedtuple('Timeframe', ['index', 'data', 'ends'])
+
+
+def timeframe_symbol(ticker: str, freq: str) -> str:
+    """The symbol that ``ticker``'s bars resampled to ``freq`` are cached as."""
+    return f'{ticker}{TIMEFRAME_SEP}{freq}'
+
+
+def bin_bounds(index: pd.DatetimeIndex,
+               freq: str) -> Tuple[pd.DatetimeIndex, np.ndarray, np.ndarray]:
+    """
+    Find the bars of ``index`` that fall in each ``freq`` period.
+
+    The periods are the same as :func:`pd.DataFrame.resample`'s, including
+    its labels. Intraday frequencies should divide a day evenly so the
+    periods do not depend on the first date in ``index``.
+
+    :param index: The sorted dates of the base bars.
+    :param freq: A pandas frequency.
+    :return: The label of every period that has at least one bar and the
+        positions of the first and last bar in each one.
+    """
+    if not len(index):
+        empty = np.array([], dtype=np.intp)
+        return pd.DatetimeIndex([], name=index.name), empty, empty
+
+    pos = pd.Series(np.arange(len(index)), index=index).resample(freq)
+    bounds = pd.DataFrame({'start': pos.min(), 'end': pos.max()}).dropna()
+    return (bounds.index,
+            bounds['start'].values.astype(np.intp),
+            bounds['end'].values.astype(np.intp))
+
+
+def aggregate(data: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+              fields: Sequence[str]) -> np.ndarray:
+    """
+    Aggregate the base bars between each ``start`` and ``end`` into one bar.
+
+    ``NaN`` is skipped the same way pandas skips it, so a bar's open is its
+    first value that is not ``NaN``.
+
+    :param data: The base bars with time on the first axis and the fields
+        on the last, e.g. ``(time, field)`` or ``(time, ticker, field)``.
+    :param starts: The position of the first base bar of each new bar, from
+        :func:`bin_bounds`. Every base bar must be in one of them.
+    :param ends: The position of the last base bar of each new bar.
+    :param fields: The name of each field, see :data:`AGGREGATIONS`.
+    :return: An array shaped like ``data`` with a row per new bar.
+    """
+    data = np.asarray(data, dtype=float)
+    out = np.empty((len(starts),) + data.shape[1:])
+
+    if not len(starts):
+        return out
+
+    for i, field in enumerate(fields):
+        how = AGGREGATIONS.get(field, 'last')
+        out[..., i] = _reduce(data[..., i], starts, ends, how)
+
+    return out
+
+
+def _reduce(x: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+            how: str) -> np.ndarray:
+    valid = ~np.isnan(x)
+
+    if how == 'max':
+        return np.fmax.reduceat(x, starts, axis=0)
+    elif how == 'min':
+        return np.fmin.reduceat(x, starts, axis=0)
+    elif how == 'sum':
+        return np.add.reduceat(np.where(valid, x, 0), starts, axis=0)
+
+    # broadcast the positions along the time axis.
+    shape = (-1,) + (1,) * (x.ndim - 1)
+    pos = np.arange(len(x)).reshape(shape)
+
+    if how == 'first':
+        found = np.minimum.reduceat(np.where(valid, pos, len(x)), starts,
+                                    axis=0)
+        ok = found <= ends.reshape(shape)
+    else:
+        found = np.maximum.reduceat(np.where(valid, pos, -1), starts, axis=0)
+        ok = found >= starts.reshape(shape)
+
+    # pair each found position with its place along the other axes, the same
+    # as ``np.take_along_axis`` which needs numpy 1.15.
+    idx = [np.where(ok, found, 0)]
+
+    for axis in range(1, x.ndim):
+        axis_shape = [1] * x.ndim
+        axis_shape[axis] = -1
+        idx.append(np.arange(x.shape[axis]).reshape(axis_shape))
+
+    values = x[tuple(idx)]
+    return np.where(ok, values, np.nan)
+
+
+def resample_ohlcv(df: pd.DataFrame, freq: str) -> pd.DataFrame:
+    """
+    Resample OHLCV bars to a higher timeframe.
+
+    :param df: The base bars, sorted by date.
+    :param freq: A pandas frequency such as ``W`` or ``15min``.
+    :return: A bar for every period that has base bars.
+    """
+    labels, starts, ends = bin_bounds(df.index, freq)
+    return _to_frame(df, labels, starts, ends)
+
+
+def _to_frame(df: pd.DataFrame, labels: pd.DatetimeIndex,
+              starts: np.ndarray, ends: np.ndarray) -> pd.DataFrame:
+    data = aggregate(df.values, starts, ends, list(df.columns))
+    return pd.DataFrame(data, index=labels, columns=df.columns)
+
+
+def resample_chunks(chunks: Iterable[pd.DataFrame],
+                    freq: str) -> Iterator[pd.DataFrame]:
+    """
+    Resample base bars that are read one chunk at a time.
+
+    A period can span two chunks so the base bars of the last period of each
+    chunk are held back and prepended to the next one. Only one chunk and
+    one period are ever in memory.
+
+    :param chunks: Consecutive frames of base bars, sorted by date. ``None``
+        and empty frames are skipped.
+    :param freq: A pandas frequency.
+    :return: The new bars, one frame per chunk that completed a period.
+    """
+    carry = None
+
+    for chunk in chunks:
+        if chunk is None or chunk.empty:
+            continue
+
+        if carry is not None:
+            chunk = pd.concat([carry, chunk])
+
+        labels, starts, ends = bin_bounds(chunk.index, freq)
+        # the last period may continue in the next chunk.
+        carry = chunk.iloc[starts[-1]:]
+
+        if len(labels) > 1:
+            yield _to_frame(chunk.iloc[:starts[-1]], labels[:-1],
+                            starts[:-1], ends[:-1])
+
+    if carry is not None:
+        yield resample_ohlcv(carry, freq)
+
+
+def is_timeframe_symbol(symbol: str) -> bool:
+    """Whether ``symbol`` holds resampled bars rather than a ticker's."""
+    return TIMEFRAME_SEP in symbol
+
+
+class Resampler(object):
+    """
+    Build and cache higher timeframes of the bars in a library.
+
+    The base bars of a ticker are read ``chunk_size`` at a time, so minute
+    bars spanning years can be resampled without loading all of them. Each
+    timeframe is written to the library as ``ticker@freq`` and only the
+    periods after the last cached one are rebuilt when new base bars are
+    written.
+    """
+
+    def __init__(self, lib_name: str = 'pytech.bars',
+                 store: AbstractStore = None,
+                 chunk_size: str = 'M'):
+        """
+        :param lib_name: The library the base bars are in and the resampled
+            bars are written to.
+        :param store: The store the library is in. Defaults to
+            :func:`get_store`.
+        :param chunk_size: A pandas frequency, the amount of base bars read
+            at once.
+        """
+        self.lib_name = lib_name
+        self.store = store if store is not None else get_store()
+        self.lib = self.store[lib_name]
+        self.chunk_size = chunk_size
+
+    def read(self, ticker: str, freq: str, start=None, end=None,
+             refresh: bool = False) -> pd.DataFrame:
+        """
+        Read a ticker's bars resampled to ``freq``, building or updating the
+        cached bars first if needed.
+
+        :param ticker: The ticker of the base bars.
+        :param freq: A pandas frequency.
+        :param start: The first date to return.
+        :param end: The last date to return.
+        :param refresh: Rebuild every bar instead of only the new ones.
+        :raises DataAccessError: If there are no base bars for the ticker.
+        """
+        self.ensure(ticker, freq, refresh)
+        return self.lib.read(timeframe_symbol(ticker, freq),
+                             chunk_range=DateRange(start, end))
+
+    def read_many(self, tickers: Iterable[str], freq: str, start=None,
+                  end=None) -> Dict[str, pd.DataFrame]:
+        """Read several tickers with :func:`read`, skipping missing ones."""
+        out = {}
+
+        for t in tickers:
+            try:
+                out[t] = self.read(t, freq, start, end)
+            except (DataAccessError, NoDataFoundException):
+                logger.warning(f'No bars to resample for ticker: {t}')
+
+        return out
+
+    def ensure(self, ticker: str, freq: str, refresh: bool = False) -> None:
+        """
+        Make sure the cached bars include every base bar.
+
+        :raises DataAccessError: If there are no base bars for the ticker.
+        """
+        start, end = self._date_range(ticker)
+        metadata = None if refresh else self._read_metadata(
+                timeframe_symbol(ticker, freq))
+
+        if metadata is None:
+            self.build(ticker, freq, start, end)
+        elif metadata['base_end'] < self._last_base_ns(ticker, start, end):
+            self.update(ticker, freq, metadata, end)
+
+    def build(self, ticker: str, freq: str, start=None, end=None) -> int:
+        """
+        Resample every base bar of a ticker and replace the cached bars.
+
+        :return: The number of bars written.
+        """
+        if start is None or end is None:
+            base_start, base_end = self._date_range(ticker)
+            start = base_start if start is None else start
+            end = base_end if end is None else end
+
+        symbol = timeframe_symbol(ticker, freq)
+        written = 0
+
+        for df, metadata in self._resample(ticker, freq, start, end):
+            if not written:
+                self.lib.write(symbol, df, metadata=metadata)
+            else:
+                self.lib.append(symbol, df, metadata=metadata)
+            written += len(df)
+
+        logger.info(f'Wrote {written} {freq} bars for ticker: {ticker}')
+        return written
+
+    def update(self, ticker: str, freq: str, metadata: Dict, end) -> int:
+        """
+        Rebuild the last cached bar, which may have been incomplete, and
+        every bar after it.
+
+        :param metadata: The metadata of the cached bars.
+        :return: The number of bars written.
+        """
+        symbol = timeframe_symbol(ticker, freq)
+        last = dt_utils.from_ns(metadata['last_label'])
+        written = 0
+
+        # every base bar of the last cached period is after this.
+        for df, metadata in self._resample(ticker, freq,
+                                           last - to_offset(freq), end):
+            df = df[df.index >= _as_index_tz(last, df.index)]
+
+            if df.empty:
+                continue
+
+            if not written:
+                # replace the last cached bar and anything after it.
+                self.lib.update(symbol, df, metadata=metadata,
+                                chunk_range=DateRange(df.index[0], None))
+            else:
+                self.lib.append(symbol, df, metadata=metadata)
+            written += len(df)
+
+        logger.info(f'Updated {written} {freq} bars for ticker: {ticker}')
+        return written
+
+    def iter_chunks(self, ticker: str, start, end) -> Iterator[pd.DataFrame]:
+        """Read a ticker's base bars ``chunk_size`` at a time."""
+        for window in dt_utils.date_windows(start, end, self.chunk_size):
+            df = self._read_window(ticker, window)
+
+            if df is not None:
+                yield df
+
+    def _resample(self, ticker: str, freq: str, start,
+                  end) -> Iterator[Tuple[pd.DataFrame, Dict]]:
+        """
+        Yield the resampled bars with the metadata to write them with.
+
+        The metadata has the last base bar read so far and the label of the
+        last new bar, once every chunk is read that is the last base bar.
+        """
+        last_base = []
+
+        def chunks():
+            for df in self.iter_chunks(ticker, start, end):
+                last_base[:] = [df.index[-1]]
+                yield df
+
+        for df in resample_chunks(chunks(), freq):
+            yield df, {'base': ticker,
+                       'freq': freq,
+                       'base_end': dt_utils.to_ns(last_base[0]),
+                       'last_label': dt_utils.to_ns(df.index[-1])}
+
+    def _read_window(self, ticker: str, window) -> pd.DataFrame:
+        try:
+            df = self.lib.read(ticker, chunk_range=DateRange(*window))
+        except (DataAccessError, NoDataFoundException):
+            # nothing in this window, e.g. a holiday.
+            return None
+
+        return None if df.empty else df
+
+    def _last_base_ns(self, ticker: str, start, end) -> int:
+        """The date of the last base bar, only the last chunks are read."""
+        windows = list(dt_utils.date_windows(start, end, self.chunk_size))
+
+        for window in reversed(windows):
+            df = self._read_window(ticker, window)
+
+            if df is not None:
+                return dt_utils.to_ns(df.index[-1])
+
+        raise DataAccessError(f'No data found for {ticker}.')
+
+    def _date_range(self, ticker: str):
+        try:
+            return self.lib.get_date_range(ticker)
+        except NoDataFoundException as e:
+            raise DataAccessError(f'No data found for {ticker}.') from e
+
+    def _read_metadata(self, symbol: str):
+        try:
+            return self.lib.read_metadata(symbol)
+        except (DataAccessError, NoDataFoundException):
+            return None
+
+
+def _as_index_tz(date: pd.Timestamp, index: pd.DatetimeIndex) -> pd.Timestamp:
+    """Convert a UTC timestamp to the timezone of ``index``."""
+    if index.tz is None:
+        return date.tz_convert(None)
+    return date.tz_convert(index.tz)
@@ -0,0 +1,313 @@
+"""
+A :class:`DataHandler` that streams bars from the store instead of loading
+every bar before the backtest starts.
+"""
+import datetime as dt
+import heapq
+import logging
+import queue
+import threading
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterable, Iterator, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from arctic.date import DateRange
+from arctic.exceptions import NoDataFoundException
+
+import pytech.utils as utils
+import pytech.utils.dt_utils as dt_utils
+from pytech.backtest.event import MarketEvent
+from pytech.data.handler import DataHandler
+from pytech.decorators.decorators import lazy_property
+from pytech.store import AbstractStore, get_store
+from pytech.utils.exceptions import DataAccessError
+
+logger = logging.getLogger(__name__)
+
+# a ticker's bars from one window, the int64 nanosecond dates and the bars.
+Chunk = Tuple[np.ndarray, np.ndarray]
+
+# put on the prefetch queue after the last window.
+_DONE = object()
+
+
+class StreamingBars(DataHandler):
+    """
+    A :class:`DataHandler` that reads the bars one ``chunk_size`` window at a
+    time while the backtest runs, so the length of a backtest is not limited
+    by memory.
+
+    The windows are read by a background thread that stays up to
+    ``prefetch`` windows ahead of the backtest. Each window's bars are merged
+    by date across every ticker, and :func:`update_bars` emits every bar
+    with the next date. Only the last ``lookback`` bars of each ticker are
+    kept, so asking for more than that with ``n`` returns ``lookback`` bars.
+
+    Unlike :class:`ArrayBars` the tickers are not aligned, a ticker that
+    has no bar at a date keeps its previous bar and a ticker that starts
+    late has no bars until its first date. Use :func:`get_current_ts` for
+    the date of the latest update.
+    """
+
+    def __init__(self,
+                 events: queue.Queue,
+                 tickers: Iterable,
+                 start_date: dt.datetime,
+                 end_date: dt.datetime,
+                 asset_lib_name: str = 'pytech.bars',
+                 market_lib_name: str = 'pytech.market',
+                 fields: Sequence[str] = utils.OHLCV_COLS,
+                 store: AbstractStore = None,
+                 chunk_size: str = 'M',
+                 lookback: int = 252,
+                 prefetch: int = 2):
+        """
+        :param fields: The columns to load for each ticker. Columns that are
+            missing for a ticker are ``NaN``.
+        :param chunk_size: A pandas frequency, the amount of bars read at
+            once. It should match the ``DateChunker`` of the library.
+        :param lookback: The number of bars to keep for each ticker.
+        :param prefetch: The number of windows to read ahead.
+        """
+        super().__init__(events, tickers, start_date, end_date,
+                         asset_lib_name, market_lib_name, store)
+        self.fields = tuple(fields)
+        self.field_idx = {f: i for i, f in enumerate(self.fields)}
+        self.ticker_idx = {t: i for i, t in enumerate(self.tickers)}
+        self.dtype = np.dtype([(f, float) for f in self.fields])
+        self.chunk_size = chunk_size
+        self.lookback = lookback
+        self.prefetch = prefetch
+        # the last ``lookback`` dates and bars of each ticker.
+        self._ts = [deque(maxlen=lookback) for _ in self.tickers]
+        self._bars = [deque(maxlen=lookback) for _ in self.tickers]
+        # the next (ts, ticker pos, bar) in the merged stream.
+        self._next = None
+        # the date of the latest update.
+        self.current_ts = None
+        self._exhausted = False
+        self._queue = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    @lazy_property
+    def lib(self):
+        store = self.store if self.store is not None else get_store()
+        return store[self.asset_lib_name]
+
+    def _populate_ticker_data(self) -> Iterator[Tuple[int, int, np.void]]:
+        """Start reading ahead and return the bars of every ticker by date."""
+        self._queue = queue.Queue(maxsize=max(self.prefetch, 1))
+        self._thread = threading.Thread(target=self._read_ahead,
+                                        args=(self.lib, self._queue),
+                                        name=f'{type(self).__name__}-prefetch',
+                                        daemon=True)
+        self._thread.start()
+        return self._merged()
+
+    def windows(self) -> Iterator[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        The ``(start, end)`` of each window to read, limited to the dates
+        that the tickers have data for.
+        """
+        start, end = self.start_date, self.end_date
+        bounds = []
+
+        for t in self.tickers:
+            try:
+                bounds.append(self.lib.get_date_range(t))
+            except (DataAccessError, NoDataFoundException):
+                logger.warning(f'No data found for ticker: {t}')
+
+        if not bounds:
+            return
+
+        start = max(start, utils.parse_date(min(b[0] for b in bounds)))
+        end = min(end, utils.parse_date(max(b[1] for b in bounds)))
+
+        if start <= end:
+            yield from dt_utils.date_windows(start, end, self.chunk_size)
+
+    def read_window(self, lib, window) -> Dict[int, Chunk]:
+        """
+        Read every ticker's bars in a window.
+
+        :return: key=ticker position, value=the dates and the bars as a
+            structured array. Tickers without bars are left out.
+        """
+        df_dict = lib.read_many(self.tickers, chunk_range=DateRange(*window))
+        out = {}
+
+        for t, df in df_dict.items():
+            if df is None or df.empty:
+                continue
+
+            if tuple(df.columns) != self.fields:
+                df = df.reindex(columns=self.fields)
+
+            values = df.values.astype(float)
+            bars = np.ascontiguousarray(values).view(self.dtype)[:, 0]
+            out[self.ticker_idx[t]] = (utils.to_ns(df.index), bars)
+
+        return out
+
+    def _read_ahead(self, lib, out: queue.Queue) -> None:
+        """Read the windows in order, run on the prefetch thread."""
+        try:
+            for window in self.windows():
+                chunk = self.read_window(lib, window)
+
+                if chunk and not self._put(out, chunk):
+                    return
+        except Exception as e:
+            logger.exception('Reading ahead failed.')
+            self._put(out, e)
+        finally:
+            self._put(out, _DONE)
+
+    def _put(self, out: queue.Queue, item) -> bool:
+        """Block until there is room or :func:`close` is called."""
+        while not self._stop.is_set():
+            try:
+                out.put(item, timeout=.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _chunks(self) -> Iterator[Dict[int, Chunk]]:
+        while True:
+            chunk = self._queue.get()
+
+            if chunk is _DONE:
+                return
+            elif isinstance(chunk, Exception):
+                raise chunk
+
+            yield chunk
+
+    def _merged(self) -> Iterator[Tuple[int, int, np.void]]:
+        """
+        Merge the bars of every ticker by date.
+
+        The windows do not overlap so only the tickers of one window have to
+        be merged at a time.
+        """
+        for chunk in self._chunks():
+            streams = [zip(ts.tolist(), [pos] * len(ts), bars)
+                       for pos, (ts, bars) in chunk.items()]
+            # a ticker has one bar per date so the bars are never compared.
+            yield from heapq.merge(*streams)
+
+    def close(self) -> None:
+        """Stop reading ahead, any bars that have been read are dropped."""
+        self._stop.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _advance(self):
+        try:
+            self._next = next(self.ticker_data)
+        except StopIteration:
+            self._next = None
+            self._exhausted = True
+            self.close()
+
+    def update_bars(self):
+        if self._next is None and not self._exhausted:
+            # the first call, this starts reading ahead.
+            self._advance()
+
+        if self._next is None:
+            self.continue_backtest = False
+            return
+
+        ts = self._next[0]
+        self.current_ts = ts
+
+        while self._next is not None and self._next[0] == ts:
+            _, pos, bar = self._next
+            # copy so the window the bar came from can be freed.
+            bar = bar.copy()
+            self._ts[pos].append(ts)
+            self._bars[pos].append(bar)
+            self._update_indicators(self.tickers[pos], bar)
+            self._advance()
+
+        if self._next is None:
+            # that was the last bar.
+            self.continue_backtest = False
+
+        self.events.put(MarketEvent())
+
+    def _get_ticker_pos(self, ticker: str) -> int:
+        try:
+            return self.ticker_idx[ticker]
+        except KeyError:
+            self.logger.exception(
+                    f'{ticker} is not available in the given data set.')
+            raise
+
+    def _latest(self, ticker: str, n: int) -> list:
+        bars = self._bars[self._get_ticker_pos(ticker)]
+        # walk back from the newest bar so only ``n`` bars are visited.
+        return list(islice(reversed(bars), n))[::-1]
+
+    def get_latest_bar(self, ticker: str) -> np.void:
+        """
+        Return the latest bar as a record that can be indexed by field.
+
+        :raises IndexError: If no bars have been emitted for the ticker yet.
+        """
+        bars = self._bars[self._get_ticker_pos(ticker)]
+
+        if not bars:
+            raise IndexError(f'No bars have been emitted for {ticker} yet.')
+
+        return bars[-1]
+
+    def get_latest_bars(self, ticker: str, n: int = 1) -> np.ndarray:
+        """
+        Returns the last ``n`` bars for the ticker, or fewer if less bars
+        are available.
+
+        :return: A structured array of bars.
+        """
+        return np.array(self._latest(ticker, n), dtype=self.dtype)
+
+    def get_latest_bar_dt(self, ticker: str) -> dt.datetime:
+        return utils.from_ns(self.get_latest_bar_ts(ticker))
+
+    def get_latest_bar_ts(self, ticker: str) -> int:
+        ts = self._ts[self._get_ticker_pos(ticker)]
+
+        if not ts:
+            raise IndexError(f'No bars have been emitted for {ticker} yet.')
+
+        return ts[-1]
+
+    def get_current_ts(self) -> int:
+        """
+        Return the date of the latest update, every ticker's latest bar is at
+        or before it.
+
+        :raises IndexError: If no bars have been emitted yet.
+        """
+        if self.current_ts is None:
+            raise IndexError('No bars have been emitted yet.')
+
+        return self.current_ts
+
+    def get_latest_bar_value(self, ticker: str, val_type: str, n: int = 1):
+        """
+        Get the ``val_type`` column of the last ``n`` bars.
+
+        :return: A 1-D array.
+        """
+        idx = self.field_idx[val_type]
+        return np.array([bar[idx] for bar in self._latest(ticker, n)],
+                        dtype=float)
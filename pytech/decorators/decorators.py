@@ -1,27 +1,293 @@
-from functools import wraps
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from functools import partial, update_wrapper, wraps
+from typing import Dict, Tuple
+
+import numpy as np
 import pandas as pd
 
 from arctic.chunkstore.chunkstore import ChunkStore
 
 import pytech.utils as utils
-from pytech.mongo import ARCTIC_STORE, BarStore
+from pytech.store import BAR_STORE, AbstractBarStore, get_store
 from pytech.utils.exceptions import InvalidStoreError, PyInvestmentKeyError
 from pandas.tseries.offsets import BDay
 from pytech.data._holders import DfLibName
 
 
-def memoize(obj):
-    """Memoize functions so they don't have to be reevaluated."""
-    cache = obj.cache = {}
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions',
+                                     'currsize', 'maxsize', 'nbytes',
+                                     'maxbytes'])
+
+# marks the start of the keyword arguments in a cache key.
+_KWARGS_MARK = object()
+
+
+class _LRUCache(object):
+    """
+    A least recently used cache that is bounded by the number of entries and
+    the approximate size of the values in bytes.
+    """
+
+    def __init__(self, maxsize: int = None, maxbytes: int = None,
+                 ttl: float = None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._lock = threading.RLock()
+        # key -> (value, nbytes, expires)
+        self._data = OrderedDict()
+
+    def get(self, key):
+        """
+        Return ``(True, value)`` if the key is cached and has not expired,
+        otherwise ``(False, None)``.
+        """
+        with self._lock:
+            try:
+                value, _, expires = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return False, None
+
+            if expires is not None and expires <= time.monotonic():
+                self._pop(key)
+                self.misses += 1
+                return False, None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def set(self, key, value) -> None:
+        nbytes = _sizeof(value) if self.maxbytes is not None else 0
+
+        if self.maxbytes is not None and nbytes > self.maxbytes:
+            # caching it would evict everything else and itself.
+            return
+
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+
+            self._data[key] = (value, nbytes, expires)
+            self.nbytes += nbytes
 
-    @wraps(obj)
-    def memoizer(*args, **kwargs):
-        key = str(args) + str(kwargs)
-        if key not in cache:
-            cache[key] = obj(*args, **kwargs)
-        return cache[key]
+            while self._data and self._over_limit():
+                self._pop(next(iter(self._data)))
+                self.evictions += 1
 
-    return memoizer
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions,
+                             len(self._data), self.maxsize, self.nbytes,
+                             self.maxbytes)
+
+    def _over_limit(self) -> bool:
+        if self.maxsize is not None and len(self._data) > self.maxsize:
+            return True
+        return self.maxbytes is not None and self.nbytes > self.maxbytes
+
+    def _pop(self, key) -> None:
+        _, nbytes, _ = self._data.pop(key)
+        self.nbytes -= nbytes
+
+
+class memoize(object):
+    """
+    Cache the return values of a function or method in a bounded LRU cache.
+
+    Can be used bare or with arguments::
+
+        @memoize
+        def get_data(self): ...
+
+        @memoize(maxsize=32, maxbytes=2 ** 30, ttl=600)
+        def make_agg_df(self, col): ...
+
+    The cache of a method is kept on the instance it is called on, so each
+    instance has its own cache and it is garbage collected with the instance.
+    Keys are built from the arguments themselves, arguments that are not
+    hashable such as lists, dicts, :class:`np.ndarray` and
+    :class:`pd.DataFrame` are converted to a hashable equivalent.
+
+    ``cache_info()`` and ``cache_clear()`` are available on the decorated
+    function and on bound methods.
+
+    :param maxsize: The maximum number of entries in a cache, ``None`` for no
+        limit.
+    :param maxbytes: The maximum approximate size of the values in a cache,
+        ``None`` for no limit.
+    :param ttl: The number of seconds an entry is valid for, ``None`` to keep
+        them until they are evicted.
+    """
+
+    def __init__(self, func=None, *, maxsize: int = 128,
+                 maxbytes: int = None, ttl: float = None):
+        self.func = func
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.ttl = ttl
+        self._cache = None
+        self._lock = threading.Lock()
+
+        if func is not None:
+            update_wrapper(self, func)
+            self.attr_name = f'_memoize_{func.__name__}'
+
+    def __call__(self, *args, **kwargs):
+        if self.func is None:
+            # used with arguments, so this is the function being decorated.
+            return type(self)(args[0], maxsize=self.maxsize,
+                              maxbytes=self.maxbytes, ttl=self.ttl)
+
+        return self._call(self._get_cache(), self.func, args, kwargs)
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        return _BoundMemoized(self, obj)
+
+    def cache_info(self) -> CacheInfo:
+        return self._get_cache().info()
+
+    def cache_clear(self) -> None:
+        self._get_cache().clear()
+
+    def new_cache(self) -> _LRUCache:
+        return _LRUCache(self.maxsize, self.maxbytes, self.ttl)
+
+    def instance_cache(self, obj) -> _LRUCache:
+        """Return the cache for ``obj``, creating it if it does not exist."""
+        try:
+            return obj.__dict__[self.attr_name]
+        except KeyError:
+            with self._lock:
+                return obj.__dict__.setdefault(self.attr_name,
+                                               self.new_cache())
+
+    @staticmethod
+    def _call(cache: _LRUCache, func, args, kwargs):
+        key = make_key(args, kwargs)
+        found, value = cache.get(key)
+
+        if not found:
+            value = func(*args, **kwargs)
+            cache.set(key, value)
+
+        return value
+
+    def _get_cache(self) -> _LRUCache:
+        if self._cache is None:
+            with self._lock:
+                if self._cache is None:
+                    self._cache = self.new_cache()
+        return self._cache
+
+
+class _BoundMemoized(object):
+    """A :class:`memoize` method bound to an instance."""
+
+    def __init__(self, memo: memoize, obj):
+        self.memo = memo
+        self.obj = obj
+        self.__wrapped__ = memo.func
+        self.__name__ = memo.func.__name__
+        self.__doc__ = memo.func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.memo._call(self.memo.instance_cache(self.obj),
+                               partial(self.memo.func, self.obj),
+                               args, kwargs)
+
+    def cache_info(self) -> CacheInfo:
+        return self.memo.instance_cache(self.obj).info()
+
+    def cache_clear(self) -> None:
+        self.memo.instance_cache(self.obj).clear()
+
+
+def make_key(args: Tuple, kwargs: Dict) -> Tuple:
+    """
+    Build a hashable cache key from the arguments of a call.
+
+    Keyword arguments are sorted so the order they are passed in does not
+    matter.
+    """
+    key = tuple(_hashable(a) for a in args)
+
+    if kwargs:
+        key += (_KWARGS_MARK,)
+        key += tuple((k, _hashable(v)) for k, v in sorted(kwargs.items()))
+
+    return key
+
+
+def _hashable(obj):
+    """Return ``obj`` or an equivalent hashable value."""
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        # pandas objects define __hash__ to raise so check them first.
+        # the per row hashes are digested in order so reordered rows get a
+        # different key, and the labels are kept since they are not hashed.
+        if isinstance(obj, pd.DataFrame):
+            labels = tuple(obj.columns)
+        else:
+            labels = obj.name
+        index = obj if isinstance(obj, pd.Index) else obj.index
+        row_hashes = pd.util.hash_pandas_object(obj, index=True).values
+        return (type(obj).__name__, obj.shape, labels, str(index.dtype),
+                hashlib.sha1(row_hashes.tobytes()).hexdigest())
+    elif isinstance(obj, np.ndarray):
+        return ('ndarray', obj.shape, str(obj.dtype),
+                hash(np.ascontiguousarray(obj).tobytes()))
+    elif isinstance(obj, (list, tuple)):
+        return (type(obj).__name__,) + tuple(_hashable(o) for o in obj)
+    elif isinstance(obj, dict):
+        return ('dict',) + tuple(sorted(((k, _hashable(v))
+                                         for k, v in obj.items()),
+                                        key=repr))
+    elif isinstance(obj, (set, frozenset)):
+        return frozenset(_hashable(o) for o in obj)
+
+    try:
+        hash(obj)
+    except TypeError:
+        return (type(obj).__name__, repr(obj))
+    else:
+        return obj
+
+
+def _sizeof(obj) -> int:
+    """Return the approximate size of ``obj`` in bytes."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    elif isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(index=True, deep=True))
+    elif isinstance(obj, np.ndarray):
+        return obj.nbytes
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(_sizeof(o) for o in obj)
+    elif isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(_sizeof(v) for v in obj.values())
+    elif hasattr(obj, 'df') and isinstance(obj.df, pd.DataFrame):
+        # a DfLibName or similar holder.
+        return sys.getsizeof(obj) + _sizeof(obj.df)
+    return sys.getsizeof(obj)
 
 
 def optional_arg_decorator(fn):
@@ -46,6 +312,10 @@ def write_chunks(chunk_size='D', remove_ticker=True):
     output to a :class:`ChunkStore`. It is required that the the wrapped
     function contains a column called 'ticker' to use as the key in the db.
 
+    If the wrapped function is a method of an object with a ``store``
+    attribute then the output is written to that store, otherwise it is
+    written to the one returned by :func:`get_store`.
+
     :param lib_name: The name of the library to write the
         :class:`pd.DataFrame` to.
     :param chunk_size: The chunk size to use options are:
@@ -87,15 +357,19 @@ def write_chunks(chunk_size='D', remove_ticker=True):
                     raise ValueError('df must be datetime indexed or have a'
                                      'column named "date".')
 
-            if lib_name not in ARCTIC_STORE.list_libraries():
+            store = getattr(args[0], 'store', None) if args else None
+
+            if store is None:
+                store = get_store()
+
+            if lib_name not in store.list_libraries():
                 # create the lib if it does not already exist
-                ARCTIC_STORE.initialize_library(lib_name,
-                                                BarStore.LIBRARY_TYPE)
+                store.initialize_library(lib_name, BAR_STORE)
 
-            lib = ARCTIC_STORE[lib_name]
+            lib = store[lib_name]
 
-            if not isinstance(lib, ChunkStore):
-                raise InvalidStoreError(required=ChunkStore,
+            if not isinstance(lib, (AbstractBarStore, ChunkStore)):
+                raise InvalidStoreError(required=AbstractBarStore,
                                         provided=type(lib))
             else:
                 lib.update(ticker, df, chunk_size=chunk_size, upsert=True)
@@ -0,0 +1,148 @@
+"""
+Array kernels behind the loop bound indicators in
+:mod:`pytech.fin.analysis.technical`.
+
+Everything here works on :class:`np.ndarray` and returns the exact values the
+original row by row implementations did. Recursive kernels are compiled with
+``numba`` when it is installed and run as plain Python otherwise.
+"""
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def _jit(f):
+    """Compile ``f`` with numba if it is available."""
+    if numba is None:
+        return f
+    return numba.njit(cache=True, nogil=True)(f)
+
+
+@_jit
+def _kama_loop(sc, ma, price, out):
+    started = False
+    prev = np.nan
+
+    for i in range(len(out)):
+        if started:
+            prev = prev + sc[i] * (price[i] - prev)
+        elif not np.isnan(ma[i]):
+            prev = ma[i] + sc[i] * (price[i] - ma[i])
+            started = True
+        out[i] = prev
+
+    return out
+
+
+def _kama_rows(sc, ma, price, out):
+    """Run the recursion for every column at once, one row at a time."""
+    started = np.zeros(out.shape[1], dtype=bool)
+    prev = np.full(out.shape[1], np.nan)
+
+    for i in range(len(out)):
+        seeded = ma[i] + sc[i] * (price[i] - ma[i])
+        prev = np.where(started, prev + sc[i] * (price[i] - prev),
+                        np.where(np.isnan(ma[i]), np.nan, seeded))
+        started |= ~np.isnan(ma[i])
+        out[i] = prev
+
+    return out
+
+
+def kama(sc: np.ndarray, ma: np.ndarray, price: np.ndarray) -> np.ndarray:
+    """
+    Kaufman's Adaptive Moving Average recursion.
+
+    The arrays are aligned by position along the first axis and the output is
+    as long as the shortest of them. The recursion starts from the first non
+    null ``ma`` and every value before it is NaN. 2-D arrays are computed for
+    each column.
+
+    :param sc: The smoothing constants.
+    :param ma: The moving average used to seed the recursion.
+    :param price: The prices.
+    """
+    n = min(len(sc), len(ma), len(price))
+    out = np.full((n,) + np.shape(price)[1:], np.nan)
+
+    if out.ndim == 2:
+        if numba is None:
+            return _kama_rows(sc[:n], ma[:n], price[:n], out)
+
+        for j in range(out.shape[1]):
+            out[:, j] = kama(sc[:n, j], ma[:n, j], price[:n, j])
+
+        return out
+
+    if numba is None:
+        # plain floats are much faster than numpy scalars in a python loop.
+        return np.array(_kama_loop(sc[:n].tolist(), ma[:n].tolist(),
+                                   price[:n].tolist(), out.tolist()),
+                        dtype=float)
+
+    return _kama_loop(np.ascontiguousarray(sc[:n], dtype=float),
+                      np.ascontiguousarray(ma[:n], dtype=float),
+                      np.ascontiguousarray(price[:n], dtype=float),
+                      out)
+
+
+def wma(price: np.ndarray, period: int) -> np.ndarray:
+    """
+    Weighted Moving Average with linear weights, the most recent price has a
+    weight of ``period``. The first ``period - 1`` values are NaN. 2-D
+    arrays are computed for each column.
+
+    The products are added in the same order as a loop over each window
+    would, so the result is identical to one.
+    """
+    n = len(price)
+    out = np.full(price.shape, np.nan)
+
+    if period > n:
+        return out
+
+    denominator = (period * (period + 1)) / 2
+    acc = np.zeros((n - period + 1,) + price.shape[1:])
+
+    for i in range(period):
+        acc += price[i:n - period + 1 + i] * ((i + 1) / denominator)
+
+    out[period - 1:] = acc
+    return out
+
+
+def gain_loss(price: np.ndarray):
+    """
+    Return the ``(gain, loss)`` for each row of the RSI where the change of a
+    row is ``price[t - 1] - price[t]``. The first row of both is 0.
+    """
+    diff = price[:-1] - price[1:]
+    gain = np.zeros(price.shape)
+    loss = np.zeros(price.shape)
+    gain[1:] = np.where(diff > 0, diff, 0)
+    loss[1:] = np.where(diff < 0, -diff, 0)
+    return gain, loss
+
+
+def directional_movement(up_move: np.ndarray, down_move: np.ndarray):
+    """Return the ``(positive, negative)`` directional movement."""
+    positive = np.where((up_move > down_move) & (up_move > 0), up_move, 0)
+    negative = np.where((down_move > up_move) & (down_move > 0), down_move, 0)
+    return positive.astype(float), negative.astype(float)
+
+
+def row_max(*arrays: np.ndarray) -> np.ndarray:
+    """
+    Element wise max with the semantics of python's :func:`max`, a NaN is
+    only returned if it is in the first array and nothing after it compares
+    greater.
+    """
+    out = np.asarray(arrays[0], dtype=float)
+
+    for a in arrays[1:]:
+        out = np.where(a > out, a, out)
+
+    return out
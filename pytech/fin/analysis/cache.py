@@ -0,0 +1,224 @@
+"""
+Cache the output of the functions in :mod:`pytech.fin.analysis.technical` so
+the same indicator is never computed twice for the same bars.
+
+Results are written to a bar library in a :class:`LocalStore`, by default in
+an ``indicators`` directory in :data:`pytech.DATA_DIR`, so they survive
+between sessions. Each result is keyed by the ticker, the function and its
+parameters, and the metadata holds a hash of the bars it was computed from.
+If the bars only had new rows appended since then, indicators with a known
+lookback are extended by computing them over the new rows only.
+"""
+import hashlib
+import inspect
+import json
+import logging
+import os
+from typing import Callable, Dict, Union
+
+import numpy as np
+import pandas as pd
+
+import pytech
+import pytech.fin.analysis.technical as ta
+from pytech.store.base import AbstractStore, BAR_STORE
+from pytech.store.local import LocalStore
+from pytech.utils.exceptions import DataAccessError
+
+INDICATOR_LIB = 'pytech.indicators'
+
+# function -> callable that takes the bound parameters of a call and returns
+# how many rows before the first new row are needed to compute it exactly.
+_lookbacks = {}
+
+
+def register_lookback(func: Callable,
+                      lookback: Callable[[Dict], int]) -> None:
+    """
+    Allow the cached output of ``func`` to be extended incrementally.
+
+    Only functions whose value for a row depends on a fixed number of rows
+    before it can be registered. Recursive indicators like an EWMA depend on
+    every row before it and are always recomputed in full.
+
+    :param func: The indicator function.
+    :param lookback: Called with the parameters of a call, including the
+        defaults, and returns the number of rows of history needed.
+    """
+    _lookbacks[func] = lookback
+
+
+register_lookback(ta.sma, lambda p: p['period'])
+register_lookback(ta.smm, lambda p: p['period'])
+register_lookback(ta.triangle_ma, lambda p: 2 * p['period'])
+register_lookback(ta.efficiency_ratio, lambda p: p['period'] + 1)
+register_lookback(ta.zero_lag_ema, lambda p: int(p['period'] / 2) + 1)
+register_lookback(ta.wma, lambda p: p['period'])
+register_lookback(ta.rsi, lambda p: p['period'] + 1)
+
+
+class IndicatorCache(object):
+    """
+    A persistent cache of indicator results.
+
+    >>> cache = IndicatorCache()
+    >>> rsi = cache.compute(ta.rsi, aapl_df, 'AAPL', period=14)
+    """
+
+    def __init__(self, store: AbstractStore = None,
+                 lib_name: str = INDICATOR_LIB):
+        """
+        :param store: The store to keep the results in. Defaults to a
+            :class:`LocalStore` in ``DATA_DIR/indicators``.
+        :param lib_name: The name of the library to use in the store.
+        """
+        self.logger = logging.getLogger(__name__)
+
+        if store is None:
+            store = LocalStore(os.path.join(pytech.DATA_DIR, 'indicators'))
+
+        self.store = store
+        self.lib_name = lib_name
+        store.initialize_library(lib_name, BAR_STORE)
+        self.lib = store[lib_name]
+
+    def compute(self, func: Callable, df: pd.DataFrame, ticker: str,
+                **kwargs) -> Union[pd.Series, pd.DataFrame]:
+        """
+        Return the output of ``func(df, **kwargs)`` from the cache, computing
+        and caching it first if needed.
+
+        :param func: A function from :mod:`pytech.fin.analysis.technical` or
+            any function that takes a OHLCV frame as its first argument.
+        :param df: The bars for ``ticker``.
+        :param ticker: The ticker the bars are for.
+        :param kwargs: Passed to ``func``.
+        """
+        params = _bind_params(func, df, kwargs)
+        symbol = self.symbol(ticker, func, params)
+        row_hashes = _row_hashes(df)
+
+        try:
+            item = self.lib.read(symbol)
+            meta = self.lib.read_metadata(symbol) or {}
+        except DataAccessError:
+            item, meta = None, {}
+
+        rows = meta.get('rows', 0)
+
+        if item is not None and 0 < rows <= len(df):
+            if meta.get('digest') == _digest(row_hashes[:rows]):
+                if rows == len(df):
+                    self.logger.debug(f'Cache hit for {symbol}.')
+                    return _from_stored(item, meta)
+
+                lookback = _lookbacks.get(func)
+
+                if lookback is not None:
+                    return self._extend(symbol, item, func, df, kwargs,
+                                        meta, lookback(params), row_hashes)
+
+        self.logger.debug(f'Computing {symbol}.')
+        out = func(df, **kwargs)
+        self._write(symbol, out, len(df), row_hashes)
+        return out
+
+    def invalidate(self, ticker: str, func: Callable = None) -> None:
+        """
+        Delete the cached results for a ticker, or only the ones for
+        ``func``.
+        """
+        prefix = f'{ticker}.' if func is None else f'{ticker}.{_name(func)}.'
+
+        for symbol in self.lib.list_symbols():
+            if symbol.startswith(prefix):
+                self.lib.delete(symbol)
+
+    @staticmethod
+    def symbol(ticker: str, func: Callable, params: Dict) -> str:
+        """Return the key a result is stored under."""
+        return f'{ticker}.{_name(func)}.{_params_digest(params)}'
+
+    def _extend(self, symbol: str, item: pd.DataFrame, func: Callable,
+                df: pd.DataFrame, kwargs: Dict, meta: Dict, lookback: int,
+                row_hashes: np.ndarray):
+        """Compute ``func`` for the rows after the cached ones only."""
+        rows = meta['rows']
+        self.logger.debug(f'Extending {symbol} by {len(df) - rows} rows.')
+        tail = func(df.iloc[max(rows - lookback, 0):], **kwargs)
+        new = tail[tail.index > df.index[rows - 1]]
+        meta = _metadata(new, len(df), row_hashes)
+
+        if new.empty:
+            # only the hash of the bars has changed.
+            self.lib.write(symbol, item, metadata=meta)
+            return _from_stored(item, meta)
+
+        self.lib.append(symbol, _to_stored(new), metadata=meta)
+        return _from_stored(self.lib.read(symbol), meta)
+
+    def _write(self, symbol: str, out, rows: int,
+               row_hashes: np.ndarray) -> None:
+        if not isinstance(out, (pd.Series, pd.DataFrame)) or out.empty:
+            return
+
+        if not out.index.is_monotonic_increasing:
+            # the store sorts the index so it would not be returned as is.
+            self.logger.debug(f'Not caching {symbol}, its index is not '
+                              'sorted.')
+            return
+
+        self.lib.write(symbol, _to_stored(out),
+                       metadata=_metadata(out, rows, row_hashes))
+
+
+def _name(func: Callable) -> str:
+    return getattr(func, '__qualname__', func.__name__)
+
+
+def _bind_params(func: Callable, df: pd.DataFrame, kwargs: Dict) -> Dict:
+    """Return every parameter of the call except the bars."""
+    bound = inspect.signature(func).bind(df, **kwargs)
+    bound.apply_defaults()
+    params = dict(bound.arguments)
+    params.pop(next(iter(params)))
+    return params
+
+
+def _params_digest(params: Dict) -> str:
+    encoded = json.dumps(params, sort_keys=True, default=repr)
+    return hashlib.sha1(encoded.encode()).hexdigest()[:16]
+
+
+def _row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """Hash each row, including its index, of the bars."""
+    return pd.util.hash_pandas_object(df, index=True).values
+
+
+def _digest(row_hashes: np.ndarray) -> str:
+    data = np.ascontiguousarray(row_hashes).tobytes()
+    return hashlib.sha1(data).hexdigest()
+
+
+def _metadata(out, rows: int, row_hashes: np.ndarray) -> Dict:
+    if isinstance(out, pd.Series):
+        return {'rows': rows, 'digest': _digest(row_hashes[:rows]),
+                'series': True, 'name': out.name}
+    else:
+        return {'rows': rows, 'digest': _digest(row_hashes[:rows]),
+                'series': False}
+
+
+def _to_stored(out) -> pd.DataFrame:
+    """Libraries store frames with string column names."""
+    if isinstance(out, pd.Series):
+        return out.to_frame('value')
+    return out
+
+
+def _from_stored(df: pd.DataFrame, meta: Dict):
+    if meta.get('series'):
+        out = df['value']
+        out.name = meta.get('name')
+        return out
+    return df
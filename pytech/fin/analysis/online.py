@@ -0,0 +1,486 @@
+"""
+Online versions of the indicators in :mod:`pytech.fin.analysis.technical`.
+
+Each indicator keeps just enough state to fold in one bar at a time with
+:func:`OnlineIndicator.update`, which costs O(1) no matter how long the
+window is. They are meant to be subscribed to on a :class:`DataHandler` so
+strategies can read the latest value on every bar instead of recomputing a
+window of bars.
+
+Where ``technical.py`` looks at future bars (the true range and the standard
+deviation of the bollinger bands) the online versions use the conventional,
+backward looking definition instead.
+
+:class:`KAMA` does not match :func:`technical.kama` either. The vectorized
+version lines the efficiency ratio and the shifted moving average up with
+the prices by position after dropping the first ratios, so each bar is
+smoothed with another bar's constant. The online version seeds the
+recursion with the moving average of the first ``period`` bars and smooths
+each bar with its own efficiency ratio.
+"""
+import math
+import numbers
+from abc import ABCMeta, abstractmethod
+from collections import deque, namedtuple
+from typing import Any, Tuple
+
+import pytech.utils.pandas_utils as pd_utils
+
+MACDValue = namedtuple('MACDValue', ['macd', 'signal'])
+BollingerValue = namedtuple('BollingerValue', ['upper', 'middle', 'lower',
+                                               'bandwidth', 'percent_b'])
+
+NAN = float('nan')
+
+
+def _isnan(x) -> bool:
+    return x != x
+
+
+def _get(bar, col: str) -> float:
+    """
+    Return a field of a bar, which can be a :class:`pd.Series`, a record
+    from :class:`ArrayBars`, a dict or a number.
+    """
+    if isinstance(bar, numbers.Number):
+        return float(bar)
+    return float(bar[col])
+
+
+class OnlineIndicator(metaclass=ABCMeta):
+    """The base class for every online indicator."""
+
+    def __init__(self, *params: Any):
+        self.params = params
+        self.value = NAN
+
+    @property
+    def key(self) -> Tuple:
+        """Indicators with the same key always have the same value."""
+        return (type(self).__name__,) + self.params
+
+    @property
+    def ready(self) -> bool:
+        """True once there have been enough bars to produce a value."""
+        return not _isnan(self.value)
+
+    @abstractmethod
+    def update(self, bar):
+        """
+        Fold in the next bar and return the new value.
+
+        :param bar: The latest bar.
+        """
+        raise NotImplementedError('Must implement update()')
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Forget every bar that has been seen."""
+        raise NotImplementedError('Must implement reset()')
+
+    def __repr__(self):
+        params = ', '.join(repr(p) for p in self.params)
+        return f'{type(self).__name__}({params}) = {self.value}'
+
+
+class _RollingSum(object):
+    """
+    The sum of the non null values in a fixed size window.
+
+    The total is kept by adding the new value and subtracting the old one,
+    so it is summed again from the window every ``window`` pushes to stop
+    rounding error from building up.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self.nobs = 0
+        self._pushes = 0
+
+    def push(self, x: float) -> None:
+        self.values.append(x)
+
+        if not _isnan(x):
+            self.total += x
+            self.nobs += 1
+
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+
+            if not _isnan(old):
+                self.total -= old
+                self.nobs -= 1
+
+        self._pushes += 1
+
+        if self._pushes >= self.window:
+            self.total = math.fsum(v for v in self.values if not _isnan(v))
+            self._pushes = 0
+        elif self.nobs == 0:
+            self.total = 0.0
+
+    def clear(self) -> None:
+        self.values.clear()
+        self.total = 0.0
+        self.nobs = 0
+        self._pushes = 0
+
+
+class _RollingMoments(object):
+    """
+    The mean and the sum of squared deviations from it of the non null values
+    in a fixed size window.
+
+    Values are added and removed with Welford's method, which stays accurate
+    when the spread is small compared to the values, and both are computed
+    again from the window every ``window`` pushes.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.clear()
+
+    def push(self, x: float) -> None:
+        self.values.append(x)
+
+        if not _isnan(x):
+            self._add(x)
+
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+
+            if not _isnan(old):
+                self._remove(old)
+
+        self._pushes += 1
+
+        if self._pushes >= self.window:
+            self._recompute()
+
+    def _add(self, x: float) -> None:
+        self.nobs += 1
+        delta = x - self.mean
+        self.mean += delta / self.nobs
+        self.m2 += delta * (x - self.mean)
+
+    def _remove(self, x: float) -> None:
+        if self.nobs == 1:
+            self.nobs = 0
+            self.mean = 0.0
+            self.m2 = 0.0
+            return
+
+        self.nobs -= 1
+        delta = x - self.mean
+        self.mean -= delta / self.nobs
+        self.m2 = max(self.m2 - delta * (x - self.mean), 0.0)
+
+    def _recompute(self) -> None:
+        values = [v for v in self.values if not _isnan(v)]
+        self.nobs = len(values)
+        self.mean = math.fsum(values) / self.nobs if values else 0.0
+        self.m2 = math.fsum((v - self.mean) ** 2 for v in values)
+        self._pushes = 0
+
+    def clear(self) -> None:
+        self.values.clear()
+        self.nobs = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._pushes = 0
+
+
+class _EWM(object):
+    """
+    An exponentially weighted mean that matches pandas'
+    ``ewm(span=span, adjust=True, ignore_na=False)``.
+    """
+
+    def __init__(self, span: float = None, alpha: float = None,
+                 min_periods: int = 0):
+        self.alpha = alpha if alpha is not None else 2 / (span + 1)
+        self.min_periods = max(min_periods, 1)
+        self.clear()
+
+    def push(self, x: float) -> float:
+        decay = 1 - self.alpha
+        self.num *= decay
+        self.den *= decay
+
+        if not _isnan(x):
+            self.num += x
+            self.den += 1
+            self.nobs += 1
+
+        if self.nobs >= self.min_periods and self.den:
+            self.value = self.num / self.den
+        else:
+            self.value = NAN
+
+        return self.value
+
+    def clear(self) -> None:
+        self.num = 0.0
+        self.den = 0.0
+        self.nobs = 0
+        self.value = NAN
+
+
+class SMA(OnlineIndicator):
+    """Simple moving average, like :func:`technical.sma`."""
+
+    def __init__(self, period: int = 50, col: str = pd_utils.CLOSE_COL):
+        super().__init__(period, col)
+        self.period = period
+        self.col = col
+        self.min_periods = max(period - 1, 1)
+        self._sum = _RollingSum(period)
+
+    def update(self, bar) -> float:
+        self._sum.push(_get(bar, self.col))
+
+        if self._sum.nobs >= self.min_periods:
+            self.value = self._sum.total / self._sum.nobs
+        else:
+            self.value = NAN
+
+        return self.value
+
+    def reset(self) -> None:
+        self._sum.clear()
+        self.value = NAN
+
+
+class EWMA(OnlineIndicator):
+    """Exponential weighted moving average, like :func:`technical.ewma`."""
+
+    def __init__(self, period: int = 50, col: str = pd_utils.CLOSE_COL):
+        super().__init__(period, col)
+        self.period = period
+        self.col = col
+        self._ewm = _EWM(span=period, min_periods=period - 1)
+
+    def update(self, bar) -> float:
+        self.value = self._ewm.push(_get(bar, self.col))
+        return self.value
+
+    def reset(self) -> None:
+        self._ewm.clear()
+        self.value = NAN
+
+
+class RSI(OnlineIndicator):
+    """
+    Relative strength indicator, like :func:`technical.rsi`.
+
+    The same convention as ``technical.rsi`` is used, so a bar that closes
+    below the previous one counts as a gain, and the two always agree.
+    """
+
+    def __init__(self, period: int = 14, col: str = pd_utils.CLOSE_COL):
+        super().__init__(period, col)
+        self.period = period
+        self.col = col
+        self._gain = _RollingSum(period)
+        self._loss = _RollingSum(period)
+        self._prev = None
+
+    def update(self, bar) -> float:
+        price = _get(bar, self.col)
+
+        if self._prev is None:
+            gain = loss = 0.0
+        else:
+            diff = self._prev - price
+            gain = diff if diff > 0 else 0.0
+            loss = -diff if diff < 0 else 0.0
+
+        self._prev = price
+        self._gain.push(gain)
+        self._loss.push(loss)
+
+        if self._gain.nobs < self.period:
+            self.value = NAN
+        else:
+            avg_gain = self._gain.total / self.period
+            avg_loss = self._loss.total / self.period
+
+            if avg_loss == 0:
+                self.value = NAN if avg_gain == 0 else 100.0
+            else:
+                self.value = 100 - (100 / (1 + avg_gain / avg_loss))
+
+        return self.value
+
+    def reset(self) -> None:
+        self._gain.clear()
+        self._loss.clear()
+        self._prev = None
+        self.value = NAN
+
+
+class ATR(OnlineIndicator):
+    """
+    Average true range, the simple moving average of
+    ``max(high - low, |high - prev close|, |low - prev close|)``.
+    """
+
+    def __init__(self, period: int = 14):
+        super().__init__(period)
+        self.period = period
+        self._sma = SMA(period)
+        self._prev_close = None
+
+    def update(self, bar) -> float:
+        high = _get(bar, pd_utils.HIGH_COL)
+        low = _get(bar, pd_utils.LOW_COL)
+        tr = high - low
+
+        if self._prev_close is not None:
+            tr = max(tr, abs(high - self._prev_close),
+                     abs(low - self._prev_close))
+
+        self._prev_close = _get(bar, pd_utils.CLOSE_COL)
+        self.value = self._sma.update(tr)
+        return self.value
+
+    def reset(self) -> None:
+        self._sma.reset()
+        self._prev_close = None
+        self.value = NAN
+
+
+class MACD(OnlineIndicator):
+    """
+    Moving average convergence divergence, like :func:`technical.macd_signal`.
+    The value is a :class:`MACDValue`.
+    """
+
+    def __init__(self, period_fast: int = 12, period_slow: int = 26,
+                 signal: int = 9, col: str = pd_utils.CLOSE_COL):
+        super().__init__(period_fast, period_slow, signal, col)
+        self.col = col
+        self._fast = _EWM(span=period_fast, min_periods=period_fast - 1)
+        self._slow = _EWM(span=period_slow, min_periods=period_slow - 1)
+        self._signal = _EWM(span=signal)
+        self.value = MACDValue(NAN, NAN)
+
+    @property
+    def ready(self) -> bool:
+        return not any(_isnan(v) for v in self.value)
+
+    def update(self, bar) -> MACDValue:
+        price = _get(bar, self.col)
+        macd = self._fast.push(price) - self._slow.push(price)
+        self.value = MACDValue(macd, self._signal.push(macd))
+        return self.value
+
+    def reset(self) -> None:
+        for ewm in (self._fast, self._slow, self._signal):
+            ewm.clear()
+        self.value = MACDValue(NAN, NAN)
+
+
+class BollingerBands(OnlineIndicator):
+    """
+    Bollinger bands ``num_std`` standard deviations of the last ``period``
+    bars around their simple moving average. The value is a
+    :class:`BollingerValue`.
+    """
+
+    def __init__(self, period: int = 30, col: str = pd_utils.CLOSE_COL,
+                 num_std: float = 2.0):
+        super().__init__(period, col, num_std)
+        self.period = period
+        self.col = col
+        self.num_std = num_std
+        self._moments = _RollingMoments(period)
+        self.value = BollingerValue(NAN, NAN, NAN, NAN, NAN)
+
+    @property
+    def ready(self) -> bool:
+        return not _isnan(self.value.middle)
+
+    def update(self, bar) -> BollingerValue:
+        price = _get(bar, self.col)
+        self._moments.push(price)
+        n = self._moments.nobs
+
+        if n < max(self.period - 1, 2):
+            self.value = BollingerValue(NAN, NAN, NAN, NAN, NAN)
+            return self.value
+
+        middle = self._moments.mean
+        # the sample variance, the same as pandas' std.
+        var = self._moments.m2 / (n - 1)
+        width = self.num_std * math.sqrt(var)
+        upper = middle + width
+        lower = middle - width
+
+        if upper == lower:
+            percent_b = NAN
+        else:
+            percent_b = (price - lower) / (upper - lower)
+
+        bandwidth = (upper - lower) / middle if middle else NAN
+        self.value = BollingerValue(upper, middle, lower, bandwidth,
+                                    percent_b)
+        return self.value
+
+    def reset(self) -> None:
+        self._moments.clear()
+        self.value = BollingerValue(NAN, NAN, NAN, NAN, NAN)
+
+
+class KAMA(OnlineIndicator):
+    """
+    Kaufman's Adaptive Moving Average.
+
+    The recursion is seeded with the simple moving average of the first
+    ``period`` bars and the smoothing constant of each bar uses the
+    efficiency ratio of the same bar.
+    """
+
+    def __init__(self, period: int = 20, col: str = pd_utils.CLOSE_COL,
+                 efficiency_ratio_periods: int = 10, ema_fast: int = 2,
+                 ema_slow: int = 30):
+        super().__init__(period, col, efficiency_ratio_periods, ema_fast,
+                         ema_slow)
+        self.col = col
+        self.fast_alpha = 2 / (ema_fast + 1)
+        self.slow_alpha = 2 / (ema_slow + 1)
+        self._sma = SMA(period, col)
+        self._prices = deque(maxlen=efficiency_ratio_periods + 1)
+        self._volatility = _RollingSum(efficiency_ratio_periods)
+
+    def update(self, bar) -> float:
+        price = _get(bar, self.col)
+        ma = self._sma.update(price)
+
+        if self._prices:
+            self._volatility.push(abs(price - self._prices[-1]))
+
+        self._prices.append(price)
+
+        if len(self._prices) < self._prices.maxlen:
+            return self.value
+
+        vol = self._volatility.total
+        er = abs(price - self._prices[0]) / vol if vol else 0.0
+        sc = (er * (self.fast_alpha - self.slow_alpha) + self.slow_alpha) ** 2
+
+        if not _isnan(self.value):
+            self.value = self.value + sc * (price - self.value)
+        elif not _isnan(ma):
+            self.value = ma + sc * (price - ma)
+
+        return self.value
+
+    def reset(self) -> None:
+        self._sma.reset()
+        self._prices.clear()
+        self._volatility.clear()
+        self.value = NAN
@@ -1,14 +1,13 @@
 import logging
 from typing import List, Tuple
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 from scipy.optimize import OptimizeResult, minimize
 
 import pytech.data.reader as reader
 import pytech.utils.pandas_utils as pd_utils
-from pytech.utils.common_utils import tail
+from pytech.utils.exceptions import DataAccessError
 
 
 class EfficientFrontier(object):
@@ -17,19 +16,45 @@ class EfficientFrontier(object):
     def __init__(self, tickers: List[str] = None,
                  rf: float = None,
                  asset_lib_name: str = 'pytech.bars',
-                 market_lib_name: str = 'pytech.market'):
+                 market_lib_name: str = 'pytech.market',
+                 allow_short: bool = False,
+                 frontier_points: int = 20,
+                 prices: np.ndarray = None):
+        """
+        :param allow_short: If True weights can be negative, in which case
+            the frontier and the tangent portfolio are solved analytically.
+            Otherwise every weight must be between 0 and 1 and they are
+            solved numerically.
+        :param frontier_points: The number of points on the frontier.
+        :param prices: The close prices with a row per ticker in the same
+            order as ``tickers``. If they are given nothing is read from the
+            db.
+        :raises DataAccessError: If there are no prices for a ticker.
+        """
         self.logger = logging.getLogger(__name__)
+        self.allow_short = allow_short
+        self.frontier_points = frontier_points
         self.asset_lib_name = asset_lib_name
         self.market_lib_name = market_lib_name
-        self.market_reader = reader.BarReader(self.market_lib_name)
-        self.asset_reader = reader.BarReader(self.asset_lib_name)
 
         if tickers is None:
             self.tickers = []
         else:
             self.tickers = tickers
 
-        self.prices = self._load_data()
+        if prices is None:
+            self.market_reader = reader.BarReader(self.market_lib_name)
+            self.asset_reader = reader.BarReader(self.asset_lib_name)
+            self.prices = self._load_data()
+        else:
+            self.market_reader = None
+            self.asset_reader = None
+            self.prices = np.atleast_2d(np.asarray(prices, dtype=float))
+
+            if len(self.prices) != len(self.tickers):
+                raise ValueError(f'Got {len(self.prices)} rows of prices for '
+                                 f'{len(self.tickers)} tickers.')
+
         self.rf = rf
 
     @property
@@ -50,31 +75,36 @@ class EfficientFrontier(object):
         #                   f'covars: \n{covars}')
         return self._optimize_frontier(expected_returns, covars)
 
-    def _load_data(self) -> List[float]:
-        """Loads the data and updates `tickers` if needed."""
+    def _load_data(self) -> np.ndarray:
+        """
+        Loads the data and updates `tickers` if needed.
+
+        :return: The close prices with a row per ticker. Every ticker is
+            truncated to the most recent prices of the ticker with the
+            fewest so they all have the same amount.
+        """
         if not self.tickers:
             for x in self.asset_reader.get_symbols():
                 self.tickers.append(x)
 
-        tmp_prices_out = []
-        max_prices = None
+        # read every ticker at once rather than making a query per ticker.
+        df_dict = self.asset_reader.get_data(list(self.tickers),
+                                             columns=[pd_utils.CLOSE_COL])
 
-        # noinspection PyTypeChecker
-        for t in self.tickers:
-            df = self.asset_reader.get_data(t, columns=[pd_utils.CLOSE_COL])
-            prices = list(df[pd_utils.CLOSE_COL])
-            num_prices = len(prices)
-            if max_prices is None or num_prices < max_prices:
-                # all must have the same amount of prices.
-                max_prices = num_prices
-            tmp_prices_out.append(prices)
+        closes = [df_dict[t][pd_utils.CLOSE_COL].values for t in self.tickers]
+        # the reader fills in tickers it could not get with NaN.
+        missing = [t for t, c in zip(self.tickers, closes)
+                   if np.isnan(c).all()]
 
-        prices_out = []
+        if missing:
+            raise DataAccessError(f'No prices found for: {missing}')
 
-        for l in tmp_prices_out:
-            prices_out.append(list(tail(max_prices, l)))
+        if not closes:
+            return np.empty((0, 0))
 
-        return prices_out
+        # all must have the same amount of prices.
+        num_prices = min(len(c) for c in closes)
+        return np.vstack([c[len(c) - num_prices:] for c in closes])
 
     def _returns_covar(self) -> Tuple[np.array, np.array]:
         """
@@ -82,19 +112,10 @@ class EfficientFrontier(object):
 
         :return:
         """
-        prices = np.matrix(self.prices)
-        rows, cols = prices.shape
-        returns = np.empty([rows, cols - 1])
-        for r in range(rows):
-            for c in range(cols - 1):
-                p0, p1 = prices[r, c], prices[r, c + 1]
-                returns[r, c] = (p1 / p0) - 1
-
-        expected_returns = np.array([])
-        for r in range(rows):
-            expected_returns = np.append(expected_returns, np.mean(returns[r]))
-
-        covars = np.cov(returns)
+        prices = np.asarray(self.prices, dtype=float)
+        returns = prices[:, 1:] / prices[:, :-1] - 1
+        expected_returns = returns.mean(axis=1)
+        covars = np.atleast_2d(np.cov(returns))
         # annualize returns and covars
         expected_returns = (1 + expected_returns) ** 252 - 1
         covars = covars * 252
@@ -109,58 +130,98 @@ class EfficientFrontier(object):
 
     def _solve_frontier(self, returns: np.array,
                         covar: np.array) -> Tuple[np.ndarray, np.ndarray]:
-        def fitness(weights, returns, covar, r):
-            mean, var = _mean_var(weights, returns, covar)
-            penalty = 100 * abs(mean - r)
-            return var + penalty
+        """
+        Find the minimum variance portfolio for evenly spaced returns between
+        the lowest and highest expected return of any asset.
+
+        With shorting allowed the variance of each point has a closed form.
+        Otherwise each point is solved as a quadratic program starting from
+        the point before it, which is already close to the solution.
+        """
+        frontier_mean = np.linspace(np.min(returns), np.max(returns),
+                                    num=self.frontier_points)
+
+        if self.allow_short:
+            return frontier_mean, _analytic_frontier_var(frontier_mean,
+                                                         returns, covar)
 
-        frontier_mean = []
         frontier_var = []
         assets = len(returns)
+        a = np.vstack([np.ones(assets), returns])
+        top = np.zeros(assets)
+        top[np.argmax(returns)] = 1
+        # the only portfolio with the lowest return.
+        weights = np.zeros(assets)
+        weights[np.argmin(returns)] = 1
 
-        for r in np.linspace(np.min(returns), np.max(returns), num=20):
-            # equal weights to start
-            weights = np.ones([assets]) / assets
-            # no shorts.
-            b_ = [(0, 1) for _ in range(assets)]
-            c_ = ({'type': 'eq', 'fun': lambda weights: sum(weights) - 1.0})
-            optimized = minimize(fitness,
-                                 weights,
-                                 (returns, covar, r),
-                                 method='SLSQP',
-                                 constraints=c_,
-                                 bounds=b_)
-            if not optimized.success:
-                raise BaseException(optimized.message)
-            frontier_mean.append(r)
-            frontier_var.append(_var(optimized.x, covar))
-
-        return np.array(frontier_mean), np.array(frontier_var)
+        for r in frontier_mean:
+            # move towards the highest return asset until the target return
+            # is met to get a feasible starting point.
+            prev = np.dot(weights, returns)
+            gap = np.max(returns) - prev
+            t = (r - prev) / gap if gap > 0 else 0.0
+            start = (1 - t) * weights + t * top
+            weights = _long_only_qp(covar, a, np.array([1.0, r]), start)
+
+            if weights is None:
+                weights = _slsqp_min_var(covar, returns, r, start)
+
+            frontier_var.append(_var(weights, covar))
+
+        return frontier_mean, np.array(frontier_var)
 
     def _solve_weights(self, returns: np.array,
                        covar: np.matrix) -> OptimizeResult:
         """
         Solve for the optimal weights.
 
+        Without shorting the tangent portfolio is the minimum variance
+        portfolio ``y`` with ``(returns - rf) y = 1`` and ``y >= 0``,
+        scaled to sum to 1.
+
         :param returns: numpy array of the average historical returns.
         :param covar: matrix of covariances.
         :return: optimal weights.
         """
+        if self.allow_short:
+            return _analytic_tangent(returns, covar, self.rf)
+
+        excess = returns - self.rf
+        best = np.argmax(excess)
+
+        if excess[best] > 0:
+            start = np.zeros(len(returns))
+            start[best] = 1 / excess[best]
+            y = _long_only_qp(covar, excess[np.newaxis, :], np.ones(1),
+                              start)
+
+            if y is not None:
+                return y / np.sum(y)
 
         def fitness(weights, returns, covar, rf):
             mean, var = _mean_var(weights, returns, covar)
             sharpe = (mean - rf) / np.sqrt(var)
             return 1 / sharpe
 
+        def fitness_jac(weights, returns, covar, rf):
+            mean, var = _mean_var(weights, returns, covar)
+            std = np.sqrt(var)
+            excess = mean - rf
+            return (_var_jac(weights, covar) / (2 * std * excess)
+                    - std * returns / excess ** 2)
+
         assets = len(returns)
         base_weights = np.ones([assets]) / assets
-        # weights can be positive or negative
-        b_ = [(0, 1) for _ in range(assets)]
-        c_ = ({'type': 'eq', 'fun': lambda weights: sum(weights) - 1.0})
+        # no shorts.
+        b_ = [(0, 1)] * assets
+        c_ = ({'type': 'eq',
+               'fun': lambda weights: np.sum(weights) - 1.0,
+               'jac': lambda weights: np.ones(assets)})
         optimized = minimize(fitness,
                              base_weights,
                              (returns, covar, self.rf),
                              method='SLSQP',
+                             jac=fitness_jac,
                              constraints=c_,
                              bounds=b_)
         if not optimized.success:
@@ -191,6 +252,9 @@ class _FrontierResult(object):
 
     def plot(self, frontier_label: str = 'Frontier',
              auto_plot: bool = False):
+        # matplotlib is slow to import and only needed to plot.
+        import matplotlib.pyplot as plt
+
         plt.style.use('ggplot')
         plt.scatter([self.covar[i, i] ** .5
                      for i in range(len(self.tickers))],
@@ -222,13 +286,140 @@ class _FrontierResult(object):
 
 
 def _mean(weights, returns):
-    return sum(returns * weights)
+    return np.dot(returns, weights)
 
 
 def _var(weights, covar):
     return np.dot(np.dot(weights, covar), weights)
 
 
+def _var_jac(weights, covar):
+    """The gradient of :func:`_var`, the covariance is symmetric."""
+    return 2 * np.dot(covar, weights)
+
+
+def _long_only_qp(covar, a, b, start, tol=1e-10):
+    """
+    Minimize ``w'Sw`` subject to ``a w = b`` and ``w >= 0`` with a primal
+    active set method.
+
+    Only the assets that are not held at 0 enter the linear systems, so
+    starting close to the solution, like from the previous point on the
+    frontier, takes a few small solves no matter how many assets there are.
+
+    :param covar: The covariance ``S``.
+    :param a: The equality constraints, one row per constraint.
+    :param b: The right hand side of the equality constraints.
+    :param start: A feasible starting point.
+    :return: The optimal weights or None if it did not converge.
+    """
+    w = np.array(start, dtype=float)
+    free = w > 0
+    scale = max(np.max(np.abs(np.diag(covar))), tol)
+    m = len(a)
+
+    for _ in range(4 * len(w) + 10):
+        idx = np.flatnonzero(free)
+        k = len(idx)
+        covar_ff = covar[np.ix_(idx, idx)]
+        kkt = np.zeros((k + m, k + m))
+        kkt[:k, :k] = covar_ff
+        kkt[:k, k:] = -a[:, idx].T
+        kkt[k:, :k] = a[:, idx]
+        rhs = np.zeros(k + m)
+        rhs[:k] = -np.dot(covar_ff, w[idx])
+
+        try:
+            sol = np.linalg.solve(kkt, rhs)
+        except np.linalg.LinAlgError:
+            # fewer free assets than independent constraints.
+            sol = np.linalg.lstsq(kkt, rhs, rcond=-1)[0]
+
+        p, lam = sol[:k], sol[k:]
+
+        if np.max(np.abs(p)) <= tol * max(np.max(w), 1.0):
+            # the multipliers of the assets held at 0 say if any of them
+            # would lower the variance.
+            z = np.dot(covar[:, idx], w[idx]) - np.dot(a.T, lam)
+            z[free] = 0
+            i = np.argmin(z)
+
+            if z[i] >= -tol * scale:
+                return w
+
+            free[i] = True
+            continue
+
+        # step as far as possible without any weight going negative.
+        shrinking = p < 0
+        steps = -w[idx[shrinking]] / p[shrinking]
+
+        if steps.size and steps.min() < 1:
+            j = np.argmin(steps)
+            w[idx] += steps[j] * p
+            blocking = idx[shrinking][j]
+            w[blocking] = 0
+            free[blocking] = False
+        else:
+            w[idx] += p
+
+    return None
+
+
+def _slsqp_min_var(covar, returns, r, start):
+    """The long only minimum variance portfolio with a return of ``r``."""
+    assets = len(returns)
+    ones = np.ones(assets)
+    c_ = ({'type': 'eq',
+           'fun': lambda w: np.sum(w) - 1.0,
+           'jac': lambda w: ones},
+          {'type': 'eq',
+           'fun': lambda w: np.dot(w, returns) - r,
+           'jac': lambda w: returns})
+    optimized = minimize(_var,
+                         start,
+                         (covar,),
+                         method='SLSQP',
+                         jac=_var_jac,
+                         constraints=c_,
+                         bounds=[(0, 1)] * assets,
+                         options={'ftol': 1e-10})
+    if not optimized.success:
+        raise BaseException(optimized.message)
+    return optimized.x
+
+
+def _frontier_constants(returns, covar) -> Tuple[float, float, float]:
+    """
+    Return ``(a, b, c)`` where ``a = 1'S^-1 1``, ``b = 1'S^-1 mu`` and
+    ``c = mu'S^-1 mu`` for the covariance ``S`` and returns ``mu``.
+    """
+    ones = np.ones(len(returns))
+    inv_ones = np.linalg.solve(covar, ones)
+    inv_returns = np.linalg.solve(covar, returns)
+    return (np.dot(ones, inv_ones), np.dot(ones, inv_returns),
+            np.dot(returns, inv_returns))
+
+
+def _analytic_frontier_var(frontier_mean, returns, covar) -> np.ndarray:
+    """
+    The variance of the minimum variance portfolio for each return in
+    ``frontier_mean`` when the weights are only constrained to sum to 1.
+    """
+    a, b, c = _frontier_constants(returns, covar)
+    d = a * c - b * b
+    return (a * frontier_mean ** 2 - 2 * b * frontier_mean + c) / d
+
+
+def _analytic_tangent(returns, covar, rf) -> np.ndarray:
+    """
+    The weights of the maximum sharpe ratio portfolio when the weights are
+    only constrained to sum to 1.
+    """
+    weights = np.linalg.solve(covar, returns - rf)
+    return weights / np.sum(weights)
+
+
 def _mean_var(weights, returns, covar):
     return _mean(weights, returns), _var(weights, covar)
 
@@ -1,42 +1,241 @@
 import numpy as np
 import pandas as pd
-import pymc3 as pm
+
+
+# the default number of simulated prices to hold in memory at once.
+CHUNK_ELEMENTS = 10 ** 7
+
+
+class MonteCarloResult(object):
+    """
+    The distribution of a monte carlo simulation.
+
+    :ivar start_value: The value every path starts at.
+    :ivar terminal: The value of each path on the last day.
+    :ivar mean_path: The mean value of every path on each day, including the
+        start.
+    :ivar paths: Every simulated path as a ``(paths, days + 1)`` array or
+        None if they were not kept.
+    :ivar asset_terminal: For multi asset simulations the value of each asset
+        on the last day, ``(paths, assets)``.
+    """
+
+    def __init__(self, start_value: float, terminal: np.ndarray,
+                 mean_path: np.ndarray, paths: np.ndarray = None,
+                 asset_terminal: np.ndarray = None):
+        self.start_value = start_value
+        self.terminal = terminal
+        self.mean_path = mean_path
+        self.paths = paths
+        self.asset_terminal = asset_terminal
+
+    @property
+    def mean(self) -> float:
+        """The mean of every simulated value, including the start."""
+        return float(np.mean(self.mean_path))
+
+    @property
+    def terminal_returns(self) -> np.ndarray:
+        """The total return of each path."""
+        return self.terminal / self.start_value - 1
+
+    def percentiles(self, q=(5, 25, 50, 75, 95)) -> pd.DataFrame:
+        """
+        The percentiles of the value on each day, with a column per
+        percentile. Requires the paths to have been kept.
+        """
+        if self.paths is None:
+            raise ValueError('Paths were not kept, run the simulation with '
+                             'keep_paths=True.')
+
+        return pd.DataFrame(np.percentile(self.paths, q, axis=0).T,
+                            columns=list(q))
+
+    def terminal_percentiles(self, q=(5, 25, 50, 75, 95)) -> pd.Series:
+        """The percentiles of the value on the last day."""
+        return pd.Series(np.percentile(self.terminal, q), index=list(q))
+
+    def var(self, level: float = .95) -> float:
+        """
+        The value at risk, the loss as a fraction of the start value that
+        is only exceeded by ``1 - level`` of the paths.
+        """
+        return -float(np.percentile(self.terminal_returns,
+                                    100 * (1 - level)))
+
+    def cvar(self, level: float = .95) -> float:
+        """
+        The conditional value at risk, the mean loss of the paths that lose
+        at least the :func:`var`.
+        """
+        returns = self.terminal_returns
+        tail = returns[returns <= -self.var(level)]
+        return -float(np.mean(tail))
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(paths={len(self.terminal)}, '
+                f'mean={self.mean:.4f}, var={self.var():.4f}, '
+                f'cvar={self.cvar():.4f})')
+
+
+def _get_rng(seed):
+    """
+    Return a random generator from a seed, a :class:`np.random.Generator` or
+    a :class:`np.random.RandomState`. ``Generator`` is used when numpy has it.
+    """
+    if seed is None or isinstance(seed, (int, np.integer)):
+        if hasattr(np.random, 'default_rng'):
+            return np.random.default_rng(seed)
+        return np.random.RandomState(seed)
+    return seed
+
+
+def _chunk_sizes(paths: int, elements_per_path: int,
+                 chunk_size: int = None):
+    """Split ``paths`` into chunks that hold about ``CHUNK_ELEMENTS``."""
+    if chunk_size is None:
+        chunk_size = max(CHUNK_ELEMENTS // max(elements_per_path, 1), 1)
+
+    for start in range(0, paths, chunk_size):
+        yield min(chunk_size, paths - start)
+
+
+def _prices(start, returns: np.ndarray) -> np.ndarray:
+    """
+    Compound the simple ``returns`` along axis 1 starting from ``start``.
+    The first column of the output is ``start``.
+    """
+    out = np.empty((returns.shape[0], returns.shape[1] + 1)
+                   + returns.shape[2:])
+    out[:, 0] = start
+    np.cumprod(returns + 1, axis=1, out=out[:, 1:])
+    out[:, 1:] *= start
+    return out
+
+
+def _simulate(chunks, start_value: float, paths: int, days: int,
+              keep_paths: bool) -> MonteCarloResult:
+    """Reduce the ``(chunk, days + 1)`` arrays of values to a result."""
+    terminal = np.empty(paths)
+    total = np.zeros(days + 1)
+    kept = np.empty((paths, days + 1)) if keep_paths else None
+    asset_terminal = []
+    i = 0
+
+    for values, assets in chunks:
+        n = len(values)
+        terminal[i:i + n] = values[:, -1]
+        total += values.sum(axis=0)
+
+        if keep_paths:
+            kept[i:i + n] = values
+
+        if assets is not None:
+            asset_terminal.append(assets)
+
+        i += n
+
+    return MonteCarloResult(
+            start_value, terminal, total / paths, kept,
+            np.concatenate(asset_terminal) if asset_terminal else None)
 
 
 def monte_carlo(mu: float, vol: float, days: int, start_price: float,
-                paths: int = 1000) -> np.ndarray:
+                paths: int = 1000, seed=None, keep_paths: bool = None,
+                chunk_size: int = None) -> MonteCarloResult:
     """
     Do a monte carlo sim.
 
+    Daily returns are drawn from a logistic distribution and every path is
+    simulated at once, ``chunk_size`` paths at a time, so very large
+    simulations do not need to fit in memory.
+
     :param mu: The expected return.
     :param vol: The expected volatility.
     :param days: The number of trading days.
     :param start_price: The latest available price.
     :param paths: The number of paths to run for the simulation.
-    :return: the expected value.
+    :param seed: A seed, :class:`np.random.Generator` or
+        :class:`np.random.RandomState` to draw the returns with.
+    :param keep_paths: Keep every path on the result, defaults to True if
+        they fit in one chunk.
+    :param chunk_size: The number of paths to simulate at once.
+    :return: The distribution of the simulated prices.
     """
-    result = np.array([])
+    rng = _get_rng(seed)
     avg_daily_return = mu / days
     daily_vol = vol / np.sqrt(days)
 
-    for _ in range(paths):
-        sim_returns = np.random.logistic(avg_daily_return,
-                                         daily_vol,
-                                         days) + 1
+    if keep_paths is None:
+        keep_paths = paths * (days + 1) <= CHUNK_ELEMENTS
+
+    def chunks():
+        for n in _chunk_sizes(paths, days + 1, chunk_size):
+            returns = rng.logistic(avg_daily_return, daily_vol, (n, days))
+            yield _prices(start_price, returns), None
 
-        price_list = np.array([start_price])
+    return _simulate(chunks(), start_price, paths, days, keep_paths)
 
-        # noinspection PyTypeChecker
-        for x in sim_returns:
-            price_list = np.append(price_list, price_list[-1] * x)
 
-        result = np.append(result, price_list)
+def monte_carlo_multi(mu, covar, days: int, start_prices,
+                      weights=None, paths: int = 1000, seed=None,
+                      keep_paths: bool = None,
+                      chunk_size: int = None) -> MonteCarloResult:
+    """
+    Do a monte carlo sim of correlated assets.
+
+    Daily returns are drawn from a multivariate normal distribution using the
+    cholesky decomposition of ``covar`` and the result is the value of a
+    portfolio holding ``weights`` of each asset at the start.
+
+    :param mu: The expected return of each asset.
+    :param covar: The covariance of the assets' returns, over the same period
+        as ``mu``.
+    :param days: The number of trading days.
+    :param start_prices: The latest available price of each asset.
+    :param weights: The fraction of the portfolio's value in each asset,
+        defaults to an equal amount of each.
+    :param paths: The number of paths to run for the simulation.
+    :param seed: A seed, :class:`np.random.Generator` or
+        :class:`np.random.RandomState` to draw the returns with.
+    :param keep_paths: Keep every path on the result, defaults to True if
+        they fit in one chunk.
+    :param chunk_size: The number of paths to simulate at once.
+    :return: The distribution of the portfolio's value, which starts at 1,
+        with the terminal price of each asset in ``asset_terminal``.
+    """
+    rng = _get_rng(seed)
+    mu = np.asarray(mu, dtype=float)
+    start_prices = np.asarray(start_prices, dtype=float)
+    assets = len(mu)
 
-    return np.mean(result)
+    if weights is None:
+        weights = np.full(assets, 1 / assets)
+    else:
+        weights = np.asarray(weights, dtype=float)
+
+    avg_daily_return = mu / days
+    chol = np.linalg.cholesky(np.asarray(covar, dtype=float) / days)
+
+    if keep_paths is None:
+        keep_paths = paths * (days + 1) * assets <= CHUNK_ELEMENTS
+
+    def chunks():
+        for n in _chunk_sizes(paths, (days + 1) * assets, chunk_size):
+            shocks = rng.standard_normal((n, days, assets))
+            returns = avg_daily_return + np.dot(shocks, chol.T)
+            growth = _prices(1.0, returns)
+            yield (np.dot(growth, weights),
+                   growth[:, -1] * start_prices)
+
+    return _simulate(chunks(), 1.0, paths, days, keep_paths)
 
 
 # noinspection PyTypeChecker
 def _vol_model(df: pd.DataFrame):
+    # pymc3 is slow to import and only needed here.
+    import pymc3 as pm
+
     with pm.Model() as model:
         nu = pm.Exponential('nu', 1. / 10, testval=5.)
         sigma = pm.Exponential('sigma', 1. / .02, testval=.1)
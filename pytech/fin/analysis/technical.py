@@ -1,19 +1,38 @@
 """
 Contains functions to perform technical analysis on pandas OHLCV data frames
+
+Every function also accepts a panel of many tickers and computes all of them
+in one pass along the time axis. A panel is either:
+
+    * a :class:`pd.DataFrame` with ``(ticker, field)`` :class:`pd.MultiIndex`
+      columns, like the one returned by :func:`pytech.store.to_panel`
+    * a 3-D :class:`np.ndarray` shaped ``(time, ticker, field)`` with the
+      fields in the order of :data:`pd_utils.OHLCV_COLS`
+    * a 2-D :class:`np.ndarray` shaped ``(time, ticker)`` holding the values
+      of a single field, which can only be used with indicators that need one
+
+For a panel, functions that return a :class:`pd.Series` for one ticker return
+a :class:`pd.DataFrame` with a column per ticker, and functions that return a
+:class:`pd.DataFrame` return one with ``(ticker, output)`` columns.
 """
 import logging
-from typing import Union
+from typing import Sequence, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
+import pytech.fin.analysis._kernels as kernels
 import pytech.utils.pandas_utils as pd_utils
 
 logger = logging.getLogger(__name__)
 
+Bars = Union[pd.DataFrame, np.ndarray]
+Result = Union[pd.Series, pd.DataFrame]
+
 
-def sma(df: pd.DataFrame,
+def sma(df: Bars,
         period: int = 50,
-        col: str = pd_utils.CLOSE_COL) -> pd.Series:
+        col: str = pd_utils.CLOSE_COL) -> Result:
     """
     Simple moving average
 
@@ -22,15 +41,15 @@ def sma(df: pd.DataFrame,
     :param col: The column in the data frame to use.
     :return: A series with the simple moving average
     """
-    sma = df[col].rolling(center=False,
-                          window=period,
-                          min_periods=period - 1).mean()
-    return pd.Series(sma, name='sma', index=df.index).dropna()
+    sma = _field(df, col).rolling(center=False,
+                                  window=period,
+                                  min_periods=period - 1).mean()
+    return _dropna(_named(sma, 'sma'))
 
 
-def smm(df: pd.DataFrame,
+def smm(df: Bars,
         period: int = 50,
-        col: str = pd_utils.CLOSE_COL) -> pd.Series:
+        col: str = pd_utils.CLOSE_COL) -> Result:
     """
     Compute the simple moving median over a given period.
 
@@ -40,14 +59,14 @@ def smm(df: pd.DataFrame,
     :return: Series containing the simple moving median.
 
     """
-    temp_series = df[col].rolling(center=False,
-                                  window=period,
-                                  min_periods=period - 1).median()
-    return pd.Series(temp_series, index=df.index, name='smm')
+    temp_series = _field(df, col).rolling(center=False,
+                                          window=period,
+                                          min_periods=period - 1).median()
+    return _named(temp_series, 'smm')
 
 
-def ewma(df: pd.DataFrame, period: int = 50,
-         col: str = pd_utils.CLOSE_COL) -> pd.Series:
+def ewma(df: Bars, period: int = 50,
+         col: str = pd_utils.CLOSE_COL) -> Result:
     """
     Exponential weighted moving average.
 
@@ -56,14 +75,14 @@ def ewma(df: pd.DataFrame, period: int = 50,
     :param col:
     :return:
     """
-    return df[col].ewm(ignore_na=False,
-                       min_periods=period - 1,
-                       span=period).mean()
+    return _field(df, col).ewm(ignore_na=False,
+                               min_periods=period - 1,
+                               span=period).mean()
 
 
 # noinspection PyTypeChecker,PyUnresolvedReferences
-def triple_ewma(df: pd.DataFrame, period: int = 50,
-                col: str = pd_utils.CLOSE_COL) -> pd.Series:
+def triple_ewma(df: Bars, period: int = 50,
+                col: str = pd_utils.CLOSE_COL) -> Result:
     """
     Triple Exponential Weighted Moving Average.
 
@@ -82,11 +101,11 @@ def triple_ewma(df: pd.DataFrame, period: int = 50,
     series = triple_ema - 3 * (ewma_.ewm(ignore_na=False,
                                          min_periods=period - 1,
                                          span=period).mean()) + ema_ema_ema
-    return series.dropna()
+    return _dropna(series)
 
 
-def triangle_ma(df: pd.DataFrame, period: int = 50,
-                col: str = pd_utils.CLOSE_COL) -> pd.Series:
+def triangle_ma(df: Bars, period: int = 50,
+                col: str = pd_utils.CLOSE_COL) -> Result:
     """
     Triangle Moving Average. The SMA of the SMA.
 
@@ -97,12 +116,12 @@ def triangle_ma(df: pd.DataFrame, period: int = 50,
     """
     sma_ = sma(df, period, col)
 
-    return sma_.rolling(center=False, window=period,
-                        min_periods=period - 1).mean().dropna()
+    return _dropna(sma_.rolling(center=False, window=period,
+                                min_periods=period - 1).mean())
 
 
-def trix(df: pd.DataFrame, period: int = 50,
-         col: str = pd_utils.CLOSE_COL) -> pd.Series:
+def trix(df: Bars, period: int = 50,
+         col: str = pd_utils.CLOSE_COL) -> Result:
     """
     Triple Exponential Moving Average Oscillator (trix)
 
@@ -126,12 +145,12 @@ def trix(df: pd.DataFrame, period: int = 50,
                               min_periods=period - 1,
                               span=period).mean()
 
-    return emwa_three.pct_change(periods=1).dropna()
+    return _dropna(emwa_three.pct_change(periods=1))
 
 
-def efficiency_ratio(df: pd.DataFrame,
+def efficiency_ratio(df: Bars,
                      period: int = 10,
-                     col: str = pd_utils.CLOSE_COL) -> pd.Series:
+                     col: str = pd_utils.CLOSE_COL) -> Result:
     """
     Kaufman Efficiency Indicator.
     Oscillates between +100 and -100 where positive is bullish.
@@ -141,17 +160,18 @@ def efficiency_ratio(df: pd.DataFrame,
     :param col: The column to use to do the calculation.
     :return:
     """
-    change = df[col].diff(periods=period).abs()
-    vol = df[col].diff().abs().rolling(window=period).sum()
-    return pd.Series(change / vol).dropna()
+    price = _field(df, col)
+    change = price.diff(periods=period).abs()
+    vol = price.diff().abs().rolling(window=period).sum()
+    return _dropna(change / vol)
 
 
-def kama(df: pd.DataFrame,
+def kama(df: Bars,
          period: int = 20,
          col: str = pd_utils.CLOSE_COL,
          efficiency_ratio_periods: int = 10,
          ema_fast: int = 2,
-         ema_slow: int = 30) -> pd.Series:
+         ema_slow: int = 30) -> Result:
     """
     Kaufman's Adaptive Moving Average.
 
@@ -170,25 +190,17 @@ def kama(df: pd.DataFrame,
 
     # smoothing constant
     # noinspection PyTypeChecker
-    sc = pd.Series((er * (fast_alpha - slow_alpha) + slow_alpha) ** 2)
+    sc = (er * (fast_alpha - slow_alpha) + slow_alpha) ** 2
     sma_ = sma(df, period, col)
 
-    kama_ = []
-
-    for smooth, ma, price in zip(sc, sma_.shift(-1), df[col]):
-        try:
-            kama_.append(kama_[-1] + smooth * (price - kama_[-1]))
-        except (IndexError, TypeError):
-            if pd.notnull(ma):
-                kama_.append(ma + smooth * (price - ma))
-            else:
-                kama_.append(None)
+    kama_ = kernels.kama(sc.values, sma_.shift(-1).values,
+                         _field(df, col).values)
 
-    return pd.Series(kama_, index=sma_.index, name='KAMA')
+    return _wrap(kama_, sma_, name='KAMA')
 
 
-def zero_lag_ema(df: pd.DataFrame, period: int = 30,
-                 col: str = pd_utils.CLOSE_COL) -> pd.Series:
+def zero_lag_ema(df: Bars, period: int = 30,
+                 col: str = pd_utils.CLOSE_COL) -> Result:
     """
     Zero Lag Exponential Moving Average.
 
@@ -198,12 +210,12 @@ def zero_lag_ema(df: pd.DataFrame, period: int = 30,
     :return:
     """
     lag = (period - 1) / 2
-    return pd.Series(df[col] + (df[col].diff(lag)),
-                     name='zero_lag_ema').dropna()
+    price = _field(df, col)
+    return _dropna(_named(price + price.diff(lag), 'zero_lag_ema'))
 
 
-def wma(df: pd.DataFrame, period: int = 30,
-        col: str = pd_utils.CLOSE_COL) -> pd.Series:
+def wma(df: Bars, period: int = 30,
+        col: str = pd_utils.CLOSE_COL) -> Result:
     """
     Weighted Moving Average.
 
@@ -212,52 +224,12 @@ def wma(df: pd.DataFrame, period: int = 30,
     :param col:
     :return:
     """
-    wma_ = []
-
-    for chunk in _chunks(df, period, col):
-        try:
-            wma_.append(_chunked_wma(chunk, period))
-        except AttributeError:
-            wma_.append(None)
-
-    wma_.reverse()
-    return pd.Series(wma_, index=df.index, name='wma')
-
-
-def _chunks(df: Union[pd.DataFrame, pd.Series],
-            period: int,
-            col: str = pd_utils.CLOSE_COL):
-    """
-    Create `n` chunks based on the number of periods.
-
-    :param df:
-    :param period:
-    :param col:
-    :return:
-    """
-    df_rev = df[col].iloc[::-1]
-
-    for i in enumerate(df_rev):
-        chunk = df_rev.iloc[i[0]:i[0] + period]
-        if len(chunk) != period:
-            yield None
-        else:
-            yield chunk
+    price = _field(df, col)
+    wma_ = kernels.wma(price.values.astype(float), period)
+    return _wrap(wma_, price, name='wma')
 
 
-def _chunked_wma(chunk, period) -> float:
-    denominator = (period * (period + 1)) / 2
-
-    ma = []
-
-    for price, i in zip(chunk.iloc[::-1].items(),
-                        range(period + 1)[1:]):
-        ma.append(price[1] * (i / denominator))
-
-    return sum(ma)
-
-
-def true_range(df: pd.DataFrame, period: int = 14) -> pd.Series:
+def true_range(df: Bars, period: int = 14) -> Result:
     """
     Finds the true range a asset is trading within.
     Most recent period's high - most recent periods low.
@@ -268,37 +240,21 @@ def true_range(df: pd.DataFrame, period: int = 14) -> pd.Series:
     :param period:
     :return:
     """
-    high_low = pd.Series(df[pd_utils.HIGH_COL].tail(period)
-                         - df[pd_utils.LOW_COL].tail(period),
-                         name='high_low')
-
-    high_close = pd.Series(df[pd_utils.HIGH_COL].tail(period)
-                           - (df[pd_utils.CLOSE_COL].shift(-1)
-                              .abs().tail(period)),
-                           name='high_prev_close')
+    high, low, close = _fields(df, pd_utils.HIGH_COL, pd_utils.LOW_COL,
+                               pd_utils.CLOSE_COL)
 
-    low_close = pd.Series(df[pd_utils.CLOSE_COL].shift(-1).tail(period)
-                          - df[pd_utils.LOW_COL].abs().tail(period),
-                          name='prev_close_low')
+    high_low = high.tail(period) - low.tail(period)
+    high_close = high.tail(period) - close.shift(-1).abs().tail(period)
+    low_close = close.shift(-1).tail(period) - low.abs().tail(period)
 
-    true_range = pd.concat([high_low, high_close, low_close], axis=1)
-    true_range_list = []
+    true_range = kernels.row_max(high_low.values,
+                                 high_close.values,
+                                 low_close.values)
 
-    for row in true_range.itertuples():
-        # TODO: fix this so it doesn't throw an exception for weekends
-        try:
-            true_range_list.append(max(row.high_low,
-                                       row.high_prev_close,
-                                       row.prev_close_low))
-        except TypeError:
-            continue
+    return _dropna(_wrap(true_range, high_low, name='true_range'))
 
-    return pd.Series(true_range_list,
-                     index=df.index[-period:],
-                     name='true_range').dropna()
 
-
-def avg_true_range(df: pd.DataFrame, period=14) -> pd.Series:
+def avg_true_range(df: Bars, period=14) -> Result:
     """
     Moving average of an asset's true range.
 
@@ -310,12 +266,12 @@ def avg_true_range(df: pd.DataFrame, period=14) -> pd.Series:
     atr = tr.rolling(center=False,
                      window=period,
                      min_periods=period - 1).mean()
-    return pd.Series(atr, name='atr').dropna()
+    return _dropna(_named(atr, 'atr'))
 
 
-def smoothed_ma(df: pd.DataFrame,
+def smoothed_ma(df: Bars,
                 period: int = 30,
-                col: str = pd_utils.CLOSE_COL) -> pd.Series:
+                col: str = pd_utils.CLOSE_COL) -> Result:
     """
     Moving average where equal weights are given to historic
     and current prices
@@ -324,11 +280,11 @@ def smoothed_ma(df: pd.DataFrame,
     :param col:
     :return:
     """
-    ma = df[col].ewm(alpha=1 / period).mean()
-    return pd.Series(ma, index=df.index, name='smoothed_ma')
+    ma = _field(df, col).ewm(alpha=1 / period).mean()
+    return _named(ma, 'smoothed_ma')
 
 
-def rsi(df: pd.DataFrame, period: int = 14, col: str = pd_utils.CLOSE_COL):
+def rsi(df: Bars, period: int = 14, col: str = pd_utils.CLOSE_COL):
     """
     Relative strength indicator.
 
@@ -340,32 +296,17 @@ def rsi(df: pd.DataFrame, period: int = 14, col: str = pd_utils.CLOSE_COL):
     :param col:
     :return:
     """
-    rsi_series = pd.DataFrame(index=df.index)
-    gain = [0]
-    loss = [0]
-
-    for row, shifted_row in zip(df[col], df[col].shift(-1)):
-        if row - shifted_row > 0:
-            gain.append(row - shifted_row)
-            loss.append(0)
-        elif row - shifted_row < 0:
-            gain.append(0)
-            loss.append(abs(row - shifted_row))
-        elif row - shifted_row == 0:
-            gain.append(0)
-            loss.append(0)
-
-    rsi_series['gain'] = gain
-    rsi_series['loss'] = loss
-
-    avg_gain = rsi_series['gain'].rolling(window=period).mean()
-    avg_loss = rsi_series['loss'].rolling(window=period).mean()
+    price = _field(df, col)
+    gain, loss = kernels.gain_loss(price.values.astype(float))
+
+    avg_gain = _wrap(gain, price).rolling(window=period).mean()
+    avg_loss = _wrap(loss, price).rolling(window=period).mean()
     relative_strength = avg_gain / avg_loss
     rsi_ = 100 - (100 / (1 + relative_strength))
-    return pd.Series(rsi_, index=df.index, name='rsi')
+    return _named(rsi_, 'rsi')
 
 
-def macd_signal(df: pd.DataFrame,
+def macd_signal(df: Bars,
                 period_fast: int = 12,
                 period_slow: int = 26,
                 signal: int = 9,
@@ -391,30 +332,28 @@ def macd_signal(df: pd.DataFrame,
     :param col: The name of the column.
     :return:
     """
-    ema_fast = pd.Series(df[col].ewm(ignore_na=False,
-                                     min_periods=period_fast - 1,
-                                     span=period_fast).mean(),
-                         index=df.index)
+    price = _field(df, col)
+    ema_fast = price.ewm(ignore_na=False,
+                         min_periods=period_fast - 1,
+                         span=period_fast).mean()
 
-    ema_slow = pd.Series(df[col].ewm(ignore_na=False,
-                                     min_periods=period_slow - 1,
-                                     span=period_slow).mean(),
-                         index=df.index)
+    ema_slow = price.ewm(ignore_na=False,
+                         min_periods=period_slow - 1,
+                         span=period_slow).mean()
 
-    macd_series = pd.Series(ema_fast - ema_slow, index=df.index, name='macd')
+    macd_series = _named(ema_fast - ema_slow, 'macd')
 
     macd_signal_series = macd_series.ewm(ignore_na=False,
                                          span=signal).mean()
 
-    macd_signal_series = pd.Series(macd_signal_series,
-                                   index=df.index,
-                                   name='macd_signal')
-    macd_df = pd.concat([macd_signal_series, macd_series], axis=1)
+    macd_signal_series = _named(macd_signal_series, 'macd_signal')
+    macd_df = _combine([('macd_signal', macd_signal_series),
+                        ('macd', macd_series)])
 
-    return pd.DataFrame(macd_df).dropna()
+    return _dropna(macd_df)
 
 
-def dmi(df: pd.DataFrame, period: int = 14):
+def dmi(df: Bars, period: int = 14):
     """
     DMI also known as Average Directional Movement Index (ADX)
 
@@ -431,40 +370,28 @@ def dmi(df: pd.DataFrame, period: int = 14):
     :param period:
     :return:
     """
-    temp_df = pd.DataFrame()
-    temp_df['up_move'] = df[pd_utils.HIGH_COL].diff()
-    temp_df['down_move'] = df[pd_utils.LOW_COL].diff()
+    high, low = _fields(df, pd_utils.HIGH_COL, pd_utils.LOW_COL)
+    up_move = high.diff()
+    down_move = low.diff()
 
-    positive_dm = []
-    negative_dm = []
+    positive_dm, negative_dm = kernels.directional_movement(
+        up_move.values, down_move.values)
 
-    for row in temp_df.itertuples():
-        if row.up_move > row.down_move and row.up_move > 0:
-            positive_dm.append(row.up_move)
-        else:
-            positive_dm.append(0)
-        if row.down_move > row.up_move and row.down_move > 0:
-            negative_dm.append(row.down_move)
-        else:
-            negative_dm.append(0)
-
-    temp_df['positive_dm'] = positive_dm
-    temp_df['negative_dm'] = negative_dm
+    positive_dm = _wrap(positive_dm, up_move)
+    negative_dm = _wrap(negative_dm, up_move)
 
     atr = avg_true_range(df, period=period * 6)
 
-    dir_plus = pd.Series(
-            100 * (temp_df['positive_dm'] / atr).ewm(span=period,
-                                                     min_periods=period - 1).mean())
+    dir_plus = 100 * (positive_dm / atr).ewm(span=period,
+                                             min_periods=period - 1).mean()
 
-    dir_minus = pd.Series(
-            100 * (temp_df['negative_dm'] / atr).ewm(span=period,
-                                                     min_periods=period - 1).mean())
+    dir_minus = 100 * (negative_dm / atr).ewm(span=period,
+                                              min_periods=period - 1).mean()
     return pd.concat([dir_plus, dir_minus])
 
 
 # noinspection PyTypeChecker
-def bollinger_bands(df: pd.DataFrame,
+def bollinger_bands(df: Bars,
                     period: int = 30,
                     col: str = pd_utils.CLOSE_COL):
     """
@@ -474,16 +401,84 @@ def bollinger_bands(df: pd.DataFrame,
     :param col:
     :return:
     """
-    std_dev = df[col].std()
+    price = _field(df, col)
+    std_dev = price.std()
     middle_band = sma(df, period=period, col=col)
-    upper_bband = pd.Series(middle_band + (2 * std_dev),
-                            name='upper_bband')
-    lower_bband = pd.Series(middle_band - (2 * std_dev),
-                            name='lower_bband')
+    upper_bband = _named(middle_band + (2 * std_dev), 'upper_bband')
+    lower_bband = _named(middle_band - (2 * std_dev), 'lower_bband')
+
+    percent_b = (price - lower_bband) / (upper_bband - lower_bband)
+
+    b_bandwidth = (upper_bband - lower_bband) / middle_band
+
+    return _combine([('upper_bband', upper_bband),
+                     ('sma', middle_band),
+                     ('lower_bband', lower_bband),
+                     ('b_bandwidth', b_bandwidth),
+                     ('percent_b', percent_b)])
+
+
+def _field(df: Bars, col: str) -> Result:
+    """
+    Return the values of one column, a :class:`pd.Series` for a single
+    ticker or a :class:`pd.DataFrame` with a column per ticker for a panel.
+    """
+    if isinstance(df, np.ndarray):
+        if df.ndim == 2:
+            return pd.DataFrame(df)
+        elif df.ndim == 3:
+            return pd.DataFrame(df[:, :, pd_utils.OHLCV_COLS.index(col)])
+        else:
+            raise ValueError('Arrays must be shaped (time, ticker) or '
+                             f'(time, ticker, field), got {df.shape}.')
+    elif isinstance(df.columns, pd.MultiIndex):
+        return df.xs(col, axis=1, level=-1)
+    else:
+        return df[col]
 
-    percent_b = (df[col] - lower_bband) / (upper_bband - lower_bband)
 
-    b_bandwidth = pd.Series((upper_bband - lower_bband) / middle_band)
+def _fields(df: Bars, *cols: str) -> Tuple[Result, ...]:
+    """Return the values of each column in ``cols``, see :func:`_field`."""
+    if isinstance(df, np.ndarray) and df.ndim == 2:
+        raise ValueError(f'{cols} are required, a 2-D array only holds a '
+                         'single field.')
+
+    return tuple(_field(df, col) for col in cols)
+
+
+def _named(result: Result, name: str) -> Result:
+    """Name a single ticker's result, a panel keeps its ticker columns."""
+    if isinstance(result, pd.Series):
+        return result.rename(name)
+    return result
+
+
+def _dropna(result: Result) -> Result:
+    """Drop the rows that no ticker has a value for."""
+    if isinstance(result, pd.Series):
+        return result.dropna()
+    return result.dropna(how='all')
+
+
+def _wrap(values: np.ndarray, like: Result, name: str = None) -> Result:
+    """Wrap the output of a kernel in the same type and index as ``like``."""
+    if values.ndim == 1:
+        return pd.Series(values, index=like.index, name=name)
+
+    return pd.DataFrame(values, index=like.index, columns=like.columns)
+
+
+def _combine(parts: Sequence[Tuple[str, Result]]) -> Result:
+    """
+    Join the outputs of an indicator into one frame. For a panel the columns
+    are ``(ticker, output)``.
+    """
+    results = [r for _, r in parts]
+
+    if all(isinstance(r, pd.Series) for r in results):
+        return pd.concat(results, axis=1)
 
-    return pd.concat([upper_bband, middle_band, lower_bband, b_bandwidth,
-                      percent_b], axis=1)
+    names = [n for n, _ in parts]
+    tickers = results[0].columns
+    out = pd.concat(results, axis=1, keys=names).swaplevel(0, 1, axis=1)
+    return out.reindex(columns=pd.MultiIndex.from_product([tickers, names]))
@@ -8,11 +8,6 @@ from multiprocessing import Process
 import numpy as np
 import pandas as pd
 from pandas_datareader import data as web
-from pytech.crawler.spiders.edgar import EdgarSpider
-from scrapy.crawler import CrawlerRunner
-from scrapy.utils.log import configure_logging
-from scrapy.utils.project import get_project_settings
-from twisted.internet import reactor
 
 import pytech.utils.dt_utils as dt_utils
 import pytech.utils.pandas_utils as pd_utils
@@ -1068,6 +1063,13 @@ class Stock(Asset):
 
     @staticmethod
     def _run_spiders(ticker_list, start_date, end_date):
+        # scrapy and twisted are slow to import and only needed to crawl.
+        from pytech.crawler.spiders.edgar import EdgarSpider
+        from scrapy.crawler import CrawlerRunner
+        from scrapy.utils.log import configure_logging
+        from scrapy.utils.project import get_project_settings
+        from twisted.internet import reactor
+
         configure_logging()
         runner = CrawlerRunner(settings=get_project_settings())
 
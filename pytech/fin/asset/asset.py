@@ -1,7 +1,7 @@
 import datetime as dt
 import logging
 from abc import ABCMeta, abstractmethod
-from typing import Tuple
+from typing import Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -15,17 +15,92 @@ from pytech.fin.market_data.market import Market
 BETA_STORE = 'pytech.beta'
 
 
-def _calc_beta(df: pd.DataFrame) -> pd.Series:
+def calc_rolling_beta(market_returns: pd.Series,
+                      returns: Union[pd.Series, pd.DataFrame],
+                      window: int = 30) -> pd.DataFrame:
     """
-    Calculates beta given a :class:`pd.DataFrame`.
-    It is expected that the df has the stock returns are in column 1 and the
-    market returns in column 0.
+    Calculate the rolling beta of one or many stocks against the market.
+
+    The beta of each window is the slope of an ordinary least squares
+    regression of the stock returns on the market returns,
+    ``cov(stock, market) / var(market)``. The sums each window needs are
+    taken from cumulative sums so every window of every stock is computed
+    at once.
+
+    Each stock's windows are formed from the rows where both it and the
+    market have a return, so a stock that listed late or has a gap does not
+    change the windows of the others. Stocks that are missing the same rows
+    are computed together.
+
+    :param market_returns: The market returns.
+    :param returns: The returns of each stock, one column per stock.
+    :param window: The number of rows in each window.
+    :return: A frame with a row for every date that ends a window of at
+        least one stock and a column for each stock. The beta is NaN for
+        dates that do not end one of the stock's windows and for windows
+        where the market returns do not vary.
     """
-    x = df.values[:, [0]]
-    # noinspection PyUnresolvedReferences
-    x = np.concatenate([np.ones_like(x), x], axis=1)
-    beta = np.linalg.pinv(x.T.dot(x)).dot(x.T).dot(df.values[:, 1:])
-    return pd.Series(beta[1], df.columns[1:], name=df.index[-1])
+    if isinstance(returns, pd.Series):
+        returns = returns.to_frame()
+
+    df = pd.concat([market_returns, returns], axis=1)
+    # no stock can use a row without a market return.
+    df = df[df.iloc[:, 0].notnull()]
+    x = df.values[:, 0]
+    y = df.values[:, 1:]
+    valid = ~np.isnan(y)
+
+    # key=the rows a stock has, value=the positions of the stocks.
+    groups = {}
+    for j in range(y.shape[1]):
+        groups.setdefault(valid[:, j].tobytes(), []).append(j)
+
+    beta = np.full(y.shape, np.nan)
+    ends = np.zeros(len(df), dtype=bool)
+
+    for cols in groups.values():
+        rows = np.flatnonzero(valid[:, cols[0]])
+
+        if len(rows) < window:
+            continue
+
+        last = rows[window - 1:]
+        beta[np.ix_(last, cols)] = _window_betas(x[rows],
+                                                 y[np.ix_(rows, cols)],
+                                                 window)
+        ends[last] = True
+
+    return pd.DataFrame(beta[ends], index=df.index[ends],
+                        columns=returns.columns)
+
+
+def _window_betas(x: np.ndarray, y: np.ndarray, window: int) -> np.ndarray:
+    """
+    The beta of every ``window`` consecutive rows of each column of ``y``
+    against ``x``, neither can have missing values.
+    """
+    # centering first keeps the differences of the cumulative sums precise.
+    x = x - x.mean()
+    y = y - y.mean(axis=0)
+
+    sum_x = _window_sums(x, window)
+    sum_y = _window_sums(y, window)
+    sum_xx = _window_sums(x * x, window)
+    sum_xy = _window_sums(x[:, None] * y, window)
+
+    cov = sum_xy - sum_x[:, None] * sum_y / window
+    var = sum_xx - sum_x * sum_x / window
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(var[:, None] > 0, cov / var[:, None], np.nan)
+
+
+def _window_sums(a: np.ndarray, window: int) -> np.ndarray:
+    """The sum of every ``window`` consecutive rows of ``a``."""
+    cumsum = np.cumsum(a, axis=0)
+    out = cumsum[window - 1:].copy()
+    out[1:] -= cumsum[:-window]
+    return out
 
 
 class Asset(metaclass=ABCMeta):
@@ -139,11 +214,8 @@ class Stock(Asset):
         :return: A DataFrame with the betas.
         """
         stock_pct_change = pd.DataFrame(self.returns(col))
-        mkt_pct_change = pd.DataFrame(self.market.market[col].pct_change())
-        df: pd.DataFrame = pd.concat([mkt_pct_change, stock_pct_change],
-                                     axis=1)
-        betas = pd.concat([_calc_beta(sdf)
-                           for sdf in utils.roll(df, window)], axis=1).T
+        mkt_pct_change = self.market.market[col].pct_change()
+        betas = calc_rolling_beta(mkt_pct_change, stock_pct_change, window)
         betas['ticker'] = self.ticker
         return DfLibName(betas, BETA_STORE)
 
@@ -30,13 +30,19 @@ class OwnedAsset(object):
 
         self.average_share_price_paid = average_share_price
         self.latest_price = average_share_price
-        self.latest_price_time = self.purchase_date.time()
+        # nanoseconds since the epoch, see ``latest_price_time``.
+        self.latest_price_ts = self.purchase_date.value
         self.total_position_value = 0
         self.total_position_cost = 0
 
         self.shares_owned = shares_owned
         self._set_position_cost_and_value(average_share_price)
 
+    @property
+    def latest_price_time(self) -> pd.Timestamp:
+        """The datetime of ``latest_price``."""
+        return dt_utils.from_ns(self.latest_price_ts)
+
     @property
     def shares_owned(self):
         return self._shares_owned
@@ -133,11 +139,12 @@ class OwnedAsset(object):
         market value price.
 
         :param float latest_price:
-        :param datetime or str price_date:
+        :param datetime or str or int price_date: Integers are nanoseconds
+            since the epoch.
         :return:
         """
         self.latest_price = latest_price
-        self.latest_price_time = dt_utils.parse_date(price_date)
+        self.latest_price_ts = dt_utils.to_ns(price_date)
 
         if self.position is Position.SHORT:
             self.total_position_value = (
@@ -0,0 +1,133 @@
+"""
+Persist portfolio state incrementally while a backtest runs.
+"""
+import logging
+from typing import Any, Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+import pytech.utils.dt_utils as dt_utils
+
+
+class HoldingsBuffer(object):
+    """
+    A preallocated, columnar buffer of the portfolio's holdings with one row
+    per tick.
+
+    Rows are appended in place and only the rows that have not been written
+    yet are sent to the db on each :func:`flush`. The first flush replaces
+    whatever is stored under ``symbol`` and every flush after that appends to
+    it, so the amount written over a run is linear in the number of ticks.
+    """
+
+    def __init__(self,
+                 lib,
+                 symbol: str,
+                 columns: Iterable[str],
+                 flush_every: int = None,
+                 initial_size: int = 256):
+        """
+        :param lib: The library to write to, this should be a
+            :class:`PortfolioStore`.
+        :param symbol: The symbol to write the holdings under.
+        :param columns: The columns of each row.
+        :param flush_every: Flush after this many new rows. If ``None`` then
+            nothing is written until :func:`flush` is called.
+        :param initial_size: The number of rows to preallocate. The buffer
+            doubles in size whenever it fills up.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.lib = lib
+        self.symbol = symbol
+        self.columns = list(columns)
+        self.flush_every = flush_every
+        initial_size = max(int(initial_size), 1)
+        # the UTC timestamps of each row in ns.
+        self._index = np.empty(initial_size, dtype=np.int64)
+        self._values = np.empty((initial_size, len(self.columns)))
+        self._size = 0
+        self._flushed = 0
+        self._written = False
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        """The number of rows that fit in the buffer before it grows."""
+        return len(self._index)
+
+    @property
+    def unflushed(self) -> int:
+        """The number of rows that have not been written to the db."""
+        return self._size - self._flushed
+
+    def append(self, date, row: Dict[str, Any]) -> None:
+        """
+        Add a row to the buffer and flush if there are ``flush_every``
+        unflushed rows.
+
+        :param date: The datetime of the tick.
+        :param row: The value of every column.
+        """
+        if self._size == self.capacity:
+            self._grow()
+
+        self._index[self._size] = dt_utils.to_ns(date)
+        self._values[self._size] = [row[c] for c in self.columns]
+        self._size += 1
+
+        if self.flush_every and self.unflushed >= self.flush_every:
+            self.flush()
+
+    def to_frame(self, start: int = 0, stop: int = None) -> pd.DataFrame:
+        """
+        Return the rows in the buffer as a :class:`pd.DataFrame` indexed
+        by datetime.
+
+        :param start: The first row to return.
+        :param stop: The row to stop at, by default every row is returned.
+        """
+        if stop is None:
+            stop = self._size
+
+        index = pd.to_datetime(self._index[start:stop], utc=True)
+        index.name = 'datetime'
+        return pd.DataFrame(self._values[start:stop].copy(),
+                            index=index,
+                            columns=self.columns)
+
+    def flush(self) -> None:
+        """Write every row that has not been written yet."""
+        if not self.unflushed:
+            return
+
+        df = self.to_frame(self._flushed)
+        self.logger.info(f'Writing {len(df)} rows to {self.symbol}.')
+
+        if self._written:
+            self.lib.append(self.symbol, df)
+        else:
+            self.lib.write(self.symbol, df)
+            self._written = True
+
+        self._flushed = self._size
+
+    def snapshot(self, name: str) -> None:
+        """
+        Flush the buffer and take a snapshot of the library.
+
+        :param name: The name of the snapshot.
+        """
+        self.flush()
+        self.lib.snapshot(name)
+
+    def _grow(self) -> None:
+        new_size = self.capacity * 2
+        index = np.empty(new_size, dtype=np.int64)
+        index[:self._size] = self._index[:self._size]
+        values = np.empty((new_size, len(self.columns)))
+        values[:self._size] = self._values[:self._size]
+        self._index = index
+        self._values = values
@@ -10,7 +10,8 @@ import pytech.utils.dt_utils as dt_utils
 from pytech.backtest.event import SignalEvent
 from pytech.data.handler import DataHandler
 from pytech.fin.asset.owned_asset import OwnedAsset
-from pytech.mongo import ARCTIC_STORE, PortfolioStore
+from pytech.fin.persistence import HoldingsBuffer
+from pytech.store import AbstractPortfolioStore, AbstractStore, get_store
 from pytech.trading.blotter import Blotter
 from pytech.trading.trade import Trade
 from pytech.utils import pandas_utils as pd_utils
@@ -44,7 +45,7 @@ class AbstractPortfolio(metaclass=ABCMeta):
     start_date: datetime
     ticker_list: List[str]
     owned_assets: Dict[str, OwnedAsset]
-    lib: PortfolioStore
+    lib: AbstractPortfolioStore
 
     # stores all of the ticks portfolio position.
     POSITION_COLLECTION = 'portfolio'
@@ -57,7 +58,16 @@ class AbstractPortfolio(metaclass=ABCMeta):
                  start_date: datetime,
                  blotter: Blotter,
                  initial_capital: float = 100000.00,
-                 raise_on_warnings=False):
+                 raise_on_warnings=False,
+                 flush_every: int = None,
+                 store: AbstractStore = None):
+        """
+        :param flush_every: Write the holdings to the db after this many
+            ticks. If ``None`` they are only written when :func:`finalize`
+            is called at the end of the backtest.
+        :param store: The store to write the portfolio to. Defaults to
+            :func:`pytech.store.get_store`.
+        """
         self.logger = logging.getLogger(__name__)
         self.bars = data_handler
         self.events = events
@@ -72,10 +82,23 @@ class AbstractPortfolio(metaclass=ABCMeta):
         # positions = qty
         self.all_positions_qty = self._construct_all_positions()
         self.total_commission = 0.0
-        self.lib = ARCTIC_STORE['pytech.portfolio']
-        self.positions_df = pd.DataFrame()
+        self.store = store if store is not None else get_store()
+        self.lib = self.store['pytech.portfolio']
+        self.holdings_buffer = HoldingsBuffer(
+                self.lib,
+                self.POSITION_COLLECTION,
+                list(self.ticker_list) + ['cash', 'commission', 'total'],
+                flush_every=flush_every)
         self.raise_on_warnings = raise_on_warnings
 
+    @property
+    def positions_df(self) -> pd.DataFrame:
+        """
+        The holdings of every tick so far with a row per tick and a column
+        for the market value of each ticker, cash, commission and the total.
+        """
+        return self.holdings_buffer.to_frame()
+
     @property
     def total_value(self):
         """
@@ -205,12 +228,11 @@ class AbstractPortfolio(metaclass=ABCMeta):
 
         self.blotter.check_order_triggers()
 
-        # get an element from the set
-        latest_dt = self.bars.get_latest_bar_dt(next(iter(self.ticker_list)))
+        latest_ts = self.bars.get_current_ts()
 
         # update positions
         # dp = self._get_temp_dict()
-        # dp['datetime'] = latest_dt
+        # dp['datetime'] = latest_ts
         dh = self._get_temp_dict()
 
         for ticker in self.ticker_list:
@@ -224,7 +246,6 @@ class AbstractPortfolio(metaclass=ABCMeta):
 
         # update holdings
         # dh = self._get_temp_dict()
-        index = []
         dh['cash'] = self.cash
         dh['commission'] = self.total_commission
         dh['total'] = self.cash
@@ -238,28 +259,35 @@ class AbstractPortfolio(metaclass=ABCMeta):
                                   f'market value will be set to 0.')
             else:
                 shares_owned = owned_asset.shares_owned
-                adj_close = self.bars.get_latest_bar_value(ticker,
-                                                           pd_utils.ADJ_CLOSE_COL)
+                # the latest value is the last of the one bar window.
+                adj_close = self.bars.get_latest_bar_value(
+                        ticker, pd_utils.ADJ_CLOSE_COL)[-1]
                 market_value = shares_owned * adj_close
-                owned_asset.update_total_position_value(adj_close, latest_dt)
+                owned_asset.update_total_position_value(adj_close, latest_ts)
 
             # approximate to real value.
             dh[ticker] = market_value
             dh['total'] += market_value
-            index.append((latest_dt, ticker))
-
-        multi_index = pd.MultiIndex.from_tuples(index, names=['datetime',
-                                                              'ticker'])
-        df = pd.DataFrame(dh, index=multi_index)
-
-        self.positions_df = pd.concat([self.positions_df, df])
-        self.logger.info('Writing current portfolio state to DB.')
-        self.lib.write_snapshot(self.POSITION_COLLECTION,
-                                self.positions_df,
-                                latest_dt)
-        self.lib.write_snapshot(self.TICK_COLLECTION, df, latest_dt)
+
+        self.holdings_buffer.append(latest_ts, dh)
         self.all_holdings_mv.append(dh)
 
+    def finalize(self):
+        """
+        Write any holdings that have not been written yet along with the
+        latest tick and take one snapshot of the portfolio.
+
+        This should be called once the backtest is complete.
+        """
+        if not len(self.holdings_buffer):
+            return
+
+        self.logger.info('Writing portfolio state to DB.')
+        self.holdings_buffer.flush()
+        latest = self.holdings_buffer.to_frame(len(self.holdings_buffer) - 1)
+        self.lib.write(self.TICK_COLLECTION, latest)
+        self.lib.snapshot(str(latest.index[-1]))
+
 
 class BasicPortfolio(AbstractPortfolio):
     """Here for testing and stuff."""
@@ -270,13 +298,17 @@ class BasicPortfolio(AbstractPortfolio):
                  start_date: datetime,
                  blotter: Blotter,
                  initial_capital: float = 100000.00,
-                 raise_on_warnings=False):
+                 raise_on_warnings=False,
+                 flush_every: int = None,
+                 store: AbstractStore = None):
         super().__init__(data_handler,
                          events,
                          start_date,
                          blotter,
                          initial_capital,
-                         raise_on_warnings)
+                         raise_on_warnings,
+                         flush_every,
+                         store)
 
     def _update_from_trade(self, trade: Trade):
         self.cash += trade.trade_cost()
@@ -312,7 +344,7 @@ class BasicPortfolio(AbstractPortfolio):
                                                                 asset_position)
 
     def update_fill(self, event):
-        if event.type is EventType.FILL:
+        if event.event_type is EventType.FILL:
             order = self.blotter[event.order_id]
             if self.check_liquidity(event.price, event.available_volume):
                 trade = self.blotter.make_trade(order,
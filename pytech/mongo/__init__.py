@@ -1,16 +1,77 @@
+"""
+The arctic store is created the first time it is used rather than when this
+module is imported, so importing :mod:`pytech` never connects to Mongo.
+"""
+import os
+import threading
+
 from arctic import Arctic, register_library_type
-from pymongo import MongoClient
 
 from pytech.mongo.barstore import BarStore
 from pytech.mongo.portfolio_store import PortfolioStore
+from pytech.store.base import (
+    AbstractBarStore,
+    AbstractPortfolioStore,
+    AbstractStore
+)
+
+MONGO_HOST_ENV = 'PYTECH_MONGO_HOST'
+
+_arctic_store = None
+_lock = threading.Lock()
+
+
+def get_arctic_store() -> Arctic:
+    """
+    Return the :class:`Arctic` store, connecting to Mongo and creating the
+    default libraries the first time it is called.
+
+    The host is read from the ``PYTECH_MONGO_HOST`` environment variable
+    and defaults to localhost.
+    """
+    global _arctic_store
+
+    if _arctic_store is None:
+        with _lock:
+            if _arctic_store is None:
+                from pymongo import MongoClient
+                client = MongoClient(os.environ.get(MONGO_HOST_ENV,
+                                                    'localhost'))
+                store = Arctic(client)
+                store.initialize_library(BarStore.LIBRARY_NAME,
+                                         BarStore.LIBRARY_TYPE)
+                store.initialize_library(PortfolioStore.LIBRARY_NAME,
+                                         PortfolioStore.LIBRARY_TYPE)
+                _arctic_store = store
+
+    return _arctic_store
 
 
-client = MongoClient('localhost')
-ARCTIC_STORE = Arctic(client)
+class _LazyArcticStore(object):
+    """
+    Stands in for the :class:`Arctic` store until it is used, at which point
+    every attribute is looked up on the store from :func:`get_arctic_store`.
+    """
+
+    def __getattr__(self, item):
+        return getattr(get_arctic_store(), item)
+
+    def __getitem__(self, item):
+        return get_arctic_store()[item]
+
+    def __repr__(self):
+        if _arctic_store is None:
+            return '<ARCTIC_STORE (not connected)>'
+        return repr(_arctic_store)
+
+
+ARCTIC_STORE = _LazyArcticStore()
+
+# the arctic classes already implement the store interfaces.
+AbstractStore.register(Arctic)
+AbstractStore.register(_LazyArcticStore)
+AbstractBarStore.register(BarStore)
+AbstractPortfolioStore.register(PortfolioStore)
 
 register_library_type(BarStore.LIBRARY_TYPE, BarStore)
 register_library_type(PortfolioStore.LIBRARY_TYPE, PortfolioStore)
-
-ARCTIC_STORE.initialize_library(BarStore.LIBRARY_NAME, BarStore.LIBRARY_TYPE)
-ARCTIC_STORE.initialize_library(PortfolioStore.LIBRARY_NAME,
-                                PortfolioStore.LIBRARY_TYPE)
@@ -1,5 +1,5 @@
 import logging
-from typing import Any, Dict, Union
+from typing import Any, Dict, Iterable, Tuple, Union
 
 import pandas as pd
 from arctic.chunkstore._chunker import Chunker
@@ -7,8 +7,10 @@ from arctic.chunkstore.chunkstore import ChunkStore
 from arctic.chunkstore.date_chunker import DateChunker
 from arctic.date import DateRange
 from arctic.decorators import mongo_retry
+from arctic.exceptions import NoDataFoundException
 
 import pytech.utils as utils
+from pytech.store.base import to_panel
 
 
 class BarStore(ChunkStore):
@@ -45,6 +47,70 @@ class BarStore(ChunkStore):
         return super().read(symbol, chunk_range, filter_data, columns=cols,
                             **kwargs)
 
+    def read_many(self, symbols: Iterable[str],
+                  chunk_range: pd.DatetimeIndex or DateRange = None,
+                  columns: Iterable[str] = None,
+                  as_panel: bool = False,
+                  filter_data: bool = True,
+                  **kwargs) -> Union[Dict[str, pd.DataFrame], pd.DataFrame]:
+        """
+        Retrieve the data for many symbols with a single query.
+
+        Symbols that have no data are left out of the result.
+
+        :param symbols: The keys for the data.
+        :param chunk_range: A range of dates to limit the data to. This is
+            applied to every symbol.
+        :param columns: The columns to return.
+        :param as_panel: If True return one frame aligned on the dates of
+            every symbol with ``(symbol, column)`` columns, otherwise return a
+            dict of frames keyed by symbol.
+        :param filter_data:
+        :param kwargs:
+        :return: The data for every symbol that was found.
+        """
+        symbols = list(symbols)
+
+        try:
+            # arctic returns a dict when it is given a list of symbols.
+            out = self.read(symbols, chunk_range, filter_data,
+                            columns=columns, **kwargs)
+        except NoDataFoundException:
+            out = {}
+
+        if not isinstance(out, dict):
+            # arctic returns the frame itself when one symbol is requested.
+            out = {symbols[0]: out}
+
+        # symbols that are not in the library come back as empty frames.
+        out = {s: df for s, df in out.items()
+               if df is not None and not df.empty}
+
+        self.logger.debug(f'Read {len(out)} of {len(symbols)} symbols.')
+
+        return to_panel(out, symbols) if as_panel else out
+
+    @mongo_retry
+    def get_date_range(self, symbol: str) -> Tuple[pd.Timestamp,
+                                                   pd.Timestamp]:
+        """
+        Return the ``(start, end)`` of the chunks of a symbol without reading
+        the data.
+
+        The chunk ranges only have a date so ``end`` is the last nanosecond
+        of the last chunk's end date.
+
+        :raises NoDataFoundException: If the symbol has no chunks.
+        """
+        try:
+            start, _ = next(self.get_chunk_ranges(symbol))
+            _, end = next(self.get_chunk_ranges(symbol, reverse=True))
+        except StopIteration:
+            raise NoDataFoundException(f'No data found for {symbol}.')
+
+        end = _chunk_date(end) + pd.Timedelta(days=1) - pd.Timedelta(1)
+        return _chunk_date(start), end
+
     @mongo_retry
     def write(self, symbol: str,
               item: pd.DataFrame or pd.Series,
@@ -136,3 +202,10 @@ class BarStore(ChunkStore):
         :param audit: Audit information.
         """
         return super().append(symbol, item, metadata, audit)
+
+
+def _chunk_date(chunk_str) -> pd.Timestamp:
+    """Parse the start or end of a chunk range."""
+    if isinstance(chunk_str, bytes):
+        chunk_str = chunk_str.decode('ascii')
+    return pd.Timestamp(chunk_str)
@@ -87,3 +87,43 @@ class PortfolioStore(VersionStore):
             self.logger.debug('Snapshot with name: '
                               f'{snap_shot} already exists.')
         return versioned_item
+
+    @mongo_retry
+    def append(self, symbol: str,
+               data: pd.Series or pd.DataFrame,
+               metadata: Dict = None,
+               prune_previous_version: bool = True,
+               upsert: bool = True,
+               **kwargs) -> VersionedItem:
+        """
+        Append ``data`` to the existing data for the named symbol, only the
+        new rows are written.
+
+        :param symbol:
+        :param data:
+        :param metadata:
+        :param prune_previous_version:
+        :param upsert: Write the data if the symbol does not exist.
+        :param kwargs:
+        :return:
+        """
+        return super().append(symbol, data, metadata, prune_previous_version,
+                              upsert, **kwargs)
+
+    def snapshot(self, snap_name: str, metadata: Dict = None,
+                 skip_symbols=None, versions=None) -> None:
+        """
+        Snapshot the current versions of the symbols in the library, a
+        snapshot that already exists is left as is.
+
+        :param snap_name: The name of the snapshot.
+        :param metadata:
+        :param skip_symbols:
+        :param versions:
+        """
+        try:
+            self.logger.info(f'Writing snapshot with name: {snap_name}')
+            super().snapshot(snap_name, metadata, skip_symbols, versions)
+        except DuplicateSnapshotException:
+            self.logger.debug('Snapshot with name: '
+                              f'{snap_name} already exists.')
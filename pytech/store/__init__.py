@@ -0,0 +1,11 @@
+from pytech.store.base import (
+    AbstractBarStore,
+    AbstractPortfolioStore,
+    AbstractStore,
+    BAR_STORE,
+    PORTFOLIO_STORE,
+    to_panel
+)
+from pytech.store.config import create_store, get_store, set_store
+from pytech.store.local import LocalStore
+from pytech.store.memory import MemoryStore
@@ -0,0 +1,340 @@
+"""
+The interfaces every storage backend must implement.
+
+They mirror the parts of :class:`arctic.Arctic`, :class:`BarStore` and
+:class:`PortfolioStore` that the rest of the package uses, so the arctic
+classes are registered as virtual subclasses and can be used anywhere a store
+is expected.
+"""
+import datetime as dt
+from abc import ABCMeta, abstractmethod
+from collections import namedtuple
+from typing import Any, Dict, Iterable, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# the library types, these match the arctic library types.
+BAR_STORE = 'BAR_STORE'
+PORTFOLIO_STORE = 'pytech.Portfolio'
+
+# what a portfolio store returns when ``return_metadata`` is True, it has the
+# same fields as arctic's ``VersionedItem``.
+StoredItem = namedtuple('StoredItem', ['symbol', 'library', 'data', 'version',
+                                       'metadata'])
+
+
+class AbstractStore(metaclass=ABCMeta):
+    """A collection of named libraries, like an :class:`arctic.Arctic`."""
+
+    @abstractmethod
+    def list_libraries(self) -> Iterable[str]:
+        """Return the names of every library in the store."""
+        raise NotImplementedError('Must implement list_libraries()')
+
+    @abstractmethod
+    def initialize_library(self, library: str,
+                           lib_type: str = BAR_STORE,
+                           **kwargs) -> None:
+        """
+        Create a library if it does not already exist.
+
+        :param library: The name of the library.
+        :param lib_type: Either :data:`BAR_STORE` or :data:`PORTFOLIO_STORE`.
+        """
+        raise NotImplementedError('Must implement initialize_library()')
+
+    @abstractmethod
+    def get_library(self, library: str):
+        """
+        Return a library.
+
+        :param library: The name of the library.
+        :raises DataAccessError: If the library does not exist.
+        """
+        raise NotImplementedError('Must implement get_library()')
+
+    def __getitem__(self, library: str):
+        return self.get_library(library)
+
+
+class AbstractBarStore(metaclass=ABCMeta):
+    """A library of OHLCV frames keyed by ticker, like a :class:`BarStore`."""
+
+    LIBRARY_TYPE = BAR_STORE
+
+    @abstractmethod
+    def read(self, symbol: str,
+             chunk_range=None,
+             filter_data: bool = True,
+             **kwargs) -> pd.DataFrame:
+        """
+        Read the data for a symbol.
+
+        :param symbol: The key of the data.
+        :param chunk_range: A :class:`DateRange` or :class:`pd.DatetimeIndex`
+            to limit the rows that are returned.
+        :param filter_data: Only here for compatibility with
+            :class:`BarStore`.
+        :param kwargs: ``columns`` can be passed to limit the columns.
+        :raises DataAccessError: If there is no data for the symbol.
+        """
+        raise NotImplementedError('Must implement read()')
+
+    @abstractmethod
+    def write(self, symbol: str,
+              item: Union[pd.DataFrame, pd.Series],
+              metadata: Any = None,
+              chunker=None,
+              audit: Dict = None,
+              **kwargs) -> None:
+        """Write and replace the data for a symbol."""
+        raise NotImplementedError('Must implement write()')
+
+    @abstractmethod
+    def update(self, symbol: str,
+               item: Union[pd.DataFrame, pd.Series],
+               metadata: Any = None,
+               chunk_range=None,
+               upsert: bool = False,
+               audit: Dict = None,
+               **kwargs) -> None:
+        """
+        Overwrite the rows of a symbol that ``item`` has data for, or every
+        row in ``chunk_range`` if it is given.
+
+        :param upsert: If True then write the data even if the symbol does
+            not exist.
+        """
+        raise NotImplementedError('Must implement update()')
+
+    @abstractmethod
+    def append(self, symbol: str,
+               item: Union[pd.DataFrame, pd.Series],
+               metadata: Any = None,
+               audit: Dict = None,
+               **kwargs) -> None:
+        """Append the rows in ``item`` to the data for a symbol."""
+        raise NotImplementedError('Must implement append()')
+
+    @abstractmethod
+    def delete(self, symbol: str,
+               chunk_range=None,
+               audit: Dict = None) -> None:
+        """Delete a symbol or only the rows in ``chunk_range``."""
+        raise NotImplementedError('Must implement delete()')
+
+    @abstractmethod
+    def list_symbols(self, **kwargs) -> Iterable[str]:
+        """Return every symbol in the library."""
+        raise NotImplementedError('Must implement list_symbols()')
+
+    def get_date_range(self, symbol: str) -> Tuple[Any, Any]:
+        """
+        Return the ``(start, end)`` dates of a symbol's data without keeping
+        it in memory, so it can be read in chunks.
+
+        The default implementation reads the symbol, stores that can find
+        the dates from their own index should override it.
+
+        :raises DataAccessError: If there is no data for the symbol.
+        """
+        index = self.read(symbol).index
+        return index.min(), index.max()
+
+    def read_many(self, symbols: Iterable[str],
+                  chunk_range=None,
+                  columns: Iterable[str] = None,
+                  as_panel: bool = False,
+                  filter_data: bool = True,
+                  **kwargs) -> Union[Dict[str, pd.DataFrame], pd.DataFrame]:
+        """
+        Read the data for many symbols at once.
+
+        Symbols that have no data are left out of the result. The default
+        implementation calls :func:`read` for each symbol, stores that can
+        fetch many symbols in one query should override it.
+
+        :param symbols: The keys of the data.
+        :param chunk_range: Limit the rows that are returned, see
+            :func:`read`.
+        :param columns: Limit the columns that are returned.
+        :param as_panel: If True return one frame aligned on the dates of
+            every symbol, see :func:`to_panel`, otherwise return a dict of
+            frames keyed by symbol.
+        """
+        from pytech.utils.exceptions import DataAccessError
+
+        if columns is not None:
+            kwargs['columns'] = columns
+
+        out = {}
+
+        for s in symbols:
+            try:
+                out[s] = self.read(s, chunk_range, filter_data, **kwargs)
+            except DataAccessError:
+                continue
+
+        return to_panel(out) if as_panel else out
+
+
+class AbstractPortfolioStore(metaclass=ABCMeta):
+    """
+    A library of versioned portfolio frames with snapshots, like a
+    :class:`PortfolioStore`.
+    """
+
+    LIBRARY_TYPE = PORTFOLIO_STORE
+
+    @abstractmethod
+    def read(self, symbol: str,
+             as_of: Union[str, int, dt.datetime] = None,
+             date_range=None,
+             from_version: Any = None,
+             allow_secondary: bool = None,
+             return_metadata: bool = False,
+             **kwargs):
+        """
+        Read the data for a symbol.
+
+        :param as_of: A snapshot name or version number to read.
+        :raises DataAccessError: If there is no data for the symbol.
+        """
+        raise NotImplementedError('Must implement read()')
+
+    @abstractmethod
+    def write(self, symbol: str,
+              data: Union[pd.DataFrame, pd.Series],
+              metadata: Dict = None,
+              prune_previous_version: bool = True,
+              **kwargs):
+        """Write a new version of a symbol."""
+        raise NotImplementedError('Must implement write()')
+
+    @abstractmethod
+    def append(self, symbol: str,
+               data: Union[pd.DataFrame, pd.Series],
+               metadata: Dict = None,
+               prune_previous_version: bool = True,
+               upsert: bool = True,
+               **kwargs):
+        """Write a new version of a symbol with ``data`` appended to it."""
+        raise NotImplementedError('Must implement append()')
+
+    @abstractmethod
+    def snapshot(self, snap_name: str,
+                 metadata: Dict = None,
+                 skip_symbols=None,
+                 versions=None) -> None:
+        """Snapshot the current version of every symbol."""
+        raise NotImplementedError('Must implement snapshot()')
+
+    @abstractmethod
+    def delete(self, symbol: str) -> None:
+        """Delete every version of a symbol."""
+        raise NotImplementedError('Must implement delete()')
+
+    @abstractmethod
+    def list_symbols(self, **kwargs) -> Iterable[str]:
+        """Return every symbol in the library."""
+        raise NotImplementedError('Must implement list_symbols()')
+
+    def write_snapshot(self, symbol: str,
+                       data: Union[pd.DataFrame, pd.Series],
+                       snap_shot: Union[dt.datetime, str],
+                       metadata: Dict = None,
+                       prune_previous_version: bool = False,
+                       **kwargs):
+        """
+        Write the data for the named symbol and also create a snapshot with
+        the given name.
+        """
+        item = self.write(symbol, data, metadata, prune_previous_version,
+                          **kwargs)
+        self.snapshot(str(snap_shot))
+        return item
+
+
+def to_panel(frames: Dict[str, pd.DataFrame],
+             symbols: Iterable[str] = None) -> pd.DataFrame:
+    """
+    Align frames on the union of their dates and join them into one frame
+    with ``(symbol, column)`` :class:`pd.MultiIndex` columns.
+
+    :param frames: The frames keyed by symbol.
+    :param symbols: The order of the symbols in the columns, defaults to the
+        order of ``frames``.
+    """
+    if symbols is None:
+        symbols = list(frames.keys())
+    else:
+        symbols = [s for s in symbols if s in frames]
+
+    if not symbols:
+        return pd.DataFrame()
+
+    return pd.concat([frames[s] for s in symbols], axis=1, keys=symbols)
+
+
+def date_bounds(chunk_range) -> Tuple[Any, Any]:
+    """
+    Return the ``(start, end)`` of a :class:`DateRange`, a
+    :class:`pd.DatetimeIndex` or a ``(start, end)`` tuple. Either may be
+    ``None`` for an open ended range.
+    """
+    if chunk_range is None:
+        return None, None
+    elif isinstance(chunk_range, pd.DatetimeIndex):
+        return chunk_range.min(), chunk_range.max()
+    elif isinstance(chunk_range, tuple):
+        return chunk_range
+    else:
+        return chunk_range.start, chunk_range.end
+
+
+def slice_dates(df: Union[pd.DataFrame, pd.Series],
+                chunk_range=None,
+                inside: bool = True) -> Union[pd.DataFrame, pd.Series]:
+    """
+    Return the rows of a datetime indexed frame that are inside (or outside)
+    of a date range.
+
+    The bounds are converted to the timezone of the index so tz aware ranges
+    can be used with tz naive data and vice versa.
+    """
+    start, end = date_bounds(chunk_range)
+    tz = getattr(df.index, 'tz', None)
+
+    if inside and df.index.is_monotonic_increasing:
+        # sorted bars are sliced with a binary search instead of a mask.
+        lo = (0 if start is None
+              else df.index.searchsorted(_as_tz(start, tz), side='left'))
+        hi = (len(df) if end is None
+              else df.index.searchsorted(_as_tz(end, tz), side='right'))
+        return df.iloc[lo:hi]
+
+    mask = np.ones(len(df), dtype=bool)
+
+    if start is not None:
+        mask &= df.index >= _as_tz(start, tz)
+
+    if end is not None:
+        mask &= df.index <= _as_tz(end, tz)
+
+    if not inside:
+        mask = ~mask
+
+    return df[mask]
+
+
+def _as_tz(date, tz) -> pd.Timestamp:
+    date = pd.Timestamp(date)
+
+    if date.tz is None and tz is not None:
+        return date.tz_localize(tz)
+    elif date.tz is not None and tz is None:
+        return date.tz_convert(None)
+    elif date.tz is not None:
+        return date.tz_convert(tz)
+    return date
@@ -0,0 +1,92 @@
+"""
+Choose the store used throughout the package.
+
+The backend is picked with the ``PYTECH_STORE`` environment variable:
+
+    * arctic - the Mongo backed arctic store (default)
+    * memory - a :class:`MemoryStore`
+    * local - a :class:`LocalStore` in ``PYTECH_STORE_DIR`` which defaults
+      to a ``store`` directory in :data:`pytech.DATA_DIR`
+
+or in code with :func:`set_store`.
+"""
+import logging
+import os
+import threading
+
+from pytech.store.base import AbstractStore
+
+logger = logging.getLogger(__name__)
+
+STORE_ENV = 'PYTECH_STORE'
+STORE_DIR_ENV = 'PYTECH_STORE_DIR'
+
+ARCTIC = 'arctic'
+MEMORY = 'memory'
+LOCAL = 'local'
+
+_store = None
+_lock = threading.Lock()
+
+
+def create_store(backend: str = None, **kwargs) -> AbstractStore:
+    """
+    Create a new store.
+
+    :param backend: ``arctic``, ``memory`` or ``local``. Defaults to the
+        value of ``PYTECH_STORE``.
+    :param kwargs: Passed to the store's constructor.
+    """
+    if backend is None:
+        backend = os.environ.get(STORE_ENV, ARCTIC)
+
+    backend = backend.lower()
+    logger.info(f'Creating {backend} store.')
+
+    if backend == ARCTIC:
+        # only connect to mongo when it is actually being used.
+        from pytech.mongo import get_arctic_store
+        return get_arctic_store()
+    elif backend == MEMORY:
+        from pytech.store.memory import MemoryStore
+        return MemoryStore(**kwargs)
+    elif backend == LOCAL:
+        from pytech import DATA_DIR
+        from pytech.store.local import LocalStore
+        root_dir = kwargs.pop('root_dir',
+                              os.environ.get(STORE_DIR_ENV,
+                                             os.path.join(DATA_DIR, 'store')))
+        return LocalStore(root_dir, **kwargs)
+    else:
+        raise ValueError(f'Unknown store backend: {backend}. Must be one of '
+                         f'{[ARCTIC, MEMORY, LOCAL]}.')
+
+
+def get_store() -> AbstractStore:
+    """Return the configured store, creating it the first time."""
+    global _store
+
+    if _store is None:
+        with _lock:
+            if _store is None:
+                _store = create_store()
+
+    return _store
+
+
+def set_store(store) -> None:
+    """
+    Set the store that is returned by :func:`get_store`.
+
+    :param store: Either an :class:`AbstractStore` or the name of a backend.
+        ``None`` resets it to the configured default.
+    """
+    global _store
+
+    if isinstance(store, str):
+        store = create_store(store)
+    elif store is not None and not isinstance(store, AbstractStore):
+        raise TypeError('store must be an AbstractStore. '
+                        f'{type(store)} was provided')
+
+    _store = store
@@ -0,0 +1,347 @@
+"""
+A store that persists libraries to HDF5 files on the local file system.
+
+Each library is a directory and each symbol is a file in it, so reads and
+writes never leave the machine. This requires ``tables`` to be installed.
+"""
+import logging
+import os
+import shutil
+import threading
+from typing import Any, Dict, List, Tuple, Union
+from urllib.parse import quote, unquote
+
+import pandas as pd
+
+from pytech.store.base import (
+    AbstractPortfolioStore,
+    AbstractStore,
+    BAR_STORE,
+    PORTFOLIO_STORE,
+    StoredItem,
+    slice_dates
+)
+from pytech.store.memory import MemoryBarStore, _library_cls
+from pytech.utils.exceptions import DataAccessError
+
+# the key of the data in every file.
+HDF_KEY = 'data'
+HDF_EXT = '.h5'
+LIB_TYPE_FILE = '.lib_type'
+SNAPSHOT_DIR = '_snapshots'
+
+
+def _symbol_path(directory: str, symbol: str) -> str:
+    """Return a file name that is safe for any symbol, such as ``^GSPC``."""
+    return os.path.join(directory, quote(symbol, safe='') + HDF_EXT)
+
+
+def _list_symbols(directory: str) -> List[str]:
+    if not os.path.isdir(directory):
+        return []
+
+    return [unquote(f[:-len(HDF_EXT)]) for f in os.listdir(directory)
+            if f.endswith(HDF_EXT)]
+
+
+def _check_exists(path: str, symbol: str) -> None:
+    if not os.path.exists(path):
+        raise DataAccessError(f'No data found for {symbol}.')
+
+
+def _attrs(store: pd.HDFStore) -> Tuple[Any, int]:
+    attrs = store.get_storer(HDF_KEY).attrs
+    return getattr(attrs, 'metadata', None), getattr(attrs, 'version', 1)
+
+
+def _read_hdf(path: str, symbol: str):
+    _check_exists(path, symbol)
+
+    with pd.HDFStore(path, mode='r') as store:
+        data = store[HDF_KEY]
+        metadata, version = _attrs(store)
+
+    return data, metadata, version
+
+
+def _read_attrs(path: str, symbol: str) -> Tuple[Any, int]:
+    """Read the metadata and version without reading any rows."""
+    _check_exists(path, symbol)
+
+    with pd.HDFStore(path, mode='r') as store:
+        return _attrs(store)
+
+
+def _read_last_index(path: str, symbol: str):
+    """
+    Read the index of the last row only, rows are always written in order
+    so it is the latest one.
+    """
+    _check_exists(path, symbol)
+
+    with pd.HDFStore(path, mode='r') as store:
+        return store.select(HDF_KEY, start=-1).index[-1]
+
+
+def _write_hdf(path: str, data, metadata=None, version: int = 1,
+               append: bool = False) -> None:
+    with pd.HDFStore(path, mode='a') as store:
+        if append:
+            store.append(HDF_KEY, data, format='table')
+        else:
+            store.put(HDF_KEY, data, format='table')
+
+        attrs = store.get_storer(HDF_KEY).attrs
+        attrs.metadata = metadata
+        attrs.version = version
+
+
+class LocalBarStore(MemoryBarStore):
+    """A bar library with a HDF5 file per symbol."""
+
+    def __init__(self, name: str, directory: str):
+        super().__init__(name)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def read_metadata(self, symbol: str) -> Any:
+        return _read_attrs(self._path(symbol), symbol)[0]
+
+    def _path(self, symbol: str) -> str:
+        return _symbol_path(self.directory, symbol)
+
+    def _load(self, symbol: str) -> Union[pd.DataFrame, pd.Series]:
+        return _read_hdf(self._path(symbol), symbol)[0]
+
+    def _save(self, symbol: str, df: Union[pd.DataFrame, pd.Series]) -> None:
+        path = self._path(symbol)
+        metadata = None
+
+        if os.path.exists(path):
+            metadata = _read_attrs(path, symbol)[0]
+
+        _write_hdf(path, df, metadata)
+
+    def _save_metadata(self, symbol: str, metadata: Any) -> None:
+        with pd.HDFStore(self._path(symbol), mode='a') as store:
+            store.get_storer(HDF_KEY).attrs.metadata = metadata
+
+    def _append_rows(self, symbol: str,
+                     df: Union[pd.DataFrame, pd.Series]) -> None:
+        path = self._path(symbol)
+        latest = _read_last_index(path, symbol)
+
+        if df.index.min() > latest and df.index.is_monotonic_increasing:
+            # only the new rows need to be written.
+            metadata = _read_attrs(path, symbol)[0]
+            _write_hdf(path, df, metadata, append=True)
+        else:
+            super()._append_rows(symbol, df)
+
+    def _remove(self, symbol: str) -> None:
+        try:
+            os.remove(self._path(symbol))
+        except FileNotFoundError:
+            pass
+
+    def _symbols(self) -> List[str]:
+        return _list_symbols(self.directory)
+
+
+class LocalPortfolioStore(AbstractPortfolioStore):
+    """
+    A portfolio library with a HDF5 file per symbol.
+
+    Only the latest version of each symbol is kept, a snapshot copies the
+    files of every symbol into a directory named after the snapshot.
+    """
+
+    def __init__(self, name: str, directory: str):
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.directory = directory
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+
+    def get_name(self) -> str:
+        return self.name
+
+    def read(self, symbol: str,
+             as_of=None,
+             date_range=None,
+             from_version: Any = None,
+             allow_secondary: bool = None,
+             return_metadata: bool = False,
+             **kwargs):
+        if as_of is None:
+            path = _symbol_path(self.directory, symbol)
+        elif isinstance(as_of, str):
+            path = _symbol_path(self._snapshot_dir(as_of), symbol)
+        else:
+            raise DataAccessError('Only the latest version or a snapshot can '
+                                  f'be read from a {type(self).__name__}.')
+
+        with self._lock:
+            data, metadata, version = _read_hdf(path, symbol)
+
+        if date_range is not None:
+            data = slice_dates(data, date_range)
+
+        if return_metadata:
+            return StoredItem(symbol, self.name, data, version, metadata)
+        else:
+            return data
+
+    def write(self, symbol: str,
+              data: Union[pd.DataFrame, pd.Series],
+              metadata: Dict = None,
+              prune_previous_version: bool = True,
+              **kwargs) -> StoredItem:
+        path = _symbol_path(self.directory, symbol)
+
+        with self._lock:
+            version = self._next_version(path, symbol)
+            _write_hdf(path, data, metadata, version)
+
+        return StoredItem(symbol, self.name, data, version, metadata)
+
+    def append(self, symbol: str,
+               data: Union[pd.DataFrame, pd.Series],
+               metadata: Dict = None,
+               prune_previous_version: bool = True,
+               upsert: bool = True,
+               **kwargs) -> StoredItem:
+        path = _symbol_path(self.directory, symbol)
+
+        with self._lock:
+            if not os.path.exists(path):
+                if not upsert:
+                    raise DataAccessError(f'Symbol: {symbol} does not exist.')
+                return self.write(symbol, data, metadata)
+
+            old_metadata, version = _read_attrs(path, symbol)
+
+            if metadata is None:
+                metadata = old_metadata
+
+            _write_hdf(path, data, metadata, version + 1, append=True)
+
+        return StoredItem(symbol, self.name, None, version + 1, metadata)
+
+    def snapshot(self, snap_name: str,
+                 metadata: Dict = None,
+                 skip_symbols=None,
+                 versions=None) -> None:
+        skip_symbols = set(skip_symbols or [])
+        snap_dir = self._snapshot_dir(snap_name)
+
+        with self._lock:
+            if os.path.exists(snap_dir):
+                self.logger.debug('Snapshot with name: '
+                                  f'{snap_name} already exists.')
+                return
+
+            os.makedirs(snap_dir)
+
+            for symbol in self.list_symbols():
+                if symbol not in skip_symbols:
+                    shutil.copy2(_symbol_path(self.directory, symbol),
+                                 _symbol_path(snap_dir, symbol))
+
+    def list_snapshots(self) -> List[str]:
+        snap_root = os.path.join(self.directory, SNAPSHOT_DIR)
+
+        if not os.path.isdir(snap_root):
+            return []
+
+        return [unquote(d) for d in os.listdir(snap_root)]
+
+    def delete(self, symbol: str) -> None:
+        with self._lock:
+            try:
+                os.remove(_symbol_path(self.directory, symbol))
+            except FileNotFoundError:
+                pass
+
+    def list_symbols(self, **kwargs) -> List[str]:
+        return sorted(_list_symbols(self.directory))
+
+    def _snapshot_dir(self, snap_name: str) -> str:
+        return os.path.join(self.directory, SNAPSHOT_DIR,
+                            quote(snap_name, safe=''))
+
+    @staticmethod
+    def _next_version(path: str, symbol: str) -> int:
+        if os.path.exists(path):
+            return _read_attrs(path, symbol)[1] + 1
+        return 1
+
+
+class LocalStore(AbstractStore):
+    """
+    Hold libraries in directories under ``root_dir``. The default bar and
+    portfolio libraries are created on init the same way they are for the
+    arctic store.
+    """
+
+    LIBRARY_TYPES = {
+        BAR_STORE: LocalBarStore,
+        PORTFOLIO_STORE: LocalPortfolioStore,
+    }
+
+    def __init__(self, root_dir: str):
+        """
+        :param root_dir: The directory to keep the libraries in, it will be
+            created if it does not exist.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.root_dir = root_dir
+        self._lock = threading.RLock()
+        self._libraries = {}
+        os.makedirs(root_dir, exist_ok=True)
+        self.initialize_library('pytech.bars', BAR_STORE)
+        self.initialize_library('pytech.portfolio', PORTFOLIO_STORE)
+
+    def list_libraries(self) -> List[str]:
+        return [unquote(d) for d in os.listdir(self.root_dir)
+                if os.path.exists(os.path.join(self.root_dir, d,
+                                               LIB_TYPE_FILE))]
+
+    def initialize_library(self, library: str,
+                           lib_type: str = BAR_STORE,
+                           **kwargs) -> None:
+        _library_cls(self, lib_type)
+        lib_dir = self._lib_dir(library)
+        type_file = os.path.join(lib_dir, LIB_TYPE_FILE)
+
+        with self._lock:
+            if os.path.exists(type_file):
+                return
+
+            os.makedirs(lib_dir, exist_ok=True)
+
+            with open(type_file, 'w') as f:
+                f.write(lib_type)
+
+    def get_library(self, library: str):
+        with self._lock:
+            try:
+                return self._libraries[library]
+            except KeyError:
+                pass
+
+            type_file = os.path.join(self._lib_dir(library), LIB_TYPE_FILE)
+
+            try:
+                with open(type_file) as f:
+                    lib_type = f.read().strip()
+            except FileNotFoundError:
+                raise DataAccessError(f'Library: {library} does not exist.')
+
+            lib = _library_cls(self, lib_type)(library,
+                                               self._lib_dir(library))
+            self._libraries[library] = lib
+            return lib
+
+    def _lib_dir(self, library: str) -> str:
+        return os.path.join(self.root_dir, quote(library, safe=''))
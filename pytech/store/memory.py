@@ -0,0 +1,368 @@
+"""
+A store that keeps everything in memory. Nothing is persisted once the
+process exits, which makes it a good fit for tests and one off backtests.
+"""
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+import pandas as pd
+
+import pytech.utils.pandas_utils as pd_utils
+from pytech.store.base import (
+    AbstractBarStore,
+    AbstractPortfolioStore,
+    AbstractStore,
+    BAR_STORE,
+    PORTFOLIO_STORE,
+    StoredItem,
+    slice_dates
+)
+from pytech.utils.exceptions import DataAccessError
+
+
+class MemoryBarStore(AbstractBarStore):
+    """
+    A bar library that keeps a :class:`pd.DataFrame` per symbol.
+
+    Child classes can persist the data elsewhere by overriding the ``_load``,
+    ``_save``, ``_save_metadata``, ``_append_rows``, ``_remove`` and
+    ``_symbols`` methods as well as :func:`read_metadata`.
+    """
+
+    def __init__(self, name: str):
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self._lock = threading.RLock()
+        self._data = {}
+        self._metadata = {}
+
+    def get_name(self) -> str:
+        return self.name
+
+    def read(self, symbol: str,
+             chunk_range=None,
+             filter_data: bool = True,
+             **kwargs) -> Union[pd.DataFrame, pd.Series]:
+        """
+        Read the data for a symbol.
+
+        :raises DataAccessError: If there is no data for the symbol in
+            ``chunk_range``.
+        """
+        columns = kwargs.pop('columns', None)
+
+        with self._lock:
+            df = self._load(symbol)
+
+        if chunk_range is not None:
+            df = slice_dates(df, chunk_range)
+
+        if df.empty:
+            raise DataAccessError(f'No data found for {symbol} in range.')
+
+        if columns is not None:
+            if isinstance(columns, str):
+                columns = [columns]
+            df = df[list(columns)]
+
+        return df.copy()
+
+    def write(self, symbol: str,
+              item: Union[pd.DataFrame, pd.Series],
+              metadata: Any = None,
+              chunker=None,
+              audit: Dict = None,
+              **kwargs) -> None:
+        item = _check_item(item)
+
+        with self._lock:
+            self._save(symbol, item.sort_index())
+            self._save_metadata(symbol, metadata)
+
+    def update(self, symbol: str,
+               item: Union[pd.DataFrame, pd.Series],
+               metadata: Any = None,
+               chunk_range=None,
+               upsert: bool = False,
+               audit: Dict = None,
+               **kwargs) -> None:
+        item = _check_item(item)
+
+        with self._lock:
+            if symbol not in self.list_symbols():
+                if upsert:
+                    return self.write(symbol, item, metadata, **kwargs)
+                raise DataAccessError(f'Symbol: {symbol} does not exist.')
+
+            existing = self._load(symbol)
+
+            if chunk_range is not None:
+                existing = slice_dates(existing, chunk_range, inside=False)
+                item = slice_dates(item, chunk_range)
+            else:
+                existing = existing[~existing.index.isin(item.index)]
+
+            self._save(symbol, pd.concat([existing, item]).sort_index())
+
+            if metadata is not None:
+                self._save_metadata(symbol, metadata)
+
+    def append(self, symbol: str,
+               item: Union[pd.DataFrame, pd.Series],
+               metadata: Any = None,
+               audit: Dict = None,
+               **kwargs) -> None:
+        item = _check_item(item)
+
+        with self._lock:
+            if symbol not in self.list_symbols():
+                return self.write(symbol, item, metadata, **kwargs)
+
+            self._append_rows(symbol, item)
+
+            if metadata is not None:
+                self._save_metadata(symbol, metadata)
+
+    def delete(self, symbol: str,
+               chunk_range=None,
+               audit: Dict = None) -> None:
+        with self._lock:
+            if chunk_range is None:
+                self._remove(symbol)
+                self._metadata.pop(symbol, None)
+            else:
+                self._save(symbol, slice_dates(self._load(symbol),
+                                               chunk_range,
+                                               inside=False))
+
+    def list_symbols(self, **kwargs) -> List[str]:
+        return sorted(self._symbols())
+
+    def read_metadata(self, symbol: str) -> Any:
+        return self._metadata.get(symbol)
+
+    def get_date_range(self, symbol: str) -> Tuple[Any, Any]:
+        with self._lock:
+            index = self._load(symbol).index
+
+        if not len(index):
+            raise DataAccessError(f'No data found for {symbol}.')
+
+        return index.min(), index.max()
+
+    def _load(self, symbol: str) -> Union[pd.DataFrame, pd.Series]:
+        try:
+            return self._data[symbol]
+        except KeyError:
+            raise DataAccessError(f'No data found for {symbol}.')
+
+    def _save(self, symbol: str, df: Union[pd.DataFrame, pd.Series]) -> None:
+        self._data[symbol] = df
+
+    def _save_metadata(self, symbol: str, metadata: Any) -> None:
+        self._metadata[symbol] = metadata
+
+    def _append_rows(self, symbol: str,
+                     df: Union[pd.DataFrame, pd.Series]) -> None:
+        self._save(symbol, pd.concat([self._load(symbol), df]).sort_index())
+
+    def _remove(self, symbol: str) -> None:
+        self._data.pop(symbol, None)
+
+    def _symbols(self) -> Iterable[str]:
+        return self._data.keys()
+
+
+class MemoryPortfolioStore(AbstractPortfolioStore):
+    """
+    A portfolio library that keeps every version of every symbol, unless it
+    is pruned, and snapshots of the versions.
+    """
+
+    def __init__(self, name: str):
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self._lock = threading.RLock()
+        # symbol -> list of StoredItems, None once a version has been pruned.
+        self._versions = {}
+        # snapshot name -> {symbol: version}
+        self._snapshots = {}
+
+    def get_name(self) -> str:
+        return self.name
+
+    def read(self, symbol: str,
+             as_of=None,
+             date_range=None,
+             from_version: Any = None,
+             allow_secondary: bool = None,
+             return_metadata: bool = False,
+             **kwargs):
+        item = self._get_item(symbol, as_of)
+
+        if date_range is not None:
+            item = item._replace(data=slice_dates(item.data, date_range))
+
+        if return_metadata:
+            return item
+        else:
+            return item.data
+
+    def write(self, symbol: str,
+              data: Union[pd.DataFrame, pd.Series],
+              metadata: Dict = None,
+              prune_previous_version: bool = True,
+              **kwargs) -> StoredItem:
+        with self._lock:
+            versions = self._versions.setdefault(symbol, [])
+            item = StoredItem(symbol, self.name, data.copy(),
+                              len(versions) + 1, metadata)
+            versions.append(item)
+
+            if prune_previous_version:
+                self._prune(symbol)
+
+            return item
+
+    def append(self, symbol: str,
+               data: Union[pd.DataFrame, pd.Series],
+               metadata: Dict = None,
+               prune_previous_version: bool = True,
+               upsert: bool = True,
+               **kwargs) -> StoredItem:
+        with self._lock:
+            try:
+                latest = self._get_item(symbol)
+            except DataAccessError:
+                if not upsert:
+                    raise
+                return self.write(symbol, data, metadata,
+                                  prune_previous_version)
+
+            if metadata is None:
+                metadata = latest.metadata
+
+            return self.write(symbol, pd.concat([latest.data, data]),
+                              metadata, prune_previous_version)
+
+    def snapshot(self, snap_name: str,
+                 metadata: Dict = None,
+                 skip_symbols=None,
+                 versions=None) -> None:
+        skip_symbols = set(skip_symbols or [])
+        versions = versions or {}
+
+        with self._lock:
+            if snap_name in self._snapshots:
+                self.logger.debug('Snapshot with name: '
+                                  f'{snap_name} already exists.')
+                return
+
+            self._snapshots[snap_name] = {
+                s: versions.get(s, len(v))
+                for s, v in self._versions.items() if s not in skip_symbols
+            }
+
+    def list_snapshots(self) -> List[str]:
+        return list(self._snapshots.keys())
+
+    def delete(self, symbol: str) -> None:
+        with self._lock:
+            self._versions.pop(symbol, None)
+
+    def list_symbols(self, **kwargs) -> List[str]:
+        return sorted(self._versions.keys())
+
+    def _get_item(self, symbol: str, as_of=None) -> StoredItem:
+        try:
+            versions = self._versions[symbol]
+        except KeyError:
+            raise DataAccessError(f'No data found for {symbol}.')
+
+        if as_of is None:
+            version = len(versions)
+        elif isinstance(as_of, int):
+            version = as_of
+        elif isinstance(as_of, str) and as_of in self._snapshots:
+            version = self._snapshots[as_of].get(symbol)
+        else:
+            raise DataAccessError(f'Cannot read {symbol} as of {as_of}.')
+
+        if version is None or not 0 < version <= len(versions):
+            raise DataAccessError(f'No version of {symbol} as of {as_of}.')
+
+        item = versions[version - 1]
+
+        if item is None:
+            raise DataAccessError(f'Version {version} of {symbol} has been '
+                                  'pruned.')
+
+        return item
+
+    def _prune(self, symbol: str) -> None:
+        """Drop every old version that is not part of a snapshot."""
+        versions = self._versions[symbol]
+        keep = {snap.get(symbol) for snap in self._snapshots.values()}
+        keep.add(len(versions))
+
+        for i in range(len(versions)):
+            if i + 1 not in keep:
+                versions[i] = None
+
+
+class MemoryStore(AbstractStore):
+    """
+    Hold libraries in memory. The default bar and portfolio libraries are
+    created on init the same way they are for the arctic store.
+    """
+
+    LIBRARY_TYPES = {
+        BAR_STORE: MemoryBarStore,
+        PORTFOLIO_STORE: MemoryPortfolioStore,
+    }
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.RLock()
+        self._libraries = {}
+        self.initialize_library('pytech.bars', BAR_STORE)
+        self.initialize_library('pytech.portfolio', PORTFOLIO_STORE)
+
+    def list_libraries(self) -> List[str]:
+        return list(self._libraries.keys())
+
+    def initialize_library(self, library: str,
+                           lib_type: str = BAR_STORE,
+                           **kwargs) -> None:
+        with self._lock:
+            if library in self._libraries:
+                return
+
+            self._libraries[library] = _library_cls(self, lib_type)(library)
+
+    def get_library(self, library: str):
+        try:
+            return self._libraries[library]
+        except KeyError:
+            raise DataAccessError(f'Library: {library} does not exist.')
+
+
+def _library_cls(store, lib_type: str):
+    try:
+        return store.LIBRARY_TYPES[lib_type]
+    except KeyError:
+        raise ValueError(f'Unknown library type: {lib_type}. Must be one of '
+                         f'{list(store.LIBRARY_TYPES.keys())}.')
+
+
+def _check_item(item):
+    if not isinstance(item, (pd.DataFrame, pd.Series)):
+        raise TypeError('Can only store DataFrames and Series. '
+                        f'{type(item)} was provided')
+
+    if isinstance(item, pd.DataFrame):
+        # ensure that the column names are correct before writing it.
+        item = pd_utils.rename_bar_cols(item)
+
+    return item
@@ -1,4 +1,3 @@
-import collections
 import logging
 import operator
 import queue
@@ -17,7 +16,8 @@ from pytech.trading.order import (
     LimitOrder, MarketOrder, Order,
     StopLimitOrder, StopOrder, get_order_types
 )
-from pytech.trading.trade import Trade
+from pytech.trading.order_book import OrderBook
+from pytech.trading.trade import Trade, TradeLog
 from pytech.utils.enums import (
     OrderStatus, OrderSubType, OrderType,
     TradeAction
@@ -30,7 +30,7 @@ class Blotter(object):
     """Holds and interacts with all orders."""
 
     # Type hints
-    orders: Dict[str, AnyOrder]
+    book: OrderBook
     events: queue.Queue
     current_dt = datetime
     commission_model: AbstractCommissionModel.__subclasses__()
@@ -40,10 +40,12 @@ class Blotter(object):
                  commission_model=None,
                  max_shares=None):
         self.logger = logging.getLogger(__name__)
-        # dict of all orders. key=ticker of the asset, value=the order.
-        self.orders = {}
+        # every open order, indexed by id, ticker and trigger price.
+        self.book = OrderBook()
+        # filled, cancelled and rejected orders. key=order_id, value=order.
+        self.closed_orders = {}
         # keep a record of all past trades.
-        self.trades = []
+        self.trades = TradeLog()
         self.current_dt = None
         # events queue
         self.events = events
@@ -79,46 +81,49 @@ class Blotter(object):
             raise TypeError(f'bars must be an instance of DataHandler. '
                             f'{type(data_handler)} was provided')
 
-    def __getitem__(self, key) -> Order:
-        """Get an order from the orders dict."""
-        return self.orders[key]
+    @property
+    def orders(self) -> Dict[str, Dict[str, AnyOrder]]:
+        """
+        Every order grouped by ticker. key=ticker of the asset, value=dict
+        with key=order_id and value=``Order``.
+        """
+        return self.book.by_ticker
+
+    def __getitem__(self, order_id: str) -> Order:
+        """Get an open or closed order by its id."""
+        try:
+            return self.book[order_id]
+        except KeyError:
+            return self.closed_orders[order_id]
 
     def __setitem__(self, key, value):
         """
-        Add an order to the orders dict.
-        If the key is an instance of :class:`~ticker.Asset` then the ticker is used as the key, otherwise the key is the
-        ticker.
-        :param key: The key to dictionary, will always be the ticker of the ``Asset`` the order is for but an instance
-        of :class:`~ticker.Asset` will also work as long as the ticker is set.
+        Add an order.
+
+        :param key: The ticker of the ``Asset`` the order is for but an
+            instance of :class:`~ticker.Asset` will also work as long as the
+            ticker is set.
         :type key: Asset or str
         :param Order value: The order.
         """
         if issubclass(key.__class__, Asset):
-            self.orders[key.ticker] = value
+            value.ticker = key.ticker
         else:
-            self.orders[key] = value
+            value.ticker = key
+        self.book.add(value)
 
-    def __delitem__(self, key):
-        """Delete an order from the orders dict."""
-        del self.orders[key]
+    def __delitem__(self, order_id):
+        """Delete an order by its id."""
+        self.book.remove(order_id)
 
     def __iter__(self):
         """
-        Iterate over the orders dict as well as the nested orders dict which
-        key=order_id and value=``Order``
+        Iterate over every order as tuples of ``(order_id, Order)``.
 
         This means you can iterate over a :class:``Blotter`` instance directly
         and access all of the open orders it has.
         """
-
-        def do_iter(orders_dict):
-            for k, v in orders_dict.items():
-                if isinstance(v, collections.Mapping):
-                    yield from do_iter(v)
-                else:
-                    yield k, v
-
-        return do_iter(self.orders)
+        return ((order.id, order) for order in self.book)
 
     def place_order(self,
                     ticker: str,
@@ -203,14 +208,7 @@ class Blotter(object):
                                    max_days_open=max_days_open,
                                    **kwargs)
 
-        if ticker in self.orders:
-            self.orders[ticker].update({
-                order.id: order
-            })
-        else:
-            self.orders[ticker] = {
-                order.id: order
-            }
+        self.book.add(order)
 
     def _create_order(self,
                       ticker: str,
@@ -237,15 +235,20 @@ class Blotter(object):
         if order_type is OrderType.STOP_LIMIT:
             return StopLimitOrder(ticker, action, qty, **kwargs)
 
-    def _find_order(self, order_id, ticker):
-        if ticker is None:
-            for asset_orders in self.orders:
-                if order_id in asset_orders:
-                    return asset_orders[order_id]
-        else:
-            for k, v in self.orders[ticker].items():
-                if k == order_id:
-                    return v
+    def _find_order(self, order_id, ticker=None):
+        """
+        Return an order by id.
+
+        :raises KeyError: If the order does not exist or is not for
+            ``ticker``.
+        """
+        order = self[order_id]
+
+        if ticker is not None and order.ticker != ticker:
+            raise KeyError(f'Order id: {order_id} is not for ticker: '
+                           f'{ticker}')
+
+        return order
 
     def cancel_order(self, order_id, ticker=None, reason=''):
         """
@@ -253,10 +256,7 @@ class Blotter(object):
 
         :param str order_id: The id of the order to cancel.
         :param ticker: (optional) The ticker that the order is associated with.
-            Although it is not required to provide a ticker,
-            it is **strongly** encouraged.
-            By providing a ticker the execution time of this method will
-            increase greatly.
+            If it is given the order must be for the ticker.
         :param str reason: (optional)
             The reason that the order is being cancelled.
         :return:
@@ -284,7 +284,7 @@ class Blotter(object):
         :param TradeAction trade_action: (optional) Only cancel orders that are
         either ``BUY`` or ``SELL``.
         """
-        for order in self.orders[ticker].values():
+        for order in list(self.orders.get(ticker, {}).values()):
             if self._check_filters(order, upper_price, lower_price,
                                    order_type, trade_action):
                 self._do_order_cancel(order, reason)
@@ -431,6 +431,16 @@ class Blotter(object):
                              'successfully before it was executed.')
         order.cancel(reason)
         order.last_updated = self.current_dt
+        self._close_order(order)
+
+    def _close_order(self, order: AnyOrder) -> None:
+        """
+        Move an order that is no longer open out of the active orders so it
+        is never checked again.
+        """
+        if order.id in self.book:
+            self.book.remove(order.id)
+        self.closed_orders[order.id] = order
 
     def hold_order(self, order):
         """
@@ -438,7 +448,7 @@ class Blotter(object):
 
         :param order:
         """
-        self.orders[order.ticker][order.id].status = OrderStatus.HELD
+        self.book[order.id].status = OrderStatus.HELD
 
     def hold_all_orders_for_asset(self, ticker: str,
                                   upper_price: float = None,
@@ -458,7 +468,7 @@ class Blotter(object):
         :param trade_action: (optional) Only hold orders that are
         either ``BUY`` or ``SELL``.
         """
-        for order in self.orders[ticker].values():
+        for order in list(self.orders.get(ticker, {}).values()):
             if self._check_filters(order, upper_price, lower_price,
                                    order_type, trade_action):
                 self.hold_order(order)
@@ -478,7 +488,9 @@ class Blotter(object):
         :return:
         """
 
-        self._find_order(order_id, ticker).reject(reason)
+        order = self._find_order(order_id, ticker)
+        order.reject(reason)
+        self._close_order(order)
 
         self.logger.warning(
                 f'Order id: {order_id} for ticker: {ticker} '
@@ -487,19 +499,40 @@ class Blotter(object):
     def check_order_triggers(self):
         """
         Check if any order has been triggered and if they have execute the
-        trade and then clean up closed orders.
+        trade.
+
+        The latest bar is read once per ticker and only the orders whose stop
+        or limit price was crossed, market orders and orders that were
+        already triggered are checked.
         """
-        for order_id, order in self:
+        for ticker in self.book.tickers:
             # should this be looking the close column?
-            bar = self.bars.get_latest_bar(order.ticker)
-            dt = bar.name
+            bar = self.bars.get_latest_bar(ticker)
+            ts = self.bars.get_latest_bar_ts(ticker)
             current_price = bar[utils.CLOSE_COL]
             # available_volume = bar[pd_utils.VOL_COL]
-            # check_triggers returns a boolean indicating if it is triggered.
-            if order.check_triggers(dt=dt, current_price=current_price):
-                self.events.put(
-                        TradeEvent(order_id, current_price, order.qty, dt)
-                )
+            candidates = self.book.candidates(ticker, current_price)
+
+            if not candidates:
+                continue
+
+            # orders keep datetimes, only convert when one is checked.
+            dt = utils.from_ns(ts)
+
+            for order in candidates:
+                if not order.open:
+                    # closed without going through the blotter.
+                    self._close_order(order)
+                    continue
+
+                # check_triggers returns a boolean indicating if it is
+                # triggered.
+                if order.check_triggers(dt=dt, current_price=current_price):
+                    self.events.put(
+                            TradeEvent(order.id, current_price, order.qty, ts)
+                    )
+
+                self.book.reindex(order)
 
     def make_trade(self,
                    order: AnyOrder,
@@ -544,15 +577,19 @@ class Blotter(object):
 
         order.filled += trade.qty
         self.trades.append(trade)
+
+        if not order.open:
+            self._close_order(order)
+
         return trade
 
     def purge_orders(self):
-        """Remove any order that is no longer open."""
-        open_orders = {}
-
-        for ticker, asset_orders in self.orders:
-            for order in asset_orders:
-                if order.open and order.open_amount != 0:
-                    open_orders[ticker] = order
+        """
+        Move any order that is no longer open to :attr:`closed_orders`.
 
-        self.orders = open_orders
+        Orders closed through the blotter are moved as soon as they close, so
+        this is only needed for orders whose status was changed directly.
+        """
+        for order in self.book:
+            if not order.open or order.open_amount == 0:
+                self._close_order(order)
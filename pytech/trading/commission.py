@@ -2,6 +2,8 @@
 
 from abc import ABCMeta, abstractmethod
 
+import numpy as np
+
 DEFAULT_MINIMUM_COST_PER_ORDER = 5.0
 
 
@@ -28,6 +30,31 @@ class AbstractCommissionModel(metaclass=ABCMeta):
 
         raise (NotImplementedError('calculate must be overridden'))
 
+    def calculate_many(self, qty, execution_price):
+        """
+        Calculate the commission for many trades at once, where every non zero
+        element of ``qty`` is treated as a trade from its own order.
+
+        This is used by the vectorized backtest. The default implementation
+        calls :func:`calculate` once per trade so child classes should
+        override it with an array based version when they can.
+
+        :param np.ndarray qty: The number of shares traded.
+        :param np.ndarray execution_price: The cost per share, must be the
+            same shape as ``qty``.
+        :return: The commission for every element of ``qty``.
+        :rtype: np.ndarray
+        """
+        qty = np.asarray(qty)
+        execution_price = np.asarray(execution_price)
+        out = np.zeros(qty.shape)
+
+        for idx in zip(*np.nonzero(qty)):
+            out[idx] = self.calculate(_TradeOrder(qty[idx]),
+                                      execution_price[idx]) or 0.0
+
+        return out
+
 
 class PerOrderCommissionModel(AbstractCommissionModel):
     """
@@ -52,3 +79,19 @@ class PerOrderCommissionModel(AbstractCommissionModel):
             return self.cost
         else:
             return 0
+
+    def calculate_many(self, qty, execution_price):
+        """Every trade is a new order so the fixed cost is always paid."""
+        return np.where(np.asarray(qty) != 0, self.cost, 0.0)
+
+
+class _TradeOrder(object):
+    """
+    The minimal amount of an :class:`Order` needed to calculate commission
+    for a trade that was not created from a real order.
+    """
+
+    def __init__(self, qty):
+        self.qty = qty
+        self.filled = 0
+        self.commission = 0.0
@@ -28,7 +28,7 @@ class SimpleExecutionHandler(ExecutionHandler):
         :return:
         """
 
-        if event.type is EventType.TRADE:
+        if event.event_type is EventType.TRADE:
             fill_event = FillEvent(event.order_id, event.price, event.qty,
-                                   event.dt)
+                                   event.ts)
             self.events.put(fill_event)
@@ -7,7 +7,6 @@ from typing import TypeVar
 
 import numpy as np
 import pandas as pd
-import pandas_market_calendars as mcal
 from pandas.tseries.offsets import DateOffset
 
 import pytech.utils.common_utils as utils
@@ -214,7 +213,8 @@ class Order(metaclass=ABCMeta):
         :rtype: bool
         """
 
-    def check_order_expiration(self, current_date=datetime.now()):
+    def check_order_expiration(self, current_date: datetime = None,
+                               calendar: str = 'NYSE'):
         """
         Check if the order should be closed due to passage of time and update
         the order's status.
@@ -223,18 +223,20 @@ class Order(metaclass=ABCMeta):
         so that the current date can be mocked in order to accurately
         trigger/cancel orders in the past.
         (default: datetime.now())
+        :param str calendar: The name of the trading calendar to use.
         """
-        trading_cal = mcal.get_calendar(self.portfolio.trading_cal)
-        schedule = trading_cal.schedule(start_date=self.portfolio.start_date,
-                                        end_date=self.portfolio.end_date)
+        if current_date is None:
+            current_date = datetime.now()
+
+        current_date = dt_utils.parse_date(current_date)
+        trading_cal = dt_utils.get_calendar(calendar)
 
         if self.order_subtype is OrderSubType.DAY:
-            if not trading_cal.open_at_time(schedule,
-                                            pd.Timestamp(current_date)):
+            if not trading_cal.open_at_time(current_date):
                 reason = 'Market closed without executing order.'
                 self.logger.info(
                         'Canceling trade for ticker: {} due to {}'.format(
-                                self.ticker.ticker, reason))
+                                self.ticker, reason))
                 self.cancel(reason=reason)
         elif self.order_subtype is OrderSubType.GOOD_TIL_CANCELED:
             expr_date = self.created + DateOffset(days=self.max_days_open)
@@ -242,14 +244,13 @@ class Order(metaclass=ABCMeta):
             if current_date.date() == expr_date.date():
                 # if the expiration date is today then
                 # check if the market has closed.
-                if not trading_cal.open_at_time(schedule,
-                                                pd.Timestamp(current_date)):
+                if not trading_cal.open_at_time(current_date):
                     reason = ('Max days of {} had passed without the '
                               'underlying order executing.'
                               .format(self.max_days_open))
                     self.logger.info(
                             'Canceling trade for ticker: {} due to {}'.format(
-                                    self.ticker.ticker, reason))
+                                    self.ticker, reason))
                     self.cancel(reason=reason)
         else:
             return
@@ -358,16 +359,15 @@ class LimitOrder(Order):
         :param dt:
         :return:
         """
-        if self.action is TradeAction.BUY and current_price <= self.limit_price:
-            self.limit_reached = True
-            self.last_updated = dt
+        if self.action is TradeAction.BUY:
+            if current_price <= self.limit_price:
+                self.limit_reached = True
         elif current_price >= self.limit_price:
             # The only other actions are SELL and EXIT which are both sell.
             self.limit_reached = True
-            self.last_updated = dt
-        else:
-            # Update the updated date to show the last time it was checked.
-            self.last_updated = dt
+
+        # Update the updated date to show the last time it was checked.
+        self.last_updated = dt
 
         return self.triggered
 
@@ -418,14 +418,13 @@ class StopOrder(Order):
         return OrderType.STOP
 
     def check_triggers(self, current_price: float, dt: datetime) -> bool:
-        if self.action is TradeAction.BUY and current_price >= self.stop_price:
-            self.stop_reached = True
-            self.last_updated = dt
+        if self.action is TradeAction.BUY:
+            if current_price >= self.stop_price:
+                self.stop_reached = True
         elif current_price <= self.stop_price:
             self.stop_reached = True
-            self.last_updated = dt
-        else:
-            self.last_updated = dt
+
+        self.last_updated = dt
 
         return self.triggered
 
@@ -0,0 +1,194 @@
+import itertools
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterator, List, Tuple
+
+from pytech.trading.order import (
+    LimitOrder, MarketOrder, StopOrder,
+    get_order_types
+)
+from pytech.utils.enums import TradeAction
+
+AnyOrder = get_order_types()
+
+# (price, sequence, order id), the sequence keeps the keys unique.
+_Level = Tuple[float, int, str]
+
+
+class OrderBook(object):
+    """
+    Index of every order in a :class:`pytech.trading.blotter.Blotter`.
+
+    Orders can be looked up by id in O(1). The stop and limit prices of the
+    orders that have not been triggered yet are kept sorted for each ticker,
+    so finding the orders a price could trigger is a binary search instead of
+    a check of every order.
+
+    An order is in one of two sorted lists for each price it is waiting on:
+
+    * ``rising``: triggered once the price is **at or above** the level, buy
+      stops and sell limits.
+    * ``falling``: triggered once the price is **at or below** the level, sell
+      stops and buy limits.
+
+    Market orders and orders that have already been triggered are checked on
+    every bar until they are removed.
+    """
+
+    def __init__(self):
+        # key=order id, value=order
+        self._orders: Dict[str, AnyOrder] = {}
+        # key=ticker, value=dict of order id to order
+        self._by_ticker: Dict[str, Dict[str, AnyOrder]] = {}
+        self._rising: Dict[str, List[_Level]] = {}
+        self._falling: Dict[str, List[_Level]] = {}
+        # key=ticker, value=dict of order id to order
+        self._always: Dict[str, Dict[str, AnyOrder]] = {}
+        # key=order id, value=the levels the order is in.
+        self._levels: Dict[str, List[Tuple[List[_Level], _Level]]] = {}
+        # key=order id, value=the sequence the order was added in.
+        self._seq: Dict[str, int] = {}
+        self._counter = itertools.count()
+
+    def __getitem__(self, order_id: str) -> AnyOrder:
+        return self._orders[order_id]
+
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self._orders
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __iter__(self) -> Iterator[AnyOrder]:
+        """Iterate over every order in the order they were added."""
+        return iter(list(self._orders.values()))
+
+    @property
+    def by_ticker(self) -> Dict[str, Dict[str, AnyOrder]]:
+        """Every order grouped by ticker, key=order id and value=order."""
+        return self._by_ticker
+
+    @property
+    def tickers(self) -> List[str]:
+        """The tickers that have at least one order."""
+        return list(self._by_ticker.keys())
+
+    def get(self, order_id: str, default=None) -> AnyOrder:
+        return self._orders.get(order_id, default)
+
+    def add(self, order: AnyOrder) -> None:
+        """
+        Add an order to the book, replacing any order with the same id.
+
+        :param order: The order to add.
+        """
+        if order.id in self._orders:
+            self.remove(order.id)
+
+        self._orders[order.id] = order
+        self._by_ticker.setdefault(order.ticker, {})[order.id] = order
+        self._seq[order.id] = next(self._counter)
+        self._index(order)
+
+    def remove(self, order_id: str) -> AnyOrder:
+        """
+        Remove an order from the book.
+
+        :param order_id: The id of the order to remove.
+        :return: The order that was removed.
+        :raises KeyError: If the order is not in the book.
+        """
+        order = self._orders.pop(order_id)
+        self._unindex(order)
+        del self._seq[order_id]
+
+        asset_orders = self._by_ticker[order.ticker]
+        del asset_orders[order_id]
+
+        if not asset_orders:
+            del self._by_ticker[order.ticker]
+
+        return order
+
+    def reindex(self, order: AnyOrder) -> None:
+        """
+        Update the levels of an order after its prices or triggers changed.
+
+        :param order: An order that is in the book.
+        """
+        self._unindex(order)
+        self._index(order)
+
+    def candidates(self, ticker: str, price: float) -> List[AnyOrder]:
+        """
+        Return the orders for a ticker that could be triggered at ``price``
+        in the order they were added.
+
+        This is every order whose stop or limit price was crossed as well as
+        every market order and every order that has already been triggered.
+
+        :param ticker: The ticker the price is for.
+        :param price: The current price.
+        """
+        out = dict(self._always.get(ticker, {}))
+
+        rising = self._rising.get(ticker)
+        if rising:
+            hi = bisect_right(rising, (price, float('inf'), ''))
+            for _, _, order_id in rising[:hi]:
+                out[order_id] = self._orders[order_id]
+
+        falling = self._falling.get(ticker)
+        if falling:
+            lo = bisect_left(falling, (price, -1, ''))
+            for _, _, order_id in falling[lo:]:
+                out[order_id] = self._orders[order_id]
+
+        return sorted(out.values(), key=lambda o: self._seq[o.id])
+
+    def _index(self, order: AnyOrder) -> None:
+        levels = []
+        seq = self._seq[order.id]
+        is_buy = order.action is TradeAction.BUY
+
+        try:
+            if isinstance(order, MarketOrder) or order.triggered:
+                levels = None
+            else:
+                if isinstance(order, StopOrder) and not order.stop_reached:
+                    book = self._rising if is_buy else self._falling
+                    levels.append((book, order.stop_price))
+
+                if isinstance(order, LimitOrder) and not order.limit_reached:
+                    book = self._falling if is_buy else self._rising
+                    levels.append((book, order.limit_price))
+        except AttributeError:
+            # the order has no valid price, check it on every bar.
+            levels = None
+
+        if not levels:
+            self._always.setdefault(order.ticker, {})[order.id] = order
+            return
+
+        entries = []
+
+        for book, price in levels:
+            key = (price, seq, order.id)
+            prices = book.setdefault(order.ticker, [])
+            insort(prices, key)
+            entries.append((prices, key))
+
+        self._levels[order.id] = entries
+
+    def _unindex(self, order: AnyOrder) -> None:
+        always = self._always.get(order.ticker)
+
+        if always is not None and order.id in always:
+            del always[order.id]
+
+            if not always:
+                del self._always[order.ticker]
+
+        for prices, key in self._levels.pop(order.id, ()):
+            i = bisect_left(prices, key)
+            if i < len(prices) and prices[i] == key:
+                del prices[i]
@@ -3,7 +3,9 @@ Trade module which contains anything related to the actual execution of a trade.
 """
 import logging
 from datetime import datetime
+from typing import Dict, List
 
+import numpy as np
 import pandas as pd
 
 from pytech.utils import dt_utils as dt_utils
@@ -118,3 +120,106 @@ class Trade(object):
         }
 
         return cls(**trade_dict)
+
+
+class TradeLog(object):
+    """
+    A compact, columnar record of executed trades.
+
+    Each field is kept in a numpy array that grows geometrically, tickers are
+    stored as an integer id into :attr:`tickers` and trade dates as
+    nanoseconds since the epoch, so keeping every trade of a long backtest
+    does not keep every :class:`Trade` and :class:`Order` alive.
+    """
+
+    COLUMNS = ('ticker', 'action', 'qty', 'price_per_share',
+               'avg_price_per_share', 'commission', 'order_id')
+
+    def __init__(self, capacity: int = 1024):
+        self.tickers: List[str] = []
+        self._ticker_ids: Dict[str, int] = {}
+        self.order_ids: List[str] = []
+        self._tz = None
+        self._len = 0
+        self._capacity = 0
+        self.ticker_id = np.empty(0, dtype=np.int32)
+        self.action = np.empty(0, dtype=np.int8)
+        self.qty = np.empty(0, dtype=np.int64)
+        self.price_per_share = np.empty(0, dtype=np.float64)
+        self.avg_price_per_share = np.empty(0, dtype=np.float64)
+        self.commission = np.empty(0, dtype=np.float64)
+        self.trade_date = np.empty(0, dtype=np.int64)
+        self._grow(capacity)
+
+    def __len__(self):
+        return self._len
+
+    def _grow(self, capacity: int) -> None:
+        for name in ('ticker_id', 'action', 'qty', 'price_per_share',
+                     'avg_price_per_share', 'commission', 'trade_date'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._len] = old[:self._len]
+            setattr(self, name, new)
+
+        self._capacity = capacity
+
+    def append(self, trade: Trade) -> Trade:
+        """
+        Record a trade.
+
+        :param trade: The trade to record.
+        :return: The trade.
+        """
+        if self._len == self._capacity:
+            self._grow(max(self._capacity * 2, 1))
+
+        ticker_id = self._ticker_ids.get(trade.ticker)
+
+        if ticker_id is None:
+            ticker_id = len(self.tickers)
+            self._ticker_ids[trade.ticker] = ticker_id
+            self.tickers.append(trade.ticker)
+
+        trade_date = pd.Timestamp(trade.trade_date)
+
+        if self._tz is None and trade_date.tz is not None:
+            self._tz = trade_date.tz
+
+        i = self._len
+        self.ticker_id[i] = ticker_id
+        self.action[i] = trade.action.value
+        self.qty[i] = trade.qty
+        self.price_per_share[i] = trade.price_per_share
+        self.avg_price_per_share[i] = trade.avg_price_per_share
+        self.commission[i] = trade.commission
+        self.trade_date[i] = trade_date.value
+        order = trade.order
+        self.order_ids.append(getattr(order, 'id', order))
+        self._len += 1
+        return trade
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Return every trade as a :class:`pd.DataFrame` indexed by the trade
+        date with a column for each of :attr:`COLUMNS`.
+        """
+        n = self._len
+        index = pd.DatetimeIndex(self.trade_date[:n].astype('datetime64[ns]'),
+                                 name='trade_date')
+
+        if self._tz is not None:
+            index = index.tz_localize('UTC').tz_convert(self._tz)
+
+        actions = {a.value: a.name for a in TradeAction}
+        tickers = np.array(self.tickers, dtype=object)
+
+        return pd.DataFrame({
+            'ticker': tickers[self.ticker_id[:n]],
+            'action': [actions[a] for a in self.action[:n]],
+            'qty': self.qty[:n],
+            'price_per_share': self.price_per_share[:n],
+            'avg_price_per_share': self.avg_price_per_share[:n],
+            'commission': self.commission[:n],
+            'order_id': self.order_ids,
+        }, index=index, columns=list(self.COLUMNS))
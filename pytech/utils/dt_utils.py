@@ -1,8 +1,11 @@
 import datetime as dt
-from typing import Tuple, Union
+import numbers
+import threading
+from functools import lru_cache
+from typing import Dict, Iterator, Tuple, Union
 
+import numpy as np
 import pandas as pd
-from dateutil import tz
 import pytz
 import pandas_market_calendars as mcal
 from pandas.core.dtypes.inference import is_number
@@ -11,17 +14,35 @@ from pandas.tslib import Timestamp
 
 date_type = Union[dt.date, dt.datetime]
 
-NYSE = mcal.get_calendar('NYSE')
+# the range of sessions every calendar is built with, later dates extend it.
+DEFAULT_CALENDAR_START = pd.Timestamp('1990-01-01')
+DEFAULT_CALENDAR_YEARS_AHEAD = 2
 
 
-def parse_date(date_to_parse: Union[dt.datetime, Timestamp]):
+def parse_date(date_to_parse: Union[dt.datetime, Timestamp, str, int]):
     """
     Converts strings or datetime objects to UTC timestamps.
 
-    :param date_to_parse: The date to parse.
-    :type date_to_parse: datetime or str or Timestamp
+    Timestamps, integers and strings are checked first since they are what
+    is passed on every bar, strings are cached as the same few dates tend to
+    be parsed over and over.
+
+    :param date_to_parse: The date to parse. Integers are nanoseconds since
+        the epoch in UTC, see :func:`to_ns`.
+    :type date_to_parse: datetime or str or Timestamp or int
     :return: ``pandas.TimeStamp``
     """
+    cls = type(date_to_parse)
+
+    if cls is Timestamp:
+        if date_to_parse.tzinfo is None:
+            return date_to_parse.replace(tzinfo=pytz.UTC)
+        return date_to_parse
+    elif cls is int or cls is np.int64:
+        return Timestamp(date_to_parse, tz=pytz.UTC)
+    elif cls is str:
+        return _parse_str(date_to_parse)
+
     if isinstance(date_to_parse, dt.date) and not isinstance(date_to_parse,
                                                              dt.datetime):
         raise TypeError(
@@ -33,13 +54,13 @@ def parse_date(date_to_parse: Union[dt.datetime, Timestamp]):
         else:
             return date_to_parse
     elif isinstance(date_to_parse, dt.datetime):
-        return pd.to_datetime(date_to_parse.replace(tzinfo=tz.tzutc()),
-                              utc=True)
-    elif isinstance(date_to_parse, dt.date):
-        return pd.to_datetime(date_to_parse, utc=True)
+        return Timestamp(date_to_parse.replace(tzinfo=pytz.UTC))
+    elif isinstance(date_to_parse, np.datetime64):
+        return Timestamp(date_to_parse).replace(tzinfo=pytz.UTC)
+    elif isinstance(date_to_parse, numbers.Integral):
+        return Timestamp(int(date_to_parse), tz=pytz.UTC)
     elif isinstance(date_to_parse, str):
-        # TODO: timezone
-        return pd.to_datetime(date_to_parse, utc=True)
+        return _parse_str(date_to_parse)
     else:
         raise TypeError(
                 'date_to_parse must be a pandas '
@@ -47,6 +68,80 @@ def parse_date(date_to_parse: Union[dt.datetime, Timestamp]):
                 f'{type(date_to_parse)} was provided')
 
 
+@lru_cache(maxsize=4096)
+def _parse_str(date_str: str) -> Timestamp:
+    # TODO: timezone
+    return pd.to_datetime(date_str, utc=True)
+
+
+def parse_dates(dates) -> pd.DatetimeIndex:
+    """
+    The vectorized version of :func:`parse_date`, converts anything list
+    like of dates to a UTC :class:`pd.DatetimeIndex` in one call.
+
+    Naive dates are treated as UTC, aware dates are converted to UTC and
+    integers are nanoseconds since the epoch.
+    """
+    return pd.DatetimeIndex(pd.to_datetime(dates, utc=True))
+
+
+def to_ns(date) -> Union[int, np.ndarray]:
+    """
+    Convert a date to nanoseconds since the epoch in UTC, which is how
+    timestamps are passed around on every bar.
+
+    Use :func:`from_ns` to convert it back.
+
+    :param date: Anything :func:`parse_date` accepts or anything list like of
+        them, in which case an int64 array is returned.
+    """
+    if isinstance(date, numbers.Integral):
+        return int(date)
+
+    if isinstance(date, (str, dt.date, np.datetime64)):
+        return parse_date(date).value
+
+    return _to_ns(date)
+
+
+def from_ns(ns: int) -> Timestamp:
+    """Convert nanoseconds since the epoch to a UTC timestamp."""
+    return Timestamp(int(ns), tz=pytz.UTC)
+
+
+def date_windows(start, end, freq: str = 'M'
+                 ) -> Iterator[Tuple[Timestamp, Timestamp]]:
+    """
+    Split ``start`` to ``end`` into consecutive ``(start, end)`` windows
+    that break at every ``freq`` boundary, e.g. the end of each month.
+
+    The windows are inclusive and do not overlap, each one ends a nanosecond
+    before the next one starts, so reading every window reads each row
+    once.
+
+    :param start: The start of the first window.
+    :param end: The end of the last window.
+    :param freq: A pandas frequency, the length of each window.
+    """
+    start = parse_date(start)
+    end = parse_date(end)
+    one_ns = pd.Timedelta(1)
+
+    for bound in pd.date_range(start, end, freq=freq, normalize=True):
+        # the boundary is the first nanosecond of the next window.
+        bound = bound + pd.Timedelta(days=1)
+
+        if bound > end:
+            break
+
+        if bound > start:
+            yield start, bound - one_ns
+            start = bound
+
+    if start <= end:
+        yield start, end
+
+
 def get_default_date(is_start_date):
     if is_start_date:
         temp_date = dt.datetime.now() - dt.timedelta(days=365)
@@ -83,14 +178,186 @@ def sanitize_dates(start, end) -> Tuple[dt.datetime, dt.datetime]:
     return start, end
 
 
-def is_trade_day(a_dt: date_type):
+def _to_days(dates) -> np.ndarray:
+    """
+    Convert a date, datetime, string or anything list like of them to a
+    ``datetime64[D]`` array of the (local) calendar date of each.
+    """
+    if isinstance(dates, (str, dt.date, np.datetime64)):
+        dates = [dates]
+
+    index = pd.DatetimeIndex(dates)
+
+    if index.tz is not None:
+        index = index.tz_localize(None)
+
+    return index.values.astype('datetime64[D]')
+
+
+def _to_ns(timestamps) -> np.ndarray:
+    """
+    Convert timestamps to an int64 array of nanoseconds since the epoch in
+    UTC, naive timestamps are treated as UTC.
+    """
+    if isinstance(timestamps, pd.DatetimeIndex):
+        # already UTC if aware and naive is treated as UTC.
+        return timestamps.asi8
+
+    if isinstance(timestamps, (str, dt.date, np.datetime64)):
+        timestamps = [timestamps]
+
+    index = parse_dates(timestamps).tz_localize(None)
+    return index.values.astype('datetime64[ns]').view('int64')
+
+
+class TradingCalendar(object):
+    """
+    The sessions and holidays of a :mod:`pandas_market_calendars` calendar
+    computed once and kept in sorted arrays.
+
+    Use :func:`get_calendar` to get a shared instance instead of creating
+    one directly. Looking up a date is a binary search, or
+    :func:`np.is_busday` for :func:`is_trade_day`, and every method accepts
+    a whole index of dates as well as a single one.
+    """
+
+    def __init__(self, name: str = 'NYSE',
+                 start: date_type = None,
+                 end: date_type = None):
+        self.name = name
+        self._calendar = mcal.get_calendar(name)
+        self._lock = threading.Lock()
+        self.holidays = np.array(sorted(self._calendar.holidays().holidays),
+                                 dtype='datetime64[D]')
+        self._busdays = np.busdaycalendar(holidays=self.holidays)
+
+        if start is None:
+            start = DEFAULT_CALENDAR_START
+
+        if end is None:
+            end = (pd.Timestamp.today()
+                   + pd.DateOffset(years=DEFAULT_CALENDAR_YEARS_AHEAD))
+
+        self._build(_to_days(start)[0], _to_days(end)[0])
+
+    def _build(self, start: np.datetime64, end: np.datetime64) -> None:
+        schedule = self._calendar.schedule(start_date=str(start),
+                                           end_date=str(end))
+        # the bounds are set last so a reader that sees them also sees the
+        # sessions they cover, and the opens and closes are swapped together.
+        self.sessions = _to_days(schedule.index)
+        self.open_close = (_to_ns(schedule['market_open']),
+                           _to_ns(schedule['market_close']))
+        self.start = start
+        self.end = end
+
+    def _covers(self, lo: np.datetime64, hi: np.datetime64) -> bool:
+        return lo >= self.start and hi <= self.end
+
+    def _ensure(self, days: np.ndarray) -> None:
+        """Extend the sessions if ``days`` are outside of them."""
+        if not len(days):
+            return
+
+        lo, hi = days.min(), days.max()
+
+        if self._covers(lo, hi):
+            return
+
+        with self._lock:
+            # another thread may have extended them while this one waited.
+            if not self._covers(lo, hi):
+                self._build(min(lo, self.start), max(hi, self.end))
+
+    def is_trade_day(self, dates):
+        """
+        True if a date is a weekday and not a holiday.
+
+        :param dates: A date or anything list like of dates.
+        :return: A bool for a single date or a bool array.
+        """
+        days = _to_days(dates)
+        out = np.is_busday(days, busdaycal=self._busdays)
+        return bool(out[0]) if np.ndim(dates) == 0 else out
+
+    def sessions_between(self, start: date_type,
+                         end: date_type) -> pd.DatetimeIndex:
+        """
+        Every session from ``start`` to ``end``, inclusive.
+
+        :return: The session dates.
+        """
+        start, end = _to_days([start, end])
+        self._ensure(np.array([start, end]))
+        # read once, another thread may extend the calendar.
+        sessions = self.sessions
+        lo = np.searchsorted(sessions, start, side='left')
+        hi = np.searchsorted(sessions, end, side='right')
+        return pd.DatetimeIndex(sessions[lo:hi], name='session')
+
+    def is_session(self, dates):
+        """
+        True if a date is a session of the calendar, unlike
+        :func:`is_trade_day` this includes unscheduled closures.
+        """
+        days = _to_days(dates)
+        self._ensure(days)
+        sessions = self.sessions
+        i = np.searchsorted(sessions, days)
+        i = np.minimum(i, len(sessions) - 1)
+        out = sessions[i] == days
+        return bool(out[0]) if np.ndim(dates) == 0 else out
+
+    def open_at_time(self, timestamps):
+        """
+        True if the market is open at a time, from the open up to but not
+        including the close.
+
+        :param timestamps: A timestamp or anything list like of them, naive
+            timestamps are treated as UTC.
+        :return: A bool for a single timestamp or a bool array.
+        """
+        ns = _to_ns(timestamps)
+        self._ensure(ns.astype('datetime64[ns]').astype('datetime64[D]'))
+        opens, closes = self.open_close
+        i = np.searchsorted(opens, ns, side='right') - 1
+        out = (i >= 0) & (ns < closes[np.maximum(i, 0)])
+        return bool(out[0]) if np.ndim(timestamps) == 0 else out
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}({self.name!r}, '
+                f'{self.start}, {self.end})')
+
+
+_calendars: Dict[str, TradingCalendar] = {}
+_calendars_lock = threading.Lock()
+
+
+def get_calendar(name: str = 'NYSE') -> TradingCalendar:
+    """
+    Return the shared :class:`TradingCalendar` for ``name``, creating it the
+    first time it is requested.
+    """
+    try:
+        return _calendars[name]
+    except KeyError:
+        pass
+
+    with _calendars_lock:
+        if name not in _calendars:
+            _calendars[name] = TradingCalendar(name)
+        return _calendars[name]
+
+
+def is_trade_day(a_dt: date_type, calendar: str = 'NYSE'):
     """
-    True if `dt` is a weekday.
+    True if `dt` is a weekday and not a holiday.
 
-    Monday = 1
-    Sunday = 7
+    :param a_dt: A date or anything list like of dates, in which case a bool
+        array is returned.
+    :param calendar: The name of the calendar to use.
     """
-    return a_dt.isoweekday() < 6 and a_dt.date() not in NYSE.holidays().holidays
+    return get_calendar(calendar).is_trade_day(a_dt)
 
 
 def prev_weekday(a_dt: date_type):
@@ -23,6 +23,16 @@ REQUIRED_COLS = frozenset({
     VOL_COL
 })
 
+# the order of the fields in any array that stores bars.
+OHLCV_COLS = (
+    OPEN_COL,
+    HIGH_COL,
+    LOW_COL,
+    CLOSE_COL,
+    ADJ_CLOSE_COL,
+    VOL_COL
+)
+
 
 def rename_bar_cols(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -1,18 +1,44 @@
 import os
 import queue
 
+import numpy as np
 import pandas as pd
 import pytest
 
 import pytech.trading.blotter as b
 from pytech.fin.asset.asset import Stock
 from pytech import TEST_DATA_DIR
-from pytech.data.handler import Bars
+from pytech.data.handler import ArrayBars, Bars
 from pytech.fin.portfolio import BasicPortfolio
 from pytech.fin.handler import BasicSignalHandler
 from pytech.mongo import ARCTIC_STORE
+from pytech.store import MemoryStore
 
-lib = ARCTIC_STORE['pytech.bars']
+
+@pytest.fixture()
+def memory_store():
+    """An empty :class:`MemoryStore`."""
+    return MemoryStore()
+
+
+@pytest.fixture()
+def synthetic_bars():
+    """
+    An :class:`ArrayBars` of known prices that is built without the db.
+
+    AAPL closes at 100, 102, 104... every day. FB has no bars for the first
+    two days and then closes at 53, 54, 55... The adjusted close is 90% of
+    the close.
+    """
+    index = pd.date_range('2016-03-10', periods=8, freq='B', name='date')
+    close = np.empty((len(index), 2))
+    close[:, 0] = 100 + 2 * np.arange(len(index))
+    close[:, 1] = 51 + np.arange(len(index))
+    # in the order of OHLCV_COLS.
+    data = np.stack([close - 1, close + 1, close - 2, close, close * .9,
+                     np.full(close.shape, 1000.)], axis=-1)
+    data[:2, 1] = np.nan
+    return ArrayBars.from_array(queue.Queue(), ['AAPL', 'FB'], index, data)
 
 
 @pytest.fixture(scope='session')
@@ -37,10 +63,18 @@ def no_requests(monkeypatch):
     monkeypatch.setattr('pandas_datareader.data.DataReader', patch_requests)
 
 
+@pytest.fixture(scope='session')
+def bars_lib():
+    """
+    The mongo bar library, only tests that request it connect to the db.
+    """
+    return ARCTIC_STORE['pytech.bars']
+
+
 @pytest.fixture(scope='module')
-def aapl_df():
+def aapl_df(bars_lib):
     """Returns a OHLCV df for Apple."""
-    return lib.read('AAPL')
+    return bars_lib.read('AAPL')
 
 
 def get_test_csv_path(ticker):
@@ -89,6 +123,14 @@ def yahoo_data_handler(events, ticker_list, start_date, end_date):
     return bars
 
 
+@pytest.fixture()
+def array_data_handler(events, ticker_list, start_date, end_date):
+    """Create a default :class:`ArrayBars`"""
+    bars = ArrayBars(events, ticker_list, start_date, end_date)
+    bars.update_bars()
+    return bars
+
+
 @pytest.fixture()
 def basic_portfolio(events, yahoo_data_handler, start_date, populated_blotter):
     """Return a BasicPortfolio to be used in testing."""
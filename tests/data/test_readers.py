@@ -1,7 +1,12 @@
 # noinspection PyUnresolvedReferences
+import threading
+import time
+
+import pandas as pd
 import pytest
 
-from pytech.data.reader import BarReader
+from pytech.data.reader import BarReader, RateLimiter
+from pytech.data.resample import Resampler
 
 
 def test_get_data():
@@ -9,3 +14,82 @@ def test_get_data():
     test = reader.get_data('GOOG')
     for k, v in test.items():
         print(f'k:{k}, v:{v}')
+
+
+class FakeDataReader(object):
+    """Stands in for ``pandas_datareader.DataReader`` and records calls."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.calls = []
+        self.sessions = set()
+
+    def __call__(self, ticker, data_source=None, start=None, end=None,
+                 session=None, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.calls.append(ticker)
+            self.sessions.add(id(session))
+
+        time.sleep(self.delay)
+
+        with self.lock:
+            self.active -= 1
+
+        index = pd.bdate_range('2016-03-10', '2016-03-24', name='Date')
+        return pd.DataFrame({'Open': 1.0, 'High': 2.0, 'Low': 0.5,
+                             'Close': 1.5, 'Volume': 100}, index=index)
+
+
+class TestBarReader(object):
+
+    def test_concurrent_get_data(self, monkeypatch, memory_store):
+        fake = FakeDataReader()
+        monkeypatch.setattr('pytech.data.reader.pdr.DataReader', fake)
+        tickers = [f'T{i}' for i in range(8)]
+
+        reader = BarReader('pytech.bars', store=memory_store, max_workers=4)
+        out = reader.get_data(tickers, start='2016-03-10', end='2016-03-24',
+                              check_db=False)
+
+        assert list(out.keys()) == tickers
+        assert sorted(fake.calls) == sorted(tickers)
+        assert 1 < fake.max_active <= 4
+        # every thread reuses its own session.
+        assert len(fake.sessions) <= 4
+        assert sorted(memory_store['pytech.bars'].list_symbols()) == tickers
+
+    def test_serial_get_data(self, monkeypatch, memory_store):
+        fake = FakeDataReader(delay=0)
+        monkeypatch.setattr('pytech.data.reader.pdr.DataReader', fake)
+
+        reader = BarReader('pytech.bars', store=memory_store)
+        reader.get_data(['A', 'B'], start='2016-03-10', end='2016-03-24',
+                        check_db=False, max_workers=1)
+        assert fake.max_active == 1
+
+    def test_get_symbols(self, memory_store):
+        index = pd.bdate_range('2016-01-04', periods=30, name='Date')
+        df = pd.DataFrame({'Open': 1.0, 'High': 2.0, 'Low': 0.5,
+                           'Close': 1.5, 'Volume': 100.0}, index=index)
+        memory_store['pytech.bars'].write('AAPL', df)
+        Resampler(store=memory_store, chunk_size='W').read('AAPL', 'W')
+        assert len(memory_store['pytech.bars'].list_symbols()) == 2
+
+        reader = BarReader('pytech.bars', store=memory_store)
+        assert list(reader.get_symbols()) == ['AAPL']
+
+
+def test_rate_limiter():
+    limiter = RateLimiter(rate=20, burst=1)
+    start = time.monotonic()
+
+    for _ in range(5):
+        limiter.acquire()
+
+    # the first call is free and each call after that waits 1 / 20 seconds.
+    assert time.monotonic() - start >= 0.15
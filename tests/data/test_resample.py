@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import pytech.utils.pandas_utils as pd_utils
+from pytech.data import resample
+from pytech.data.resample import Resampler, timeframe_symbol
+from pytech.store import MemoryStore
+from pytech.utils.exceptions import DataAccessError
+
+
+def make_bars(start: str, periods: int, freq: str = 'H',
+              seed: int = 0) -> pd.DataFrame:
+    rng = np.random.RandomState(seed)
+    index = pd.date_range(start, periods=periods, freq=freq,
+                          name=pd_utils.DATE_COL)
+    close = 100 + np.cumsum(rng.normal(size=periods))
+    return pd.DataFrame({
+        pd_utils.OPEN_COL: close + rng.normal(size=periods),
+        pd_utils.HIGH_COL: close + 1,
+        pd_utils.LOW_COL: close - 1,
+        pd_utils.CLOSE_COL: close,
+        pd_utils.ADJ_CLOSE_COL: close,
+        pd_utils.VOL_COL: rng.randint(100, 1000, size=periods).astype(float),
+    }, index=index)
+
+
+def expected(df: pd.DataFrame, freq: str) -> pd.DataFrame:
+    out = df.resample(freq).agg(resample.AGGREGATIONS)
+    # pandas sums empty periods to 0 instead of leaving them out.
+    return out.loc[df.resample(freq).size() > 0, df.columns]
+
+
+def assert_bars_equal(out: pd.DataFrame, exp: pd.DataFrame) -> None:
+    assert out.index.equals(exp.index)
+    assert list(out.columns) == list(exp.columns)
+    np.testing.assert_allclose(out.values, exp.values)
+
+
+@pytest.fixture()
+def bars():
+    return make_bars('2016-01-04', 24 * 40)
+
+
+@pytest.mark.parametrize('freq', ['4H', 'D', 'W', 'M'])
+def test_resample_ohlcv(bars, freq):
+    # gaps in the data are skipped the same way pandas skips them.
+    bars.iloc[5:30, 0] = np.nan
+    bars = bars.drop(bars.index[100:200])
+    out = resample.resample_ohlcv(bars, freq)
+    exp = expected(bars, freq)
+
+    assert_bars_equal(out, exp)
+
+
+def test_resample_chunks(bars):
+    chunks = [bars.iloc[i:i + 100] for i in range(0, len(bars), 100)]
+    out = pd.concat(resample.resample_chunks(chunks, 'D'))
+
+    assert_bars_equal(out, resample.resample_ohlcv(bars, 'D'))
+
+
+class TestResampler(object):
+
+    def test_read(self, bars):
+        store = MemoryStore()
+        lib = store['pytech.bars']
+        lib.write('AAPL', bars)
+        resampler = Resampler(store=store, chunk_size='W')
+
+        out = resampler.read('AAPL', 'D')
+        assert_bars_equal(out, expected(bars, 'D'))
+
+        symbol = timeframe_symbol('AAPL', 'D')
+        assert symbol in lib.list_symbols()
+        assert lib.read_metadata(symbol)['base_end'] == (
+            bars.index[-1].value)
+
+        with pytest.raises(DataAccessError):
+            resampler.read('MSFT', 'D')
+
+        assert list(resampler.read_many(['AAPL', 'MSFT'], 'D')) == ['AAPL']
+
+    def test_update(self, bars):
+        store = MemoryStore()
+        lib = store['pytech.bars']
+        # the first write ends part of the way through a day.
+        lib.write('AAPL', bars.iloc[:500])
+        resampler = Resampler(store=store, chunk_size='W')
+        resampler.read('AAPL', 'D')
+
+        lib.append('AAPL', bars.iloc[500:])
+        out = resampler.read('AAPL', 'D')
+
+        assert_bars_equal(out, expected(bars, 'D'))
+        assert_bars_equal(out, resampler.read('AAPL', 'D', refresh=True))
@@ -0,0 +1,136 @@
+import queue
+
+import numpy as np
+import pandas as pd
+import pytest
+from pytest import approx
+
+import pytech.utils.pandas_utils as pd_utils
+from pytech.data.handler import ArrayBars, stack_bars
+from pytech.backtest.event import MarketEvent
+from pytech.data.streaming import StreamingBars
+from pytech.fin.analysis.online import SMA
+from pytech.fin.portfolio import BasicPortfolio
+from pytech.store import MemoryStore
+from pytech.trading.blotter import Blotter
+
+
+def make_bars(index: pd.DatetimeIndex, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.RandomState(seed)
+    data = rng.uniform(90, 110, size=(len(index), len(pd_utils.OHLCV_COLS)))
+    return pd.DataFrame(data, index=index, columns=pd_utils.OHLCV_COLS)
+
+
+@pytest.fixture()
+def universe():
+    index = pd.date_range('2016-01-04', periods=120, freq='B', name='date')
+    return {'AAPL': make_bars(index),
+            # starts late and is missing every other day.
+            'FB': make_bars(index[20::2], seed=1)}
+
+
+@pytest.fixture()
+def store(universe):
+    store = MemoryStore()
+
+    for ticker, df in universe.items():
+        store['pytech.bars'].write(ticker, df)
+
+    return store
+
+
+def run(bars) -> list:
+    """Emit every bar and return the date of each update."""
+    dates = []
+
+    while bars.continue_backtest:
+        bars.update_bars()
+        dates.append(max(bars.get_latest_bar_ts(t) for t in bars.tickers
+                         if len(bars.get_latest_bars(t))))
+
+    return dates
+
+
+class TestStreamingBars(object):
+
+    def test_matches_array_bars(self, universe, store):
+        tickers = ['AAPL', 'FB']
+        index, data = stack_bars(universe, tickers)
+        events = queue.Queue()
+        bars = StreamingBars(events, tickers, index[0], index[-1],
+                             store=store, chunk_size='W', lookback=10)
+        array_bars = ArrayBars.from_array(events, tickers, index, data)
+        close = array_bars.field_idx[pd_utils.CLOSE_COL]
+        sma = bars.subscribe('FB', SMA(5))
+
+        while bars.continue_backtest:
+            bars.update_bars()
+            array_bars.update_bars()
+
+            assert bars.get_latest_bar_ts('AAPL') == (
+                array_bars.get_latest_bar_ts('AAPL'))
+            assert bars.get_latest_bar_value(
+                    'AAPL', pd_utils.CLOSE_COL, n=20).tolist() == (
+                       array_bars.get_latest_bar_value(
+                               'AAPL', pd_utils.CLOSE_COL, n=10).tolist())
+
+        assert not array_bars.continue_backtest
+        assert events.qsize() == 2 * len(index)
+        assert len(bars.get_latest_bars('FB', n=50)) == 10
+
+        fb_close = universe['FB'][pd_utils.CLOSE_COL]
+        assert bars.get_latest_bar('FB')[pd_utils.CLOSE_COL] == (
+            fb_close.iloc[-1])
+        assert sma.value == approx(fb_close.iloc[-5:].mean())
+        assert data[-1, 0, close] == bars.get_latest_bar_value(
+                'AAPL', pd_utils.CLOSE_COL)[0]
+
+    def test_staggered_start(self, universe, store):
+        # FB has no bars for the first 20 days.
+        tickers = ['FB', 'AAPL']
+        index = universe['AAPL'].index
+        events = queue.Queue()
+        bars = StreamingBars(events, tickers, index[0], index[-1],
+                             store=store, chunk_size='W')
+        blotter = Blotter(events)
+        blotter.bars = bars
+        portfolio = BasicPortfolio(bars, events, index[0], blotter,
+                                   store=store)
+
+        with pytest.raises(IndexError):
+            bars.get_current_ts()
+
+        for _ in range(25):
+            bars.update_bars()
+            portfolio.update_timeindex(MarketEvent())
+            assert bars.get_current_ts() == bars.get_latest_bar_ts('AAPL')
+
+        df = portfolio.holdings_buffer.to_frame()
+        assert list(df.index) == list(index[:25].tz_localize('UTC'))
+
+    def test_date_range(self, universe, store):
+        index = universe['AAPL'].index
+        bars = StreamingBars(queue.Queue(), ['FB', 'MSFT'], index[0],
+                             index[50], store=store, chunk_size='W')
+
+        with pytest.raises(IndexError):
+            bars.get_latest_bar('FB')
+
+        dates = run(bars)
+        expected = universe['FB'].index
+        expected = expected[expected <= index[50]]
+
+        assert dates == list(expected.tz_localize('UTC').asi8)
+        assert bars.get_latest_bar_dt('FB') == expected[-1].tz_localize('UTC')
+        # the read ahead thread stops once everything is read.
+        assert bars._thread is None
+
+    def test_close(self, store):
+        bars = StreamingBars(queue.Queue(), ['AAPL'], '2016-01-04',
+                             '2016-06-30', store=store, chunk_size='D',
+                             prefetch=1)
+        bars.update_bars()
+        bars.close()
+
+        assert bars._thread is None
+        assert bars.continue_backtest
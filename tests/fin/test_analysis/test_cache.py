@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import pytech.fin.analysis.cache as cache_mod
+import pytech.fin.analysis.technical as ta
+from pytech.fin.analysis.cache import IndicatorCache, register_lookback
+from pytech.store import LocalStore, MemoryStore
+
+
+@pytest.fixture()
+def bars():
+    index = pd.date_range('2016-01-01', periods=200, freq='B', name='date')
+    close = 100 + np.cumsum(np.random.RandomState(7).normal(size=200))
+    return pd.DataFrame({'close': close}, index=index)
+
+
+@pytest.fixture()
+def lookbacks(monkeypatch):
+    """Undo any :func:`register_lookback` calls made by the test."""
+    registered = dict(cache_mod._lookbacks)
+    monkeypatch.setattr(cache_mod, '_lookbacks', registered)
+    return registered
+
+
+def counting(calls):
+    def last_change(df, period=3, col='close'):
+        calls.append(len(df))
+        return df[col].diff(period).dropna().rename('last_change')
+
+    return last_change
+
+
+class TestIndicatorCache(object):
+
+    def test_hit(self, bars):
+        calls = []
+        func = counting(calls)
+        cache = IndicatorCache(MemoryStore())
+        first = cache.compute(func, bars, 'AAPL', period=5)
+        second = cache.compute(func, bars, 'AAPL', period=5)
+        assert calls == [200]
+        assert second.name == 'last_change'
+        np.testing.assert_array_equal(first.values, second.values)
+
+        # different params are a different key.
+        cache.compute(func, bars, 'AAPL', period=6)
+        assert calls == [200, 200]
+
+    def test_extend(self, bars, lookbacks):
+        calls = []
+        func = counting(calls)
+        register_lookback(func, lambda p: p['period'])
+        assert func in lookbacks
+        cache = IndicatorCache(MemoryStore())
+        cache.compute(func, bars.iloc[:150], 'AAPL')
+        out = cache.compute(func, bars, 'AAPL')
+
+        # only the new rows and the lookback are computed.
+        assert calls == [150, 53]
+        expected = bars['close'].diff(3).dropna()
+        np.testing.assert_allclose(out.values, expected.values)
+        assert out.index.equals(expected.index)
+
+    def test_changed_bars_recompute(self, bars):
+        cache = IndicatorCache(MemoryStore())
+        cache.compute(ta.sma, bars.iloc[:150], 'AAPL', period=10)
+
+        changed = bars.copy()
+        changed.iloc[0, 0] = 1.0
+        out = cache.compute(ta.sma, changed, 'AAPL', period=10)
+        np.testing.assert_allclose(out.values,
+                                   ta.sma(changed, period=10).values)
+
+    def test_technical_extend(self, bars):
+        cache = IndicatorCache(MemoryStore())
+
+        for func in (ta.sma, ta.rsi, ta.wma):
+            cache.compute(func, bars.iloc[:120], 'AAPL', period=14)
+            out = cache.compute(func, bars, 'AAPL', period=14)
+            np.testing.assert_allclose(out.values,
+                                       func(bars, period=14).values)
+
+    def test_invalidate(self, bars):
+        cache = IndicatorCache(MemoryStore())
+        cache.compute(ta.sma, bars, 'AAPL')
+        cache.compute(ta.sma, bars, 'FB')
+        cache.invalidate('AAPL')
+        assert [s.split('.')[0] for s in cache.lib.list_symbols()] == ['FB']
+
+    def test_local(self, tmpdir, bars):
+        pytest.importorskip('tables')
+        calls = []
+        func = counting(calls)
+        IndicatorCache(LocalStore(str(tmpdir))).compute(func, bars, 'AAPL')
+        out = IndicatorCache(LocalStore(str(tmpdir))).compute(func, bars,
+                                                              'AAPL')
+        assert calls == [200]
+        np.testing.assert_allclose(out.values,
+                                   bars['close'].diff(3).dropna().values)
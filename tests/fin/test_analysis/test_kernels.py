@@ -0,0 +1,164 @@
+"""
+The indicators that use :mod:`pytech.fin.analysis._kernels` must return
+exactly what the row by row loops they replaced did.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import pytech.fin.analysis._kernels as kernels
+import pytech.fin.analysis.technical as ta
+import pytech.utils.pandas_utils as pd_utils
+
+
+@pytest.fixture(params=[5, 250])
+def ohlcv(request):
+    rng = np.random.RandomState(request.param)
+    n = request.param * 4
+    close = 100 + np.cumsum(rng.normal(size=n))
+    close[3] = close[2]
+    index = pd.date_range('2010-01-01', periods=n, freq='B', name='date')
+    return pd.DataFrame({
+        pd_utils.OPEN_COL: close + rng.normal(size=n),
+        pd_utils.HIGH_COL: close + rng.uniform(0, 2, size=n),
+        pd_utils.LOW_COL: close - rng.uniform(0, 2, size=n),
+        pd_utils.CLOSE_COL: close,
+        pd_utils.VOL_COL: rng.randint(1000, 5000, size=n),
+    }, index=index)
+
+
+def loop_kama(df, period=20, col=pd_utils.CLOSE_COL,
+              efficiency_ratio_periods=10, ema_fast=2, ema_slow=30):
+    er = ta.efficiency_ratio(df, efficiency_ratio_periods, col)
+    fast_alpha = 2 / (ema_fast + 1)
+    slow_alpha = 2 / (ema_slow + 1)
+    sc = pd.Series((er * (fast_alpha - slow_alpha) + slow_alpha) ** 2)
+    sma_ = ta.sma(df, period, col)
+    kama_ = []
+
+    for smooth, ma, price in zip(sc, sma_.shift(-1), df[col]):
+        try:
+            kama_.append(kama_[-1] + smooth * (price - kama_[-1]))
+        except (IndexError, TypeError):
+            if pd.notnull(ma):
+                kama_.append(ma + smooth * (price - ma))
+            else:
+                kama_.append(None)
+
+    return pd.Series(kama_, index=sma_.index, name='KAMA')
+
+
+def loop_wma(df, period=30, col=pd_utils.CLOSE_COL):
+    df_rev = df[col].iloc[::-1]
+    denominator = (period * (period + 1)) / 2
+    wma_ = []
+
+    for i in range(len(df_rev)):
+        chunk = df_rev.iloc[i:i + period]
+
+        if len(chunk) != period:
+            wma_.append(None)
+            continue
+
+        ma = []
+
+        for price, j in zip(chunk.iloc[::-1].items(),
+                            range(period + 1)[1:]):
+            ma.append(price[1] * (j / denominator))
+
+        wma_.append(sum(ma))
+
+    wma_.reverse()
+    return pd.Series(wma_, index=df.index, name='wma')
+
+
+def loop_rsi(df, period=14, col=pd_utils.CLOSE_COL):
+    rsi_series = pd.DataFrame(index=df.index)
+    gain = [0]
+    loss = [0]
+
+    for row, shifted_row in zip(df[col], df[col].shift(-1)):
+        if row - shifted_row > 0:
+            gain.append(row - shifted_row)
+            loss.append(0)
+        elif row - shifted_row < 0:
+            gain.append(0)
+            loss.append(abs(row - shifted_row))
+        elif row - shifted_row == 0:
+            gain.append(0)
+            loss.append(0)
+
+    rsi_series['gain'] = gain
+    rsi_series['loss'] = loss
+    avg_gain = rsi_series['gain'].rolling(window=period).mean()
+    avg_loss = rsi_series['loss'].rolling(window=period).mean()
+    rsi_ = 100 - (100 / (1 + avg_gain / avg_loss))
+    return pd.Series(rsi_, index=df.index, name='rsi')
+
+
+def loop_true_range(df, period=14):
+    high_low = pd.Series(df[pd_utils.HIGH_COL].tail(period)
+                         - df[pd_utils.LOW_COL].tail(period),
+                         name='high_low')
+    high_close = pd.Series(df[pd_utils.HIGH_COL].tail(period)
+                           - (df[pd_utils.CLOSE_COL].shift(-1)
+                              .abs().tail(period)),
+                           name='high_prev_close')
+    low_close = pd.Series(df[pd_utils.CLOSE_COL].shift(-1).tail(period)
+                          - df[pd_utils.LOW_COL].abs().tail(period),
+                          name='prev_close_low')
+    true_range = pd.concat([high_low, high_close, low_close], axis=1)
+    out = [max(row.high_low, row.high_prev_close, row.prev_close_low)
+           for row in true_range.itertuples()]
+    return pd.Series(out, index=df.index[-period:],
+                     name='true_range').dropna()
+
+
+def loop_dm(df):
+    up_move = df[pd_utils.HIGH_COL].diff()
+    down_move = df[pd_utils.LOW_COL].diff()
+    positive_dm = []
+    negative_dm = []
+
+    for up, down in zip(up_move, down_move):
+        positive_dm.append(up if up > down and up > 0 else 0)
+        negative_dm.append(down if down > up and down > 0 else 0)
+
+    return positive_dm, negative_dm
+
+
+def assert_same(actual, expected):
+    assert actual.index.equals(expected.index)
+    np.testing.assert_array_equal(actual.values.astype(float),
+                                  expected.values.astype(float))
+
+
+def test_kama(ohlcv):
+    assert_same(ta.kama(ohlcv), loop_kama(ohlcv))
+    assert_same(ta.kama(ohlcv, period=12, efficiency_ratio_periods=5),
+                loop_kama(ohlcv, period=12, efficiency_ratio_periods=5))
+
+
+@pytest.mark.parametrize('period', [1, 7, 30])
+def test_wma(ohlcv, period):
+    assert_same(ta.wma(ohlcv, period), loop_wma(ohlcv, period))
+
+
+@pytest.mark.parametrize('period', [3, 14])
+def test_rsi(ohlcv, period):
+    assert_same(ta.rsi(ohlcv, period), loop_rsi(ohlcv, period))
+
+
+@pytest.mark.parametrize('period', [5, 14])
+def test_true_range(ohlcv, period):
+    assert_same(ta.true_range(ohlcv, period),
+                loop_true_range(ohlcv, period))
+
+
+def test_directional_movement(ohlcv):
+    positive, negative = kernels.directional_movement(
+        ohlcv[pd_utils.HIGH_COL].diff().values,
+        ohlcv[pd_utils.LOW_COL].diff().values)
+    expected_pos, expected_neg = loop_dm(ohlcv)
+    np.testing.assert_array_equal(positive, expected_pos)
+    np.testing.assert_array_equal(negative, expected_neg)
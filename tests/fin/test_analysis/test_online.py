@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import pytech.fin.analysis.online as online
+import pytech.fin.analysis.technical as ta
+import pytech.utils.pandas_utils as pd_utils
+
+
+@pytest.fixture()
+def ohlcv():
+    rng = np.random.RandomState(3)
+    n = 400
+    close = 100 + np.cumsum(rng.normal(size=n))
+    index = pd.date_range('2014-01-01', periods=n, freq='B', name='date')
+    return pd.DataFrame({
+        pd_utils.HIGH_COL: close + rng.uniform(0, 2, size=n),
+        pd_utils.LOW_COL: close - rng.uniform(0, 2, size=n),
+        pd_utils.CLOSE_COL: close,
+    }, index=index)
+
+
+def run(indicator, df):
+    return [indicator.update(bar) for _, bar in df.iterrows()]
+
+
+def assert_matches(values, expected: pd.Series):
+    expected = expected.reindex(range(len(values)))
+    np.testing.assert_allclose(np.array(values, dtype=float),
+                               expected.values, rtol=1e-9)
+
+
+@pytest.mark.parametrize('period', [2, 10, 50])
+def test_sma(ohlcv, period):
+    values = run(online.SMA(period), ohlcv)
+    expected = ta.sma(ohlcv, period)
+    expected.index = ohlcv.index.get_indexer(expected.index)
+    assert_matches(values, expected)
+
+
+@pytest.mark.parametrize('period', [5, 26])
+def test_ewma(ohlcv, period):
+    values = run(online.EWMA(period), ohlcv)
+    assert_matches(values, ta.ewma(ohlcv, period).reset_index(drop=True))
+
+
+@pytest.mark.parametrize('period', [3, 14])
+def test_rsi(ohlcv, period):
+    values = run(online.RSI(period), ohlcv)
+    assert_matches(values, ta.rsi(ohlcv, period).reset_index(drop=True))
+
+
+def test_macd(ohlcv):
+    indicator = online.MACD()
+    values = run(indicator, ohlcv)
+    expected = ta.macd_signal(ohlcv)
+    assert indicator.ready
+    assert values[-1].macd == pytest.approx(expected['macd'].iloc[-1])
+    assert values[-1].signal == pytest.approx(
+            expected['macd_signal'].iloc[-1])
+
+
+def test_atr(ohlcv):
+    values = run(online.ATR(14), ohlcv)
+    prev_close = ohlcv[pd_utils.CLOSE_COL].shift(1)
+    tr = pd.concat([ohlcv[pd_utils.HIGH_COL] - ohlcv[pd_utils.LOW_COL],
+                    (ohlcv[pd_utils.HIGH_COL] - prev_close).abs(),
+                    (ohlcv[pd_utils.LOW_COL] - prev_close).abs()],
+                   axis=1).max(axis=1)
+    expected = tr.rolling(window=14, min_periods=13).mean()
+    assert_matches(values, expected.reset_index(drop=True))
+
+
+def test_bollinger(ohlcv):
+    indicator = online.BollingerBands(20)
+    values = run(indicator, ohlcv)
+    close = ohlcv[pd_utils.CLOSE_COL]
+    middle = close.rolling(window=20, min_periods=19).mean()
+    std = close.rolling(window=20, min_periods=19).std()
+    assert values[-1].middle == pytest.approx(middle.iloc[-1])
+    assert values[-1].upper == pytest.approx(middle.iloc[-1]
+                                             + 2 * std.iloc[-1])
+    assert values[-1].lower == pytest.approx(middle.iloc[-1]
+                                             - 2 * std.iloc[-1])
+
+
+def test_rolling_sum_drift():
+    """The total is summed again so a huge value leaves no error behind."""
+    sma = online.SMA(3)
+    sma.update(1e16)
+
+    for _ in range(9):
+        sma.update(1.0)
+
+    assert sma.value == 1.0
+
+
+def test_bollinger_small_spread():
+    """The variance does not cancel out when prices barely move."""
+    rng = np.random.RandomState(0)
+    close = pd.Series(1e6 + rng.normal(scale=1e-3, size=5000))
+    indicator = online.BollingerBands(20)
+    values = [indicator.update(p) for p in close]
+    middle = close.iloc[-20:].mean()
+    std = close.iloc[-20:].std()
+
+    assert values[-1].middle == pytest.approx(middle, rel=1e-12)
+    assert values[-1].upper - values[-1].middle == pytest.approx(2 * std,
+                                                                 rel=1e-6)
+
+
+def test_kama(ohlcv):
+    indicator = online.KAMA()
+    values = run(indicator, ohlcv)
+    close = ohlcv[pd_utils.CLOSE_COL].values
+    fast, slow = 2 / 3, 2 / 31
+    kama = np.nan
+
+    for t in range(10, len(close)):
+        er = (abs(close[t] - close[t - 10])
+              / np.abs(np.diff(close[t - 10:t + 1])).sum())
+        sc = (er * (fast - slow) + slow) ** 2
+
+        if np.isnan(kama):
+            ma = close[max(t - 19, 0):t + 1].mean() if t >= 18 else np.nan
+            kama = ma + sc * (close[t] - ma)
+        else:
+            kama = kama + sc * (close[t] - kama)
+
+        assert values[t] == pytest.approx(kama, nan_ok=True)
+
+
+def test_reset_and_key(ohlcv):
+    sma = online.SMA(5)
+    run(sma, ohlcv)
+    assert sma.ready
+    sma.reset()
+    assert not sma.ready
+    assert sma.key == online.SMA(5).key
+    assert sma.key != online.SMA(6).key
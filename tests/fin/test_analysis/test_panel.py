@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import pytech.fin.analysis.technical as ta
+import pytech.utils.pandas_utils as pd_utils
+
+TICKERS = ['AAPL', 'FB', 'MSFT']
+
+
+@pytest.fixture()
+def frames():
+    index = pd.date_range('2015-01-01', periods=300, freq='B', name='date')
+    out = {}
+
+    for i, ticker in enumerate(TICKERS):
+        rng = np.random.RandomState(i)
+        close = 50 * (i + 1) + np.cumsum(rng.normal(size=len(index)))
+        out[ticker] = pd.DataFrame({
+            pd_utils.OPEN_COL: close + rng.normal(size=len(index)),
+            pd_utils.HIGH_COL: close + rng.uniform(0, 2, size=len(index)),
+            pd_utils.LOW_COL: close - rng.uniform(0, 2, size=len(index)),
+            pd_utils.CLOSE_COL: close,
+            pd_utils.ADJ_CLOSE_COL: close,
+            pd_utils.VOL_COL: rng.randint(1000, 5000, size=len(index)),
+        }, index=index)[list(pd_utils.OHLCV_COLS)]
+
+    return out
+
+
+@pytest.fixture()
+def panel(frames):
+    return pd.concat([frames[t] for t in TICKERS], axis=1, keys=TICKERS)
+
+
+SINGLE_OUTPUT = [
+    (ta.sma, {'period': 20}),
+    (ta.smm, {'period': 20}),
+    (ta.ewma, {'period': 20}),
+    (ta.triple_ewma, {'period': 10}),
+    (ta.triangle_ma, {'period': 10}),
+    (ta.trix, {'period': 10}),
+    (ta.efficiency_ratio, {}),
+    (ta.kama, {}),
+    (ta.zero_lag_ema, {'period': 11}),
+    (ta.wma, {'period': 10}),
+    (ta.true_range, {'period': 50}),
+    (ta.avg_true_range, {}),
+    (ta.smoothed_ma, {}),
+    (ta.rsi, {}),
+]
+
+
+@pytest.mark.parametrize('func,kwargs', SINGLE_OUTPUT)
+def test_panel_matches_single(frames, panel, func, kwargs):
+    out = func(panel, **kwargs)
+    assert isinstance(out, pd.DataFrame)
+    assert list(out.columns) == TICKERS
+
+    for ticker in TICKERS:
+        expected = func(frames[ticker], **kwargs)
+        np.testing.assert_allclose(out[ticker].values, expected.values)
+        assert out.index.equals(expected.index)
+
+
+@pytest.mark.parametrize('func', [ta.macd_signal, ta.bollinger_bands])
+def test_panel_multi_output(frames, panel, func):
+    out = func(panel)
+    assert list(out.columns.levels[0]) == TICKERS
+
+    for ticker in TICKERS:
+        expected = func(frames[ticker])
+        np.testing.assert_allclose(out[ticker].values, expected.values)
+
+
+def test_dmi(frames, panel):
+    out = ta.dmi(panel)
+
+    for ticker in TICKERS:
+        np.testing.assert_allclose(out[ticker].values,
+                                   ta.dmi(frames[ticker]).values)
+
+
+def test_arrays(frames, panel):
+    cube = np.stack([frames[t].values for t in TICKERS], axis=1)
+    closes = cube[:, :, pd_utils.OHLCV_COLS.index(pd_utils.CLOSE_COL)]
+
+    expected = ta.rsi(panel).values
+    np.testing.assert_allclose(ta.rsi(cube).values, expected)
+    np.testing.assert_allclose(ta.rsi(closes).values, expected)
+    np.testing.assert_allclose(ta.true_range(cube).values,
+                               ta.true_range(panel).values)
+
+    with pytest.raises(ValueError):
+        ta.true_range(closes)
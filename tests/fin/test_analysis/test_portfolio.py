@@ -1,7 +1,12 @@
 # noinspection PyUnresolvedReferences
+import numpy as np
+import pandas as pd
 import pytest
+from scipy.optimize import minimize
 
-from pytech.fin.analysis.portfolio import EfficientFrontier
+import pytech.utils.pandas_utils as pd_utils
+from pytech.fin.analysis.portfolio import EfficientFrontier, _long_only_qp
+from pytech.utils.exceptions import DataAccessError
 
 
 class TestEfficientFrontier(object):
@@ -10,3 +15,144 @@ class TestEfficientFrontier(object):
         result = frontier()
         print(str(result))
         result.plot()
+
+
+@pytest.fixture()
+def offline_frontier():
+    """An :class:`EfficientFrontier` with random prices and no readers."""
+
+    def make(allow_short=False, assets=8, rows=500):
+        rng = np.random.RandomState(7)
+        drift = rng.uniform(0, .001, size=(assets, 1))
+        returns = drift + rng.normal(scale=.01, size=(assets, rows))
+        return EfficientFrontier([f'T{i}' for i in range(assets)],
+                                 allow_short=allow_short,
+                                 prices=100 * np.cumprod(1 + returns, axis=1))
+
+    return make
+
+
+def test_prices_must_match_tickers():
+    with pytest.raises(ValueError):
+        EfficientFrontier(['A', 'B'], prices=np.ones((3, 10)))
+
+
+def test_missing_ticker(monkeypatch):
+    """A ticker the reader filled with NaN is not used."""
+    index = pd.date_range('2016-03-10', periods=10, name='date')
+
+    class FakeReader(object):
+        def __init__(self, lib_name):
+            pass
+
+        def get_data(self, tickers, **kwargs):
+            df = pd.DataFrame({pd_utils.CLOSE_COL: np.arange(1., 11.)},
+                              index=index)
+            return {'AAPL': df, 'MISSING': df * np.nan}
+
+    monkeypatch.setattr('pytech.fin.analysis.portfolio.reader.BarReader',
+                        FakeReader)
+
+    with pytest.raises(DataAccessError):
+        EfficientFrontier(['AAPL', 'MISSING'])
+
+
+def test_returns_covar(offline_frontier):
+    frontier = offline_frontier()
+    expected_returns, covars = frontier._returns_covar()
+    prices = frontier.prices
+
+    for r in range(prices.shape[0]):
+        returns = [prices[r, c + 1] / prices[r, c] - 1
+                   for c in range(prices.shape[1] - 1)]
+        assert expected_returns[r] == pytest.approx(
+                (1 + np.mean(returns)) ** 252 - 1)
+
+    assert covars.shape == (prices.shape[0], prices.shape[0])
+    np.testing.assert_allclose(np.diag(covars),
+                               np.var(prices[:, 1:] / prices[:, :-1] - 1,
+                                      axis=1, ddof=1) * 252)
+
+
+def test_long_only_frontier(offline_frontier):
+    frontier = offline_frontier()
+    result = frontier()
+
+    assert result.weights.min() >= -1e-8
+    assert result.weights.sum() == pytest.approx(1)
+    assert len(result.front_mean) == 20
+    # the ends of the frontier hold only the lowest and highest return asset.
+    lowest = np.argmin(result.returns)
+    highest = np.argmax(result.returns)
+    assert result.front_var[0] == pytest.approx(
+            result.covar[lowest, lowest], rel=1e-6)
+    assert result.front_var[-1] == pytest.approx(
+            result.covar[highest, highest], rel=1e-6)
+
+    assets = len(result.returns)
+    for r, var in zip(result.front_mean, result.front_var):
+        c_ = ({'type': 'eq', 'fun': lambda w: np.sum(w) - 1.0},
+              {'type': 'eq',
+               'fun': lambda w, r=r: np.dot(w, result.returns) - r})
+        optimized = minimize(lambda w: np.dot(np.dot(w, result.covar), w),
+                             np.ones(assets) / assets,
+                             method='SLSQP', constraints=c_,
+                             bounds=[(0, 1)] * assets,
+                             options={'ftol': 1e-14, 'maxiter': 1000})
+        assert var == pytest.approx(optimized.fun, rel=1e-4)
+
+
+def test_short_frontier_is_analytic(offline_frontier):
+    frontier = offline_frontier(allow_short=True)
+    returns, covar = frontier._returns_covar()
+    front_mean, front_var = frontier._solve_frontier(returns, covar)
+
+    assets = len(returns)
+    for r, var in zip(front_mean, front_var):
+        c_ = ({'type': 'eq', 'fun': lambda w: np.sum(w) - 1.0},
+              {'type': 'eq', 'fun': lambda w, r=r: np.dot(w, returns) - r})
+        optimized = minimize(lambda w: np.dot(np.dot(w, covar), w),
+                             np.ones(assets) / assets,
+                             method='SLSQP', constraints=c_,
+                             options={'ftol': 1e-14, 'maxiter': 1000})
+        assert var == pytest.approx(optimized.fun, rel=1e-4)
+
+    weights = frontier._solve_weights(returns, covar)
+    mean = np.dot(weights, returns)
+    sharpe = (mean - frontier.rf) / np.sqrt(weights @ covar @ weights)
+
+    # no point on the frontier has a higher sharpe ratio.
+    assert sharpe >= np.max((front_mean - frontier.rf)
+                            / np.sqrt(front_var)) - 1e-9
+
+
+def test_long_only_qp_singular(monkeypatch):
+    """
+    Starting with one free asset and two constraints makes the first KKT
+    system singular, which is solved with least squares.
+    """
+    calls = []
+    lstsq = np.linalg.lstsq
+
+    def checked_lstsq(a, b, rcond):
+        # numpy before 1.14 only accepts a float.
+        calls.append(rcond)
+        return lstsq(a, b, rcond=rcond)
+
+    monkeypatch.setattr(np.linalg, 'lstsq', checked_lstsq)
+
+    rng = np.random.RandomState(3)
+    x = rng.normal(size=(4, 100))
+    covar = np.cov(x)
+    returns = np.array([.05, .1, .15, .2])
+    a = np.vstack([np.ones(4), returns])
+    b = np.array([1., .1])
+    start = np.array([0., 1., 0., 0.])
+
+    w = _long_only_qp(covar, a, b, start)
+
+    assert calls
+    assert all(isinstance(rcond, (int, float)) for rcond in calls)
+    assert w is not None
+    assert w.min() >= -1e-10
+    np.testing.assert_allclose(np.dot(a, w), b, atol=1e-10)
@@ -1,4 +1,5 @@
 # noinspection PyUnresolvedReferences
+import numpy as np
 import pytest
 
 from pytech.fin.asset.asset import Stock
@@ -17,6 +18,66 @@ def test_monte_carlo(fb: Stock):
     print(output)
 
 
+def loop_monte_carlo(mu, vol, days, start_price, paths, rng):
+    """The original path by path, day by day simulation."""
+    result = np.array([])
+
+    for _ in range(paths):
+        sim_returns = rng.logistic(mu / days, vol / np.sqrt(days), days) + 1
+        price_list = np.array([start_price])
+
+        for x in sim_returns:
+            price_list = np.append(price_list, price_list[-1] * x)
+
+        result = np.append(result, price_list)
+
+    return result.reshape(paths, days + 1)
+
+
+def test_monte_carlo_matches_loop():
+    expected = loop_monte_carlo(.1, .2, 50, 100., 40, np.random.RandomState(1))
+    result = rand.monte_carlo(.1, .2, 50, 100., paths=40,
+                              seed=np.random.RandomState(1))
+
+    np.testing.assert_allclose(result.paths, expected, rtol=1e-12)
+    assert result.mean == pytest.approx(np.mean(expected))
+    np.testing.assert_allclose(result.terminal, expected[:, -1], rtol=1e-12)
+
+
+def test_monte_carlo_chunks():
+    full = rand.monte_carlo(.1, .2, 30, 50., paths=1000, seed=7)
+    chunked = rand.monte_carlo(.1, .2, 30, 50., paths=1000, seed=7,
+                               chunk_size=64, keep_paths=False)
+
+    assert chunked.paths is None
+    np.testing.assert_allclose(chunked.terminal, full.terminal)
+    np.testing.assert_allclose(chunked.mean_path, full.paths.mean(axis=0))
+    assert chunked.var() == pytest.approx(full.var())
+    assert chunked.cvar() >= chunked.var()
+
+    with pytest.raises(ValueError):
+        chunked.percentiles()
+
+    bands = full.percentiles([5, 50, 95])
+    assert bands.shape == (31, 3)
+    assert (bands[5] <= bands[95]).all()
+
+
+def test_monte_carlo_multi():
+    covar = np.array([[.04, .018], [.018, .09]])
+    result = rand.monte_carlo_multi([.05, .1], covar, 252, [10., 20.],
+                                    weights=[.5, .5], paths=2000, seed=3)
+
+    assert result.paths.shape == (2000, 253)
+    assert result.asset_terminal.shape == (2000, 2)
+    np.testing.assert_allclose(result.paths[:, 0], 1)
+    growth = result.asset_terminal / [10., 20.]
+    np.testing.assert_allclose(result.terminal, growth.dot([.5, .5]))
+    # the simulated returns keep the correlation of the assets.
+    corr = np.corrcoef(np.log(growth).T)[0, 1]
+    assert corr == pytest.approx(.018 / np.sqrt(.04 * .09), abs=.05)
+
+
 
 @pytest.mark.skip('not a test.')
 def test_vol_model(fb: Stock):
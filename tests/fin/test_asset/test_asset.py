@@ -1,7 +1,76 @@
 # noinspection PyUnresolvedReferences
+import numpy as np
+import pandas as pd
 import pytest
 
-from pytech.fin.asset.asset import Stock
+from pytech.fin.asset.asset import Stock, calc_rolling_beta
+
+
+def pinv_beta(df):
+    """The per window regression that calc_rolling_beta replaced."""
+    x = df.values[:, [0]]
+    x = np.concatenate([np.ones_like(x), x], axis=1)
+    return np.linalg.pinv(x.T.dot(x)).dot(x.T).dot(df.values[:, 1:])[1]
+
+
+def per_stock_beta(market, returns, window):
+    """Run :func:`pinv_beta` over each stock's own rows, one at a time."""
+    out = {}
+
+    for col in returns:
+        df = pd.concat([market, returns[col]], axis=1).dropna()
+        out[col] = pd.Series([pinv_beta(df.iloc[i:i + window])[0]
+                              for i in range(len(df) - window + 1)],
+                             index=df.index[window - 1:])
+
+    return pd.DataFrame(out)
+
+
+@pytest.fixture()
+def market_and_returns():
+    rng = np.random.RandomState(11)
+    index = pd.date_range('2000-01-01', periods=500, freq='B')
+    market = pd.Series(rng.normal(0, 0.01, len(index)), index=index)
+    returns = pd.DataFrame({
+        'A': 1.5 * market + rng.normal(0, 0.01, len(index)),
+        'B': -0.5 * market + rng.normal(0, 0.02, len(index)),
+        'C': market + rng.normal(0, 0.01, len(index)),
+    }, index=index)
+    return market, returns
+
+
+def test_calc_rolling_beta(market_and_returns):
+    market, returns = market_and_returns
+    returns = returns[['A', 'B']]
+
+    betas = calc_rolling_beta(market, returns, window=30)
+    expected = per_stock_beta(market, returns, 30)
+
+    assert list(betas.columns) == ['A', 'B']
+    assert betas.index.equals(market.index[29:])
+    np.testing.assert_allclose(betas.values, expected.values, rtol=1e-8)
+
+    assert calc_rolling_beta(market, returns['A'], window=1000).empty
+
+
+def test_calc_rolling_beta_staggered(market_and_returns):
+    """Missing returns in one stock don't move the windows of the others."""
+    market, returns = market_and_returns
+    # A listed late, B has a gap and C has one missing day.
+    returns.iloc[:60, 0] = np.nan
+    returns.iloc[200:210, 1] = np.nan
+    returns.iloc[300, 2] = np.nan
+    market = market.copy()
+    market.iloc[5] = np.nan
+
+    betas = calc_rolling_beta(market, returns, window=30)
+    expected = per_stock_beta(market, returns, 30).reindex(betas.index)
+
+    assert betas.index.equals(market.dropna().index[29:])
+    np.testing.assert_allclose(betas.values, expected.values, rtol=1e-8)
+    # a window ends on every date after the first 30 for C except the gap.
+    assert betas['C'].isnull().sum() == 1
+    assert betas['A'].first_valid_index() == returns.index[89]
 
 
 class TestStock(object):
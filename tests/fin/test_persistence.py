@@ -0,0 +1,67 @@
+import datetime as dt
+
+import pandas as pd
+
+from pytech.fin.persistence import HoldingsBuffer
+
+
+class RecordingLib(object):
+    """Records what would be written to a :class:`PortfolioStore`."""
+
+    def __init__(self):
+        self.calls = []
+        self.snapshots = []
+
+    def write(self, symbol, data, **kwargs):
+        self.calls.append(('write', symbol, data))
+
+    def append(self, symbol, data, **kwargs):
+        self.calls.append(('append', symbol, data))
+
+    def snapshot(self, name):
+        self.snapshots.append(name)
+
+
+def _row(i):
+    return {'AAPL': float(i), 'cash': 100.0 - i, 'total': 100.0}
+
+
+class TestHoldingsBuffer(object):
+
+    def test_append_grows(self):
+        buffer = HoldingsBuffer(RecordingLib(), 'portfolio',
+                                ['AAPL', 'cash', 'total'], initial_size=2)
+        start = dt.datetime(2016, 3, 10)
+
+        for i in range(5):
+            buffer.append(start + dt.timedelta(days=i), _row(i))
+
+        assert len(buffer) == 5
+        assert buffer.capacity == 8
+
+        df = buffer.to_frame()
+        assert list(df.columns) == ['AAPL', 'cash', 'total']
+        assert df['AAPL'].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+        assert df.index[0] == pd.Timestamp('2016-03-10', tz='UTC')
+
+    def test_flush_every(self):
+        lib = RecordingLib()
+        buffer = HoldingsBuffer(lib, 'portfolio', ['AAPL', 'cash', 'total'],
+                                flush_every=2)
+        start = dt.datetime(2016, 3, 10)
+
+        for i in range(5):
+            buffer.append(start + dt.timedelta(days=i), _row(i))
+
+        assert [c[0] for c in lib.calls] == ['write', 'append']
+        assert buffer.unflushed == 1
+
+        buffer.snapshot('end')
+        assert [len(c[2]) for c in lib.calls] == [2, 2, 1]
+        assert lib.snapshots == ['end']
+
+    def test_flush_nothing(self):
+        lib = RecordingLib()
+        buffer = HoldingsBuffer(lib, 'portfolio', ['AAPL'])
+        buffer.flush()
+        assert lib.calls == []
@@ -0,0 +1,48 @@
+import logging
+
+import pandas as pd
+import pytest
+from arctic.chunkstore.chunkstore import ChunkStore
+from arctic.exceptions import NoDataFoundException
+
+from pytech.mongo.barstore import BarStore
+
+
+@pytest.fixture()
+def bars():
+    index = pd.date_range('2016-03-10', periods=5, name='date')
+    return pd.DataFrame({'close': [1.0, 2.0, 3.0, 4.0, 5.0]}, index=index)
+
+
+@pytest.fixture()
+def bar_store(monkeypatch, bars):
+    """A :class:`BarStore` whose reads act like arctic's without Mongo."""
+    frames = {'AAPL': bars, 'MSFT': bars * 2}
+
+    def read(self, symbol, chunk_range=None, filter_data=True, **kwargs):
+        symbols = symbol if isinstance(symbol, list) else [symbol]
+
+        if not any(s in frames for s in symbols):
+            raise NoDataFoundException(f'No data found for {symbols}')
+
+        # arctic returns an empty frame for each missing symbol.
+        out = {s: frames.get(s, pd.DataFrame()) for s in symbols}
+        return out if len(symbols) > 1 else out[symbols[0]]
+
+    monkeypatch.setattr(ChunkStore, 'read', read)
+    store = BarStore.__new__(BarStore)
+    store.logger = logging.getLogger(__name__)
+    return store
+
+
+class TestBarStore(object):
+
+    def test_read_many(self, bar_store, bars):
+        out = bar_store.read_many(['AAPL', 'GOOG', 'MSFT'])
+        assert sorted(out) == ['AAPL', 'MSFT']
+        pd.testing.assert_frame_equal(out['MSFT'], bars * 2)
+
+        assert list(bar_store.read_many(['GOOG', 'AAPL'])) == ['AAPL']
+        assert list(bar_store.read_many(['AAPL'])) == ['AAPL']
+        assert bar_store.read_many(['GOOG']) == {}
+        assert bar_store.read_many(['GOOG', 'FB']) == {}
@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+
+from pytech.store import LocalStore
+from pytech.utils.exceptions import DataAccessError
+
+pytest.importorskip('tables')
+
+
+@pytest.fixture()
+def bars():
+    index = pd.date_range('2016-03-10', periods=5, name='date')
+    return pd.DataFrame({'close': [1.0, 2.0, 3.0, 4.0, 5.0],
+                         'volume': [10, 20, 30, 40, 50]}, index=index)
+
+
+class TestLocalStore(object):
+
+    def test_libraries_persist(self, tmpdir, bars):
+        store = LocalStore(str(tmpdir))
+        store['pytech.bars'].write('^GSPC', bars, metadata={'a': 1})
+
+        store = LocalStore(str(tmpdir))
+        lib = store['pytech.bars']
+        assert lib.list_symbols() == ['^GSPC']
+        assert lib.read_metadata('^GSPC') == {'a': 1}
+        pd.testing.assert_frame_equal(lib.read('^GSPC'), bars)
+
+    def test_append(self, tmpdir, bars):
+        lib = LocalStore(str(tmpdir))['pytech.bars']
+        lib.append('AAPL', bars.iloc[:3])
+        lib.append('AAPL', bars.iloc[3:])
+        assert lib.read('AAPL')['close'].tolist() == [1.0, 2.0, 3.0,
+                                                      4.0, 5.0]
+
+        lib.update('AAPL', bars.iloc[:1] * 2)
+        assert lib.read('AAPL')['close'].iloc[0] == 2.0
+
+    def test_append_reads_no_rows(self, tmpdir, monkeypatch, bars):
+        """Appending in order only reads the last row and the attrs."""
+        store = LocalStore(str(tmpdir))
+        bar_lib = store['pytech.bars']
+        portfolio_lib = store['pytech.portfolio']
+        bar_lib.write('AAPL', bars.iloc[:3], metadata={'a': 1})
+        portfolio_lib.write('p', bars.iloc[:3], metadata={'b': 2})
+
+        with monkeypatch.context() as m:
+            def no_get(*args, **kwargs):
+                raise AssertionError('Every row was read.')
+
+            m.setattr(pd.HDFStore, 'get', no_get)
+            bar_lib.append('AAPL', bars.iloc[3:])
+            item = portfolio_lib.append('p', bars.iloc[3:])
+            assert bar_lib.read_metadata('AAPL') == {'a': 1}
+            bar_lib.write('AAPL', bars, metadata={'a': 1})
+
+        assert item.version == 2
+        assert item.metadata == {'b': 2}
+        assert bar_lib.read_metadata('AAPL') == {'a': 1}
+        pd.testing.assert_frame_equal(bar_lib.read('AAPL'), bars)
+        pd.testing.assert_frame_equal(portfolio_lib.read('p'), bars)
+
+    def test_portfolio_snapshot(self, tmpdir, bars):
+        lib = LocalStore(str(tmpdir))['pytech.portfolio']
+        lib.write('p', bars.iloc[:2])
+        lib.snapshot('first')
+        item = lib.append('p', bars.iloc[2:])
+
+        assert item.version == 2
+        assert len(lib.read('p')) == 5
+        assert len(lib.read('p', as_of='first')) == 2
+        assert lib.list_snapshots() == ['first']
+
+        with pytest.raises(DataAccessError):
+            lib.read('p', as_of='missing')
@@ -0,0 +1,126 @@
+import pandas as pd
+import pytest
+
+from pytech.store import BAR_STORE, PORTFOLIO_STORE, MemoryStore
+from pytech.utils.exceptions import DataAccessError
+
+
+@pytest.fixture()
+def bars():
+    index = pd.date_range('2016-03-10', periods=5, name='date')
+    return pd.DataFrame({'close': [1.0, 2.0, 3.0, 4.0, 5.0],
+                         'volume': [10, 20, 30, 40, 50]}, index=index)
+
+
+class TestMemoryStore(object):
+
+    def test_default_libraries(self):
+        store = MemoryStore()
+        assert 'pytech.bars' in store.list_libraries()
+        assert 'pytech.portfolio' in store.list_libraries()
+
+        store.initialize_library('pytech.market', BAR_STORE)
+        assert 'pytech.market' in store.list_libraries()
+
+        with pytest.raises(DataAccessError):
+            store['not_a_lib']
+
+        with pytest.raises(ValueError):
+            store.initialize_library('bad', 'NOT_A_TYPE')
+
+
+class TestMemoryBarStore(object):
+
+    def test_read_write(self, bars):
+        lib = MemoryStore()['pytech.bars']
+        lib.write('AAPL', bars, metadata={'source': 'test'})
+
+        assert lib.list_symbols() == ['AAPL']
+        assert lib.read_metadata('AAPL') == {'source': 'test'}
+        pd.testing.assert_frame_equal(lib.read('AAPL'), bars)
+
+        df = lib.read('AAPL', chunk_range=(bars.index[1], bars.index[2]),
+                      columns='close')
+        assert df['close'].tolist() == [2.0, 3.0]
+        assert list(df.columns) == ['close']
+
+        with pytest.raises(DataAccessError):
+            lib.read('MSFT')
+
+    def test_update(self, bars):
+        lib = MemoryStore()['pytech.bars']
+
+        with pytest.raises(DataAccessError):
+            lib.update('AAPL', bars)
+
+        lib.update('AAPL', bars.iloc[:3], upsert=True)
+        new = bars.iloc[2:].copy()
+        new['close'] = 10.0
+        lib.update('AAPL', new)
+
+        assert lib.read('AAPL')['close'].tolist() == [1.0, 2.0, 10.0,
+                                                      10.0, 10.0]
+
+    def test_append_delete(self, bars):
+        lib = MemoryStore()['pytech.bars']
+        lib.append('AAPL', bars.iloc[:2])
+        lib.append('AAPL', bars.iloc[2:])
+        assert len(lib.read('AAPL')) == 5
+
+        lib.delete('AAPL', chunk_range=(bars.index[0], bars.index[1]))
+        assert len(lib.read('AAPL')) == 3
+
+        lib.delete('AAPL')
+        assert lib.list_symbols() == []
+
+    def test_get_date_range(self, bars):
+        lib = MemoryStore()['pytech.bars']
+        lib.write('AAPL', bars)
+
+        assert lib.get_date_range('AAPL') == (bars.index[0], bars.index[-1])
+
+        with pytest.raises(DataAccessError):
+            lib.get_date_range('MSFT')
+
+    def test_read_many(self, bars):
+        lib = MemoryStore()['pytech.bars']
+        lib.write('AAPL', bars)
+        lib.write('MSFT', bars.iloc[2:] * 2)
+
+        out = lib.read_many(['AAPL', 'MSFT', 'GOOG'], columns=['close'])
+        assert sorted(out.keys()) == ['AAPL', 'MSFT']
+        assert list(out['MSFT'].columns) == ['close']
+
+        panel = lib.read_many(['MSFT', 'AAPL'],
+                              chunk_range=(bars.index[1], bars.index[4]),
+                              as_panel=True)
+        assert panel.columns[0] == ('MSFT', 'close')
+        assert len(panel) == 4
+        assert panel[('MSFT', 'close')].isnull().sum() == 1
+
+
+class TestMemoryPortfolioStore(object):
+
+    def test_versions_and_snapshots(self, bars):
+        store = MemoryStore()
+        store.initialize_library('portfolio', PORTFOLIO_STORE)
+        lib = store['portfolio']
+
+        lib.write('p', bars.iloc[:2], prune_previous_version=False)
+        lib.snapshot('first')
+        item = lib.append('p', bars.iloc[2:])
+
+        assert item.version == 2
+        assert len(lib.read('p')) == 5
+        assert len(lib.read('p', as_of='first')) == 2
+        assert len(lib.read('p', as_of=1)) == 2
+
+        # snapshotting again with the same name is ignored.
+        lib.snapshot('first')
+        assert len(lib.read('p', as_of='first')) == 2
+
+        lib.write('p', bars)
+        with pytest.raises(DataAccessError):
+            # version 2 isn't in a snapshot so it was pruned.
+            lib.read('p', as_of=2)
+
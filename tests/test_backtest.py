@@ -1,6 +1,19 @@
+import queue
+
+import numpy as np
+import pandas as pd
 import pytest
+from pytest import approx
+import pytech.utils.pandas_utils as pd_utils
 from pytech.backtest.backtest import Backtest
+from pytech.backtest.sweep import expand_grid, sweep
+from pytech.backtest.vectorized import VectorizedBacktest
 from pytech.algo.strategy import BuyAndHold, CrossOverStrategy
+from pytech.backtest.event import SignalEvent
+from pytech.data.handler import ArrayBars
+from pytech.data.streaming import StreamingBars
+from pytech.store import MemoryStore
+from pytech.utils.enums import SignalType
 import datetime as dt
 
 
@@ -19,4 +32,176 @@ class TestBacktest(object):
         assert isinstance(backtest, Backtest)
         backtest._run()
 
+    def test_run_closes_data_handler(self):
+        """The read ahead thread is stopped when the strategy raises."""
+
+        class Broken(BuyAndHold):
+            def generate_signals(self, event):
+                raise ValueError('broken')
+
+        index = pd.date_range('2016-03-10', periods=60, freq='B', name='date')
+        df = pd.DataFrame(100 + np.random.RandomState(0).normal(
+                size=(len(index), len(pd_utils.OHLCV_COLS))).cumsum(axis=0),
+                          index=index, columns=pd_utils.OHLCV_COLS)
+        store = MemoryStore()
+        store['pytech.bars'].write('AAPL', df)
+        bars = StreamingBars(queue.Queue(), ['AAPL'], index[0], index[-1],
+                             store=store, chunk_size='D', prefetch=1)
+        backtest = Backtest(ticker_list=['AAPL'],
+                            initial_capital=100000,
+                            start_date=index[0],
+                            end_date=index[-1],
+                            strategy=Broken,
+                            data_handler=bars,
+                            store=store)
+
+        with pytest.raises(ValueError):
+            backtest._run()
+
+        assert bars._thread is None
+
+    def test_market_order_warning(self, caplog):
+        """Every backtest warns once per ticker about market orders."""
+        index = pd.date_range('2016-03-10', periods=5, freq='B')
+        data = np.ones((len(index), 1, len(pd_utils.OHLCV_COLS)))
+
+        for _ in range(2):
+            bars = ArrayBars.from_array(queue.Queue(), ['AAPL'], index, data)
+            backtest = Backtest(ticker_list=['AAPL'],
+                                initial_capital=100000,
+                                start_date=index[0],
+                                end_date=index[-1],
+                                strategy=BuyAndHold,
+                                data_handler=bars,
+                                store=MemoryStore())
+            backtest.portfolio.update_signal = lambda event: None
+            caplog.clear()
+
+            for _ in range(3):
+                backtest._on_signal(SignalEvent('AAPL', SignalType.LONG))
+
+            backtest._on_signal(SignalEvent('AAPL', SignalType.LONG,
+                                            limit_price=1.))
+            warnings = [r for r in caplog.records
+                        if 'Market order' in r.getMessage()]
+            assert len(warnings) == 1
+
+
+class TestVectorizedBacktest(object):
+
+    def test_run(self, synthetic_bars):
+        backtest = VectorizedBacktest(ticker_list=['AAPL', 'FB'],
+                                      initial_capital=100000,
+                                      start_date='2016-03-10',
+                                      strategy=BuyAndHold,
+                                      data_handler=synthetic_bars)
+        holdings = backtest.run()
+        close = synthetic_bars.get_panel(pd_utils.CLOSE_COL)
+        adj_close = synthetic_bars.get_panel(pd_utils.ADJ_CLOSE_COL)
+
+        # half of the capital each, FB is bought once it has a price.
+        aapl_shares = np.trunc(.5 * 100000 / close['AAPL'].iat[0])
+        fb_shares = np.trunc(.5 * 100000 / close['FB'].iat[2])
+        assert (aapl_shares, fb_shares) == (500, 943)
+        assert backtest.positions['AAPL'].tolist() == [500] * 8
+        assert backtest.positions['FB'].tolist() == [0, 0] + [943] * 6
+
+        # each row is the state coming into the bar.
+        after_aapl = 100000 - 500 * 100 - 5.0
+        after_fb = after_aapl - 943 * 53 - 5.0
+        assert holdings['cash'].tolist() == approx(
+                [100000, after_aapl, after_aapl] + [after_fb] * 5)
+        assert holdings['commission'].tolist() == [0, 5, 5] + [10] * 5
+        assert holdings['AAPL'].tolist() == approx(
+                [0] + (500 * adj_close['AAPL'].iloc[1:]).tolist())
+        assert holdings['FB'].tolist() == approx(
+                [0, 0, 0] + (943 * adj_close['FB'].iloc[3:]).tolist())
+        assert holdings['total'].tolist() == approx(
+                (holdings['cash'] + holdings['AAPL']
+                 + holdings['FB']).tolist())
+        assert holdings['total'].iat[-1] == approx(
+                after_fb + 500 * 114 * .9 + 943 * 58 * .9)
+
+    def test_summary(self, synthetic_bars):
+        backtest = VectorizedBacktest(ticker_list=['AAPL', 'FB'],
+                                      initial_capital=100000,
+                                      start_date='2016-03-10',
+                                      strategy=BuyAndHold,
+                                      data_handler=synthetic_bars)
+        stats = backtest.summary()
+        total = backtest.holdings['total']
+
+        assert stats['trades'] == 2
+        assert stats['commission'] == 10.0
+        assert stats['total_return'] == approx(total.iat[-1] / 100000 - 1)
+        # the adjusted close is below the price paid.
+        assert stats['max_drawdown'] == approx(
+                (total / total.cummax() - 1).min())
+        assert stats['max_drawdown'] < 0
+
+
+class TestSweep(object):
+
+    def test_expand_grid(self):
+        runs = expand_grid({'short_window': [10, 20],
+                            'long_window': [50, 100]})
+        assert len(runs) == 4
+        assert {'short_window': 20, 'long_window': 50} in runs
+
+        runs = [{'short_window': 5}]
+        assert expand_grid(runs) == runs
+
+    @pytest.mark.parametrize('max_workers', [1, 2])
+    def test_sweep(self, synthetic_bars, max_workers):
+        grid = {'short_window': [2, 3], 'long_window': [4, 6]}
+        df = sweep(CrossOverStrategy, grid,
+                   ticker_list=['AAPL', 'FB'],
+                   initial_capital=100000,
+                   start_date='2016-03-10',
+                   data_handler=synthetic_bars,
+                   max_workers=max_workers)
+
+        assert len(df) == 4
+        for col in ('short_window', 'long_window', 'total_return', 'sharpe'):
+            assert col in df.columns
+
+        # the workers read the same bars as a run in this process.
+        for row in df.to_dict('records'):
+            params = {'short_window': int(row['short_window']),
+                      'long_window': int(row['long_window'])}
+            stats = VectorizedBacktest(['AAPL', 'FB'], 100000, '2016-03-10',
+                                       CrossOverStrategy,
+                                       data_handler=synthetic_bars,
+                                       strategy_params=params).summary()
+            assert row['total_return'] == approx(stats['total_return'])
+            assert row['trades'] == stats['trades']
+
+        assert df['total_return'].nunique() > 1
+
+    def test_event_driven_sweep_offline(self, monkeypatch):
+        """The event driven runs only use the shared bars."""
+
+        def no_db(*args, **kwargs):
+            raise AssertionError('The db should not be used.')
+
+        monkeypatch.setattr('pytech.store.config._store', None)
+        monkeypatch.setattr('pytech.store.config.create_store', no_db)
+
+        index = pd.date_range('2016-03-10', periods=60, freq='B')
+        data = 100 + np.random.RandomState(0).normal(
+                size=(len(index), 2, len(pd_utils.OHLCV_COLS))).cumsum(axis=0)
+        bars = ArrayBars.from_array(queue.Queue(), ['AAPL', 'FB'], index,
+                                    data)
+
+        df = sweep(CrossOverStrategy,
+                   {'short_window': [5, 10], 'long_window': [20]},
+                   ticker_list=['AAPL', 'FB'],
+                   initial_capital=100000,
+                   start_date=index[0],
+                   end_date=index[-1],
+                   data_handler=bars,
+                   max_workers=1,
+                   vectorized=False)
 
+        assert len(df) == 2
+        assert df['total_return'].notnull().all()
@@ -1,3 +1,5 @@
+import pytest
+
 import pytech.trading.order as ord
 from pytech.utils.enums import OrderStatus, OrderType, TradeAction
 
@@ -25,9 +27,10 @@ class TestBlotter(object):
 
         populated_blotter.cancel_order('one', 'AAPL')
 
-        for k, v in populated_blotter:
-            if k == 'one':
-                assert v.status is OrderStatus.CANCELLED
+        assert populated_blotter['one'].status is OrderStatus.CANCELLED
+        # cancelled orders are no longer active.
+        assert 'one' in populated_blotter.closed_orders
+        assert 'one' not in [k for k, _ in populated_blotter]
 
     def test_cancel_all_orders_for_asset(self, populated_blotter):
         """
@@ -39,9 +42,10 @@ class TestBlotter(object):
 
         populated_blotter.cancel_all_orders_for_asset('AAPL')
 
-        for k, order in populated_blotter:
-            if order.ticker == 'AAPL':
-                assert order.status is OrderStatus.CANCELLED
+        for k in ('one', 'two'):
+            assert populated_blotter[k].status is OrderStatus.CANCELLED
+
+        assert 'AAPL' not in populated_blotter.orders
 
     def test_create_order(self, blotter):
         stop_order = blotter._create_order('AAPL', TradeAction.BUY,
@@ -85,3 +89,36 @@ class TestBlotter(object):
 
         both_none = blotter._filter_on_price(order, None, None)
         assert both_none is False
+
+    def test_find_order(self, populated_blotter):
+        assert populated_blotter['three'].ticker == 'MSFT'
+        assert populated_blotter._find_order('four').ticker == 'FB'
+        assert populated_blotter._find_order('one', 'AAPL').id == 'one'
+
+        with pytest.raises(KeyError):
+            populated_blotter._find_order('one', 'FB')
+
+        assert set(populated_blotter.orders['AAPL']) == {'one', 'two'}
+
+    def test_purge_orders(self, populated_blotter):
+        # changing the status directly bypasses the blotter.
+        populated_blotter['one'].cancel()
+        populated_blotter.purge_orders()
+
+        assert [k for k, _ in populated_blotter] == ['two', 'three', 'four']
+        assert populated_blotter['one'].status is OrderStatus.CANCELLED
+
+    def test_filled_orders_are_closed(self, populated_blotter):
+        order = populated_blotter['one']
+        order.check_triggers(current_price=99, dt='2017-01-03')
+        populated_blotter.make_trade(order, 99, '2017-01-03', 1000)
+
+        assert not order.open
+        assert 'one' in populated_blotter.closed_orders
+        assert list(populated_blotter.orders['AAPL']) == ['two']
+
+        trades = populated_blotter.trades.to_frame()
+        assert len(trades) == 1
+        assert trades['ticker'].iloc[0] == 'AAPL'
+        assert trades['order_id'].iloc[0] == 'one'
+        assert trades['qty'].iloc[0] == 50
@@ -0,0 +1,175 @@
+import gc
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from pytech.decorators import memoize
+from pytech.decorators.decorators import make_key
+
+
+class Counter(object):
+
+    def __init__(self, offset=0):
+        self.offset = offset
+        self.calls = 0
+
+    @memoize
+    def add(self, x, y=0):
+        self.calls += 1
+        return x + y + self.offset
+
+    @memoize(maxsize=2)
+    def square(self, x):
+        self.calls += 1
+        return x * x
+
+    @memoize(maxbytes=1000)
+    def frame(self, n):
+        self.calls += 1
+        return pd.DataFrame({'a': np.arange(n, dtype=float)})
+
+
+class TestMemoize(object):
+
+    def test_bare_function(self):
+        calls = []
+
+        @memoize
+        def f(x, y=1):
+            calls.append(x)
+            return x * y
+
+        assert f(2, y=3) == 6
+        assert f(2, y=3) == 6
+        assert f(2, 3) == 6
+        assert len(calls) == 2
+        info = f.cache_info()
+        assert info.hits == 1
+        assert info.misses == 2
+        assert info.currsize == 2
+        assert f.__name__ == 'f'
+
+        f.cache_clear()
+        assert f.cache_info().currsize == 0
+
+    def test_per_instance(self):
+        one = Counter()
+        two = Counter(offset=10)
+
+        assert one.add(1) == 1
+        assert two.add(1) == 11
+        assert one.add(1) == 1
+        assert one.calls == 1
+        assert two.calls == 1
+        assert one.add.cache_info().hits == 1
+        assert two.add.cache_info().hits == 0
+
+    def test_instance_is_collected(self):
+        counter = Counter()
+        counter.frame(10)
+        ref = weakref.ref(counter)
+        del counter
+        gc.collect()
+        assert ref() is None
+
+    def test_maxsize_evicts_lru(self):
+        counter = Counter()
+        counter.square(1)
+        counter.square(2)
+        counter.square(1)
+        counter.square(3)
+        info = counter.square.cache_info()
+        assert info.evictions == 1
+        assert info.currsize == 2
+
+        # 2 was the least recently used so it must be recomputed.
+        counter.square(1)
+        assert counter.calls == 3
+        counter.square(2)
+        assert counter.calls == 4
+
+    def test_maxbytes(self):
+        counter = Counter()
+        counter.frame(50)
+        counter.frame(60)
+        info = counter.frame.cache_info()
+        assert info.nbytes <= 1000
+        assert info.currsize == 1
+        assert info.evictions == 1
+
+        # too big to ever be cached.
+        counter.frame(1000)
+        counter.frame(1000)
+        assert counter.frame.cache_info().currsize == 1
+        assert counter.calls == 4
+
+    def test_ttl(self):
+        calls = []
+
+        @memoize(ttl=0.05)
+        def f(x):
+            calls.append(x)
+            return x
+
+        f(1)
+        f(1)
+        assert len(calls) == 1
+        time.sleep(0.1)
+        f(1)
+        assert len(calls) == 2
+
+    def test_unhashable_args(self):
+        calls = []
+
+        @memoize
+        def total(values):
+            calls.append(values)
+            return sum(np.sum(v) for v in values)
+
+        assert total([np.arange(5), [1, 2]]) == 13
+        assert total([np.arange(5), [1, 2]]) == 13
+        assert total.cache_info().hits == 1
+
+        df = pd.DataFrame({'a': [1.0, 2.0]})
+
+        @memoize
+        def first(frame):
+            calls.append(frame)
+            return frame.iloc[0, 0]
+
+        first(df)
+        first(df.copy())
+        assert first.cache_info().hits == 1
+
+    def test_make_key(self):
+        assert make_key((1,), {'a': 1, 'b': 2}) == make_key((1,),
+                                                           {'b': 2, 'a': 1})
+        assert make_key((1,), {}) != make_key((), {'x': 1})
+        assert make_key(([1, 2],), {}) != make_key(((1, 2),), {})
+        hash(make_key(({'a': [1]},), {'df': pd.DataFrame({'a': [1]})}))
+
+    def test_pandas_key_order_and_labels(self):
+        df = pd.DataFrame({'close': [1.0, 2.0, 3.0],
+                           'open': [4.0, 5.0, 6.0]})
+        swapped = df.rename(columns={'close': 'open', 'open': 'close'})
+
+        assert make_key((df,), {}) == make_key((df.copy(),), {})
+        assert make_key((df,), {}) != make_key((swapped,), {})
+        assert make_key((df,), {}) != make_key((df.iloc[::-1],), {})
+        assert (make_key((df['close'],), {})
+                != make_key((df['close'].rename('open'),), {}))
+
+        calls = []
+
+        @memoize
+        def first(frame):
+            calls.append(frame)
+            return frame['close'].iloc[0]
+
+        assert first(df) == 1.0
+        assert first(swapped) == 4.0
+        assert first(df.iloc[::-1]) == 3.0
+        assert first.cache_info().hits == 0
+        assert len(calls) == 3
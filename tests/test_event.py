@@ -1,6 +1,9 @@
+import queue
+
 import pytest
-from pytech.backtest.event import (Event, MarketEvent, SignalEvent, TradeEvent,
-                                   FillEvent)
+from pytech.backtest.event import (Event, EventBus, MarketEvent, SignalEvent,
+                                   TradeEvent, FillEvent)
+import pytech.utils.dt_utils as dt_utils
 from pytech.utils.enums import EventType, SignalType, OrderType
 
 
@@ -26,6 +29,8 @@ class TestMarketEvent(object):
         trade_event = TradeEvent('one', 111.11, 2, '2017-03-18')
         assert trade_event.event_type is EventType.TRADE
         assert trade_event.qty == 2
+        assert trade_event.dt == dt_utils.parse_date('2017-03-18')
+        assert trade_event.ts == trade_event.dt.value
         assert issubclass(trade_event.__class__, Event)
 
     def test_fill_event(self):
@@ -52,3 +57,71 @@ class TestMarketEvent(object):
         assert signal_event.ticker == 'AAPL'
         assert signal_event.signal_type is SignalType.SHORT
 
+    def test_events_have_no_dict(self):
+        events = [MarketEvent(),
+                  SignalEvent('AAPL', SignalType.LONG, limit_price=10),
+                  TradeEvent('one', 1.0, 1, '2017-03-18'),
+                  FillEvent('one', 1.0, 1, '2017-03-18')]
+
+        for event in events:
+            assert not hasattr(event, '__dict__')
+
+            with pytest.raises(AttributeError):
+                event.junk = 1
+
+
+class TestEventBus(object):
+
+    def test_queue_interface(self):
+        bus = EventBus()
+        assert bus.empty()
+
+        with pytest.raises(queue.Empty):
+            bus.get(False)
+
+        first, second = MarketEvent(), MarketEvent()
+        bus.put(first)
+        bus.put(second)
+        assert bus.qsize() == 2
+        assert bus.get(False) is first
+        assert bus.get() is second
+        assert bus.empty()
+
+    def test_dispatch(self):
+        bus = EventBus()
+        seen = []
+        bus.subscribe(EventType.MARKET, lambda e: seen.append(('a', e)))
+        bus.subscribe('MARKET', lambda e: seen.append(('b', e)))
+
+        market = MarketEvent()
+        bus.dispatch(market)
+        assert seen == [('a', market), ('b', market)]
+
+        # events without a handler are ignored.
+        bus.dispatch(FillEvent('one', 1.0, 1, '2017-03-18'))
+        assert len(seen) == 2
+
+        # subscribing after a dispatch still reaches the handler.
+        bus.subscribe(EventType.FILL, lambda e: seen.append(('fill', e)))
+        fill = FillEvent('one', 1.0, 1, '2017-03-18')
+        bus.dispatch(fill)
+        assert seen[-1] == ('fill', fill)
+
+    def test_drain(self):
+        bus = EventBus()
+        seen = []
+
+        def on_market(event):
+            seen.append(event.event_type)
+            bus.put(SignalEvent('AAPL', SignalType.LONG, limit_price=1))
+
+        bus.subscribe(EventType.MARKET, on_market)
+        bus.subscribe(EventType.SIGNAL, lambda e: seen.append(e.event_type))
+        bus.put(MarketEvent())
+        bus.put(None)
+        bus.put(MarketEvent())
+
+        assert bus.drain() == 4
+        assert bus.empty()
+        assert seen == [EventType.MARKET, EventType.MARKET,
+                        EventType.SIGNAL, EventType.SIGNAL]
@@ -1,9 +1,22 @@
+import numpy as np
 import pytest
 from pytest import approx
 import pandas as pd
 import pytech.utils.pandas_utils as pd_utils
 import pytech.utils.dt_utils as dt_utils
-from pytech.data.handler import DataHandler, Bars
+from pytech.data.handler import ArrayBars, DataHandler, Bars
+from pytech.fin.analysis.online import KAMA, RSI, SMA, OnlineIndicator
+
+
+class BarCount(OnlineIndicator):
+    """Count the bars an indicator is updated with."""
+
+    def update(self, bar):
+        self.value = 1 if self.value != self.value else self.value + 1
+        return self.value
+
+    def reset(self):
+        self.value = float('nan')
 
 
 # noinspection PyTypeChecker
@@ -123,3 +136,211 @@ class TestYahooDataHandler(object):
         else:
             assert len(df.columns) == len(yahoo_data_handler.tickers)
 
+
+class TestArrayBars(object):
+    """Test the :class:`ArrayBars`"""
+
+    def test_constructor(self, events, ticker_list, start_date, end_date):
+        handler = ArrayBars(events, ticker_list, start_date, end_date)
+        handler.update_bars()
+        rows, tickers, fields = handler.ticker_data.shape
+        assert rows == len(handler.index)
+        assert tickers == len(ticker_list)
+        assert fields == len(pd_utils.OHLCV_COLS)
+
+    def test_get_latest_bar_value(self, array_data_handler):
+        """
+        The values should match :class:`Bars` and be views into the array.
+
+        :param ArrayBars array_data_handler:
+        """
+        aapl_close = array_data_handler.get_latest_bar_value(
+                'AAPL', pd_utils.CLOSE_COL)
+        assert aapl_close == approx(101.17)
+        assert np.shares_memory(aapl_close, array_data_handler.ticker_data)
+
+        array_data_handler.update_bars()
+
+        aapl_close = array_data_handler.get_latest_bar_value(
+                'AAPL', pd_utils.CLOSE_COL)
+        assert aapl_close == approx(102.26)
+
+        closes = array_data_handler.get_latest_bar_value(
+                'AAPL', pd_utils.CLOSE_COL, n=5)
+        assert len(closes) == 2
+
+        with pytest.raises(KeyError):
+            array_data_handler.get_latest_bar_value('FAKE',
+                                                    pd_utils.OPEN_COL)
+
+    def test_get_latest_bar(self, array_data_handler):
+        """
+        :param ArrayBars array_data_handler:
+        """
+        bar = array_data_handler.get_latest_bar('AAPL')
+        assert bar[pd_utils.CLOSE_COL] == approx(101.17)
+        assert (array_data_handler.get_latest_bar_dt('AAPL')
+                == dt_utils.parse_date('2016-03-10'))
+
+        array_data_handler.update_bars()
+        bars = array_data_handler.get_latest_bars('AAPL', n=2)
+        assert len(bars) == 2
+        assert bars[-1][pd_utils.CLOSE_COL] == approx(102.26)
+        assert (array_data_handler.get_latest_bar_dt('AAPL')
+                == dt_utils.parse_date('2016-03-11'))
+        assert (array_data_handler.get_latest_bar_ts('AAPL')
+                == dt_utils.to_ns('2016-03-11'))
+
+    def test_update_bars_until_exhausted(self, array_data_handler):
+        """The backtest should stop once the last bar has been emitted."""
+        while array_data_handler.continue_backtest:
+            array_data_handler.update_bars()
+
+        assert array_data_handler.get_latest_bar_dt('AAPL') == (
+            dt_utils.parse_date(array_data_handler.index[-1]))
+
+    def test_from_array(self, synthetic_bars):
+        """The latest bars are views that follow the cursor."""
+        bars = synthetic_bars
+        assert bars.ticker_data.shape == (8, 2, len(pd_utils.OHLCV_COLS))
+        assert len(bars.get_latest_bars('AAPL', n=3)) == 0
+
+        with pytest.raises(IndexError):
+            bars.get_latest_bar('AAPL')
+
+        bars.update_bars()
+        close = bars.get_latest_bar_value('AAPL', pd_utils.CLOSE_COL)
+        assert close.tolist() == [100.0]
+        assert np.shares_memory(close, bars.ticker_data)
+        # FB has no bars yet.
+        assert np.isnan(bars.get_latest_bar_value('FB',
+                                                  pd_utils.CLOSE_COL)).all()
+
+        for _ in range(3):
+            bars.update_bars()
+
+        assert bars.get_latest_bar_value(
+                'AAPL', pd_utils.CLOSE_COL, n=10).tolist() == [100.0, 102.0,
+                                                               104.0, 106.0]
+        assert bars.get_latest_bar_value(
+                'FB', pd_utils.CLOSE_COL, n=2).tolist() == [53.0, 54.0]
+        assert bars.get_latest_bar_ts('FB') == bars.index_ns[3]
+        assert bars.get_latest_bar_dt('FB') == dt_utils.parse_date(
+                bars.index[3])
+
+        bar = bars.get_latest_bar('FB')
+        assert bar[pd_utils.CLOSE_COL] == 54.0
+        assert bar[pd_utils.ADJ_CLOSE_COL] == approx(54 * .9)
+        assert bar[pd_utils.VOL_COL] == 1000.0
+        assert np.shares_memory(bars.records, bars.ticker_data)
+
+        highs = bars.get_latest_bars('FB', n=4)[pd_utils.HIGH_COL]
+        assert np.isnan(highs[:2]).all()
+        assert highs[2:].tolist() == [54.0, 55.0]
+
+    def test_update_bars_cursor(self, synthetic_bars):
+        """One event per bar and nothing once every bar is emitted."""
+        bars = synthetic_bars
+
+        while bars.continue_backtest:
+            bars.update_bars()
+
+        assert bars.events.qsize() == len(bars.index)
+        assert bars.get_latest_bar('AAPL')[pd_utils.CLOSE_COL] == 114.0
+
+        bars.update_bars()
+        assert bars.events.qsize() == len(bars.index)
+        assert bars.get_latest_bar_ts('AAPL') == bars.index_ns[-1]
+
+    def test_subscribe_leading_nan(self, synthetic_bars):
+        """A ticker's indicators only see the bars it actually has."""
+        bars = synthetic_bars
+        aapl_count = bars.subscribe('AAPL', BarCount())
+        fb_count = bars.subscribe('FB', BarCount())
+        sma = bars.subscribe('FB', SMA(3))
+
+        bars.update_bars()
+        assert aapl_count.value == 1
+        assert np.isnan(fb_count.value)
+
+        while bars.continue_backtest:
+            bars.update_bars()
+
+        assert aapl_count.value == 8
+        assert fb_count.value == 6
+        assert sma.value == approx(np.mean([56.0, 57.0, 58.0]))
+
+    def test_subscribe(self, events):
+        """Subscribed indicators are updated with every emitted bar."""
+        index = pd.date_range('2016-03-10', periods=30, freq='B')
+        data = np.random.RandomState(0).uniform(
+                90, 110, size=(len(index), 2, len(pd_utils.OHLCV_COLS)))
+        bars = ArrayBars.from_array(events, ['AAPL', 'FB'], index, data)
+        sma = bars.subscribe('AAPL', SMA(5))
+        assert bars.subscribe('AAPL', SMA(5)) is sma
+
+        with pytest.raises(KeyError):
+            bars.subscribe('FAKE', SMA(5))
+
+        while bars.continue_backtest:
+            bars.update_bars()
+
+        close = data[:, 0, bars.field_idx[pd_utils.CLOSE_COL]]
+        assert sma.value == approx(close[-5:].mean())
+
+    def test_subscribe_missing_bars(self, events):
+        """Dates a ticker has no bar at are not fed to its indicators."""
+        index = pd.date_range('2016-03-10', periods=40, freq='B')
+        data = np.random.RandomState(0).uniform(
+                90, 110, size=(len(index), 2, len(pd_utils.OHLCV_COLS)))
+        # FB is missing a few days in the middle.
+        data[10:13, 1] = np.nan
+        bars = ArrayBars.from_array(events, ['AAPL', 'FB'], index, data)
+        rsi = bars.subscribe('FB', RSI(5))
+        kama = bars.subscribe('FB', KAMA(5, efficiency_ratio_periods=3))
+        expected_rsi, expected_kama = RSI(5), KAMA(5,
+                                                   efficiency_ratio_periods=3)
+
+        while bars.continue_backtest:
+            bars.update_bars()
+
+        for bar in bars.records[:, 1]:
+            if not np.isnan(bar[pd_utils.CLOSE_COL]):
+                expected_rsi.update(bar)
+                expected_kama.update(bar)
+
+        assert not np.isnan(rsi.value)
+        assert rsi.value == approx(expected_rsi.value)
+        assert kama.value == approx(expected_kama.value)
+
+    def test_timeframe(self, events):
+        """Weekly bars are only served once their last day is emitted."""
+        index = pd.date_range('2016-03-07', periods=15, freq='B')
+        data = np.random.RandomState(0).uniform(
+                90, 110, size=(len(index), 2, len(pd_utils.OHLCV_COLS)))
+        bars = ArrayBars.from_array(events, ['AAPL', 'FB'], index, data)
+        close = bars.field_idx[pd_utils.CLOSE_COL]
+        high = bars.field_idx[pd_utils.HIGH_COL]
+
+        bars.update_bars()
+        assert bars.get_latest_timeframe_bars('AAPL', 'W').empty
+
+        for _ in range(4):
+            bars.update_bars()
+
+        # the first friday.
+        weekly = bars.get_latest_timeframe_bars('AAPL', 'W')
+        assert len(weekly) == 1
+        assert weekly[pd_utils.CLOSE_COL].iloc[0] == data[4, 0, close]
+        assert weekly[pd_utils.HIGH_COL].iloc[0] == data[:5, 0, high].max()
+
+        bars.update_bars()
+        assert len(bars.get_latest_timeframe_value(
+                'FB', 'W', pd_utils.CLOSE_COL, n=5)) == 1
+
+        while bars.continue_backtest:
+            bars.update_bars()
+
+        assert bars.get_latest_timeframe_value(
+                'FB', 'W', pd_utils.CLOSE_COL, n=5).tolist() == (
+                   data[[4, 9, 14], 1, close].tolist())
@@ -0,0 +1,122 @@
+import copy
+import random
+
+import pytest
+
+import pytech.trading.order as ord
+from pytech.trading.order_book import OrderBook
+from pytech.utils.enums import TradeAction
+
+
+def make_order(kind, action, price, ticker='AAPL', order_id=None):
+    if kind == 'market':
+        return ord.MarketOrder(ticker, action, 10, order_id=order_id)
+    if kind == 'limit':
+        return ord.LimitOrder(ticker, action, 10, limit_price=price,
+                              order_id=order_id)
+    if kind == 'stop':
+        return ord.StopOrder(ticker, action, 10, stop_price=price,
+                             order_id=order_id)
+    return ord.StopLimitOrder(ticker, action, 10, stop_price=price,
+                              limit_price=price + 1, order_id=order_id)
+
+
+class TestOrderTriggers(object):
+    def test_buy_limit(self):
+        order = make_order('limit', TradeAction.BUY, 100)
+        assert not order.check_triggers(current_price=101, dt=None)
+        assert order.check_triggers(current_price=100, dt=None)
+
+    def test_sell_limit(self):
+        order = make_order('limit', TradeAction.SELL, 100)
+        assert not order.check_triggers(current_price=99, dt=None)
+        assert order.check_triggers(current_price=100, dt=None)
+
+    def test_buy_stop(self):
+        order = make_order('stop', TradeAction.BUY, 100)
+        assert not order.check_triggers(current_price=99, dt=None)
+        assert order.check_triggers(current_price=100, dt=None)
+
+    def test_sell_stop(self):
+        order = make_order('stop', TradeAction.SELL, 100)
+        assert not order.check_triggers(current_price=101, dt=None)
+        assert order.check_triggers(current_price=100, dt=None)
+
+
+class TestOrderBook(object):
+    def test_add_remove(self):
+        book = OrderBook()
+        book.add(make_order('limit', 'BUY', 100, order_id='one'))
+        book.add(make_order('limit', 'SELL', 90, 'FB', order_id='two'))
+
+        assert len(book) == 2
+        assert book['one'].limit_price == 100
+        assert set(book.tickers) == {'AAPL', 'FB'}
+        assert list(book.by_ticker['FB']) == ['two']
+
+        book.remove('two')
+        assert 'two' not in book
+        assert book.tickers == ['AAPL']
+        assert book.candidates('FB', 90) == []
+
+        with pytest.raises(KeyError):
+            book.remove('two')
+
+    def test_candidates(self):
+        book = OrderBook()
+        book.add(make_order('limit', 'BUY', 95, order_id='buy_limit'))
+        book.add(make_order('limit', 'SELL', 105, order_id='sell_limit'))
+        book.add(make_order('stop', 'BUY', 110, order_id='buy_stop'))
+        book.add(make_order('stop', 'SELL', 90, order_id='sell_stop'))
+        book.add(make_order('market', 'BUY', None, order_id='market'))
+
+        def ids(price):
+            return [o.id for o in book.candidates('AAPL', price)]
+
+        assert ids(100) == ['market']
+        assert ids(95) == ['buy_limit', 'market']
+        assert ids(89) == ['buy_limit', 'sell_stop', 'market']
+        assert ids(106) == ['sell_limit', 'market']
+        assert ids(110) == ['sell_limit', 'buy_stop', 'market']
+
+    def test_reindex_after_trigger(self):
+        book = OrderBook()
+        order = make_order('stop_limit', 'SELL', 100, order_id='one')
+        book.add(order)
+
+        # the stop is reached but not the limit of 101.
+        assert book.candidates('AAPL', 99) == [order]
+        assert not order.check_triggers(current_price=99, dt=None)
+        book.reindex(order)
+        assert book.candidates('AAPL', 99) == []
+
+        assert order.check_triggers(current_price=101, dt=None)
+        book.reindex(order)
+        # triggered orders are checked on every bar.
+        assert book.candidates('AAPL', 0) == [order]
+
+    def test_matches_checking_every_order(self):
+        rng = random.Random(0)
+        book = OrderBook()
+        orders = []
+
+        for i in range(500):
+            kind = rng.choice(['market', 'limit', 'stop', 'stop_limit'])
+            action = rng.choice([TradeAction.BUY, TradeAction.SELL])
+            order = make_order(kind, action, rng.uniform(80, 120),
+                               order_id=str(i))
+            orders.append(order)
+            book.add(order)
+
+        for _ in range(50):
+            price = rng.uniform(75, 125)
+            expected = {o.id for o in orders
+                        if copy.copy(o).check_triggers(price, None)}
+            actual = set()
+
+            for order in book.candidates('AAPL', price):
+                if order.check_triggers(price, None):
+                    actual.add(order.id)
+                book.reindex(order)
+
+            assert actual == expected
@@ -1,5 +1,17 @@
+import queue
+
+import numpy as np
+import pandas as pd
+from pytest import approx
+
+import pytech.utils.pandas_utils as pd_utils
 from pytech.backtest.event import MarketEvent
+from pytech.data.handler import ArrayBars
+from pytech.fin.asset.owned_asset import OwnedAsset
 from pytech.fin.portfolio import BasicPortfolio, Portfolio
+from pytech.store import MemoryStore
+from pytech.trading.blotter import Blotter
+from pytech.utils.enums import Position
 
 
 class TestPortfolio(object):
@@ -33,3 +45,40 @@ class TestBasicPortfolio(object):
         assert basic_portfolio.owned_assets == {}
         assert basic_portfolio.all_holdings_mv[0]['AAPL'] == 0.0
         basic_portfolio.update_timeindex(MarketEvent())
+
+    def test_positions_df(self, basic_portfolio):
+        basic_portfolio.update_timeindex(MarketEvent())
+        basic_portfolio.update_timeindex(MarketEvent())
+        df = basic_portfolio.positions_df
+        assert len(df) == 2
+        assert 'total' in df.columns
+        basic_portfolio.finalize()
+        assert basic_portfolio.holdings_buffer.unflushed == 0
+
+    def test_update_timeindex_owned(self):
+        """Owned assets are valued at the latest adjusted close."""
+        events = queue.Queue()
+        index = pd.date_range('2016-03-10', periods=5, freq='B')
+        data = np.random.RandomState(0).uniform(
+                90, 110, size=(len(index), 2, len(pd_utils.OHLCV_COLS)))
+        store = MemoryStore()
+        bars = ArrayBars.from_array(events, ['AAPL', 'FB'], index, data,
+                                    store=store)
+        blotter = Blotter(events)
+        blotter.bars = bars
+        portfolio = BasicPortfolio(bars, events, index[0], blotter,
+                                   store=store)
+        portfolio.owned_assets['AAPL'] = OwnedAsset('AAPL', 10,
+                                                    Position.LONG, 100.,
+                                                    index[0])
+        adj_close = data[:, 0, bars.field_idx[pd_utils.ADJ_CLOSE_COL]]
+
+        for i in range(2):
+            bars.update_bars()
+            portfolio.update_timeindex(MarketEvent())
+            assert portfolio.all_holdings_mv[-1]['AAPL'] == approx(
+                    10 * adj_close[i])
+
+        df = portfolio.holdings_buffer.to_frame()
+        assert df['AAPL'].tolist() == approx((10 * adj_close[:2]).tolist())
+        assert df['FB'].tolist() == [0.0, 0.0]
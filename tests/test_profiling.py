@@ -0,0 +1,82 @@
+import json
+import time
+
+import pytest
+
+from pytech.backtest.profiling import Instrumentation
+
+
+class Component(object):
+    def __init__(self):
+        self.calls = 0
+
+    def work(self, n):
+        self.calls += 1
+        return sum(range(n))
+
+    def fail(self):
+        raise ValueError('nope')
+
+
+class TestInstrumentation(object):
+
+    def test_instrument(self):
+        instrumentation = Instrumentation()
+        component = Component()
+        instrumentation.instrument(component, 'work', 'component')
+        instrumentation.instrument(component, 'fail')
+
+        instrumentation.start()
+        assert component.work(10) == 45
+        component.work(100)
+
+        with pytest.raises(ValueError):
+            component.fail()
+
+        instrumentation.incr('bars')
+        instrumentation.incr('events', 3)
+        instrumentation.stop()
+
+        assert component.calls == 2
+        timer = instrumentation.timers['component']
+        assert timer.calls == 2
+        assert 0 < timer.max <= timer.total
+        # failed calls are still timed.
+        assert instrumentation.timers['fail'].calls == 1
+        assert instrumentation.counters == {'bars': 1, 'events': 3}
+        assert instrumentation.rate('events') == pytest.approx(
+                3 / instrumentation.elapsed)
+
+    def test_timed(self):
+        instrumentation = Instrumentation()
+        instrumentation.start()
+
+        with instrumentation.timed('sleep'):
+            time.sleep(.01)
+
+        instrumentation.stop()
+        assert instrumentation.timers['sleep'].total >= .01
+        assert instrumentation.elapsed >= .01
+        assert 'sleep' in instrumentation.summary()
+
+    def test_report(self, tmpdir):
+        path = str(tmpdir.join('report.json'))
+        instrumentation = Instrumentation(profile=True, profile_limit=5,
+                                          report_path=path)
+        component = Component()
+        instrumentation.instrument(component, 'work')
+
+        instrumentation.start()
+        for _ in range(10):
+            component.work(1000)
+            instrumentation.incr('bars')
+        instrumentation.stop()
+
+        with open(path) as f:
+            report = json.load(f)
+
+        assert report == json.loads(instrumentation.to_json())
+        assert report['counters'] == {'bars': 10}
+        assert report['timers']['work']['calls'] == 10
+        assert report['rates']['bars_per_sec'] > 0
+        assert 0 < len(report['profile']) <= 5
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+import pytech.trading.order as ord
+from pytech.trading.trade import Trade, TradeLog
+
+
+def make_trade(ticker, qty, price, date, order_id):
+    order = ord.MarketOrder(ticker, 'BUY' if qty > 0 else 'SELL', qty,
+                            order_id=order_id)
+    return Trade.from_order(order, date, 1.0, price, qty, price + .01)
+
+
+class TestTradeLog(object):
+    def test_append_and_export(self):
+        log = TradeLog(capacity=2)
+        dates = pd.date_range('2017-01-02', periods=5, freq='D', tz='UTC')
+
+        for i, date in enumerate(dates):
+            log.append(make_trade(['AAPL', 'FB'][i % 2], 10 * (i + 1),
+                                  100. + i, date, str(i)))
+
+        assert len(log) == 5
+        assert log.tickers == ['AAPL', 'FB']
+        np.testing.assert_array_equal(log.ticker_id[:5], [0, 1, 0, 1, 0])
+
+        df = log.to_frame()
+        assert list(df.columns) == list(TradeLog.COLUMNS)
+        assert df.index.equals(dates.rename('trade_date'))
+        assert list(df['ticker']) == ['AAPL', 'FB', 'AAPL', 'FB', 'AAPL']
+        assert list(df['qty']) == [10, 20, 30, 40, 50]
+        assert list(df['action']) == ['BUY'] * 5
+        assert list(df['order_id']) == ['0', '1', '2', '3', '4']
+        np.testing.assert_allclose(df['commission'], 1.0)
+
+    def test_empty(self):
+        df = TradeLog().to_frame()
+        assert df.empty
+        assert list(df.columns) == list(TradeLog.COLUMNS)
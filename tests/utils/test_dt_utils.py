@@ -1,5 +1,10 @@
 import datetime as dt
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
+import pandas as pd
 import pytest
 
 import pytech.utils.dt_utils as dt_utils
@@ -33,3 +38,114 @@ def test_is_weekday(adate, expected):
 ])
 def test_prev_weekday(adate, expected):
     assert dt_utils.prev_weekday(adate) == expected
+
+
+def test_is_trade_day_vectorized():
+    days = pd.date_range('2016-01-01', '2018-12-31', freq='D')
+    holidays = set(pd.DatetimeIndex(
+            dt_utils.get_calendar('NYSE').holidays).date)
+    expected = [d.isoweekday() < 6 and d.date() not in holidays
+                for d in days]
+
+    np.testing.assert_array_equal(dt_utils.is_trade_day(days), expected)
+    assert dt_utils.is_trade_day(dt.datetime(2017, 7, 4)) is False
+    assert dt_utils.is_trade_day(pd.Timestamp('2017-07-05', tz='UTC'))
+
+
+def test_sessions_between():
+    cal = dt_utils.get_calendar('NYSE')
+    assert dt_utils.get_calendar('NYSE') is cal
+
+    sessions = cal.sessions_between('2017-01-01', dt.datetime(2017, 1, 31))
+    assert len(sessions) == 20
+    assert sessions[0] == pd.Timestamp('2017-01-03')
+    # MLK day
+    assert pd.Timestamp('2017-01-16') not in sessions
+    np.testing.assert_array_equal(cal.is_session(sessions), True)
+
+    # dates before the calendar was built extend it.
+    old = cal.sessions_between('1985-01-01', '1985-01-04')
+    assert list(old.day) == [2, 3, 4]
+
+
+def test_open_at_time():
+    cal = dt_utils.get_calendar('NYSE')
+    times = pd.DatetimeIndex(['2017-01-18 14:29', '2017-01-18 14:30',
+                              '2017-01-18 20:59', '2017-01-18 21:00',
+                              '2017-01-16 15:00'], tz='UTC')
+
+    np.testing.assert_array_equal(cal.open_at_time(times),
+                                  [False, True, True, False, False])
+    assert cal.open_at_time(pd.Timestamp('2017-01-18 10:00',
+                                         tz='US/Eastern'))
+
+
+def test_extend_calendar_once(monkeypatch):
+    cal = dt_utils.TradingCalendar('NYSE', '2017-01-01', '2017-12-31')
+    schedule = cal._calendar.schedule
+    calls = []
+    barrier = threading.Barrier(4)
+
+    def slow_schedule(*args, **kwargs):
+        calls.append(kwargs)
+        # give the other threads time to queue up on the lock.
+        time.sleep(.05)
+        return schedule(*args, **kwargs)
+
+    monkeypatch.setattr(cal._calendar, 'schedule', slow_schedule)
+
+    def is_open():
+        barrier.wait()
+        return cal.open_at_time(pd.Timestamp('2018-01-03 15:00', tz='UTC'))
+
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: is_open(), range(4)))
+
+    assert results == [True] * 4
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize('value', [
+    '2017-03-18',
+    '2017-03-18 14:30',
+    dt.datetime(2017, 3, 18, 14, 30),
+    pd.Timestamp('2017-03-18 14:30'),
+    pd.Timestamp('2017-03-18 14:30', tz='UTC'),
+    np.datetime64('2017-03-18T14:30'),
+    pd.Timestamp('2017-03-18 14:30').value,
+])
+def test_parse_date_and_ns(value):
+    parsed = dt_utils.parse_date(value)
+    assert parsed.tz is not None
+    assert parsed.tz_convert(None) == pd.Timestamp(value).tz_localize(None)
+    assert dt_utils.to_ns(value) == parsed.value
+    assert dt_utils.from_ns(parsed.value) == parsed
+
+
+def test_parse_dates():
+    dates = ['2017-03-18 00:00', '2017-03-19 10:00', '2017-03-20 16:00']
+    index = dt_utils.parse_dates(dates)
+
+    assert str(index.tz) == 'UTC'
+    assert list(index) == [dt_utils.parse_date(d) for d in dates]
+    np.testing.assert_array_equal(dt_utils.to_ns(dates),
+                                  [dt_utils.to_ns(d) for d in dates])
+    assert dt_utils.parse_dates(dt_utils.to_ns(dates)).equals(index)
+    np.testing.assert_array_equal(dt_utils.to_ns(index),
+                                  dt_utils.to_ns(index.tz_localize(None)))
+    np.testing.assert_array_equal(dt_utils.to_ns(index),
+                                  dt_utils.to_ns(dates))
+
+
+def test_date_windows():
+    windows = list(dt_utils.date_windows('2017-01-15', '2017-03-10 12:00'))
+    starts = [s.tz_convert(None) for s, _ in windows]
+    ends = [e.tz_convert(None) for _, e in windows]
+
+    assert starts == [pd.Timestamp('2017-01-15'), pd.Timestamp('2017-02-01'),
+                      pd.Timestamp('2017-03-01')]
+    assert ends[:2] == [pd.Timestamp('2017-02-01') - pd.Timedelta(1),
+                        pd.Timestamp('2017-03-01') - pd.Timedelta(1)]
+    assert ends[-1] == pd.Timestamp('2017-03-10 12:00')
+
+    assert len(list(dt_utils.date_windows('2017-01-02', '2017-01-05'))) == 1